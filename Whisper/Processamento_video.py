@@ -1,7 +1,14 @@
 import os
+import sys
 import subprocess
 import yt_dlp
 from datetime import datetime
+from sondagem_midia import sondar_midia, planejar_remux
+from executor_ffmpeg import executar_ffmpeg, formatar_progresso
+from perfis_conversao import PERFIS, GANHO_BASE, resolver_perfis, perfis_do_menu, compilar_comando
+from cache_midia import CacheMidia, gerar_chave as gerar_chave_midia
+from agendador_conversao import executar_tarefas
+from governador_recursos import obter_governador, comando_com_threads
 
 def obter_timestamp_formatado():
     """Retorna um timestamp formatado para usar no nome dos arquivos."""
@@ -15,6 +22,18 @@ def criar_diretorio_saida():
         os.makedirs(diretorio_saida)
     return diretorio_saida
 
+def imprimir_progresso(progresso):
+    """Mostra o andamento da conversão (tempo processado e velocidade) na mesma linha."""
+    texto = formatar_progresso(progresso)
+    if progresso["percentual"] is not None:
+        texto = f"{progresso['percentual']:5.1f}% {texto}"
+    print(f"\r  {texto}", end="\n" if progresso["fim"] else "", flush=True)
+
+def executar_ffmpeg_reservado(comando, *args, saidas=None, **kwargs):
+    """executar_ffmpeg dentro de uma reserva do governador de recursos, com '-threads' no orçamento dela."""
+    with obter_governador().reservar("ffmpeg") as reserva:
+        return executar_ffmpeg(comando_com_threads(comando, reserva.threads_iniciais, saidas), *args, **kwargs)
+
 def verifica_arquivo_local(caminho):
     """Verifica se o caminho fornecido é um arquivo local."""
     caminho = caminho.strip('"\'')
@@ -24,14 +43,32 @@ def verifica_url(texto):
     """Verifica se o texto é uma URL."""
     return texto.strip('"\'').startswith(('http://', 'https://', 'www.'))
 
-def processar_video_local(caminho_origem, caminho_saida):
-    """Processa um arquivo de vídeo local mantendo o áudio."""
+def processar_video_local(caminho_origem, caminho_saida, progresso_callback=None, cancelar=None, usar_cache=True):
+    """
+    Prepara um arquivo de vídeo local mantendo o áudio.
+    O ffprobe decide se a origem já serve (MP4 com AAC), se basta trocar o container
+    ou se o áudio precisa ser recodificado.
+    """
     try:
         caminho_origem = caminho_origem.strip('"\'')
         if not os.path.exists(caminho_origem):
             print(f"Erro: Arquivo não encontrado: {caminho_origem}")
             return None
 
+        info = sondar_midia(caminho_origem)
+        plano = planejar_remux(info) if info else 'recodificar_audio'
+        if plano == 'pular':
+            print(f"\nArquivo local já está em MP4/AAC, usando sem reprocessar: {caminho_origem}")
+            return caminho_origem
+
+        if usar_cache:
+            cache = CacheMidia(caminho_saida)
+            chave_cache = gerar_chave_midia(cache.hash_origem(caminho_origem), {'remux': plano, 'extensao': 'mp4'})
+            existente = cache.buscar(chave_cache)
+            if existente:
+                print(f"\nVídeo reaproveitado do cache: {existente}")
+                return existente
+
         timestamp = obter_timestamp_formatado()
         nome_arquivo = os.path.basename(caminho_origem)
         nome_base = os.path.splitext(nome_arquivo)[0]
@@ -40,20 +77,28 @@ def processar_video_local(caminho_origem, caminho_saida):
         print(f"\nProcessando arquivo local: {caminho_origem}")
         print(f"Para: {destino}")
 
+        if plano == 'copiar':
+            argumentos_audio = ['-c:a', 'copy']              # Áudio já é AAC, só troca o container
+        else:
+            argumentos_audio = ['-c:a', 'aac', '-b:a', '192k']  # Converte áudio para AAC
+
         comando = [
             'ffmpeg',
             '-i', caminho_origem,
             '-c:v', 'copy',     # Copia o stream de vídeo sem recodificar
-            '-c:a', 'aac',      # Converte áudio para AAC
-            '-b:a', '192k',     # Bitrate do áudio
+            *argumentos_audio,
             '-y',               # Sobrescreve se existir
             destino
         ]
 
-        processo = subprocess.run(comando, capture_output=True, text=True)
+        processo = executar_ffmpeg_reservado(
+            comando, progresso_callback or imprimir_progresso, cancelar, duracao_total=info and info["duracao"]
+        )
         
         if processo.returncode == 0 and os.path.exists(destino):
             print("Vídeo processado com sucesso!")
+            if usar_cache:
+                cache.registrar(chave_cache, destino)
             return destino
         else:
             print(f"Erro ao processar vídeo: {processo.stderr}")
@@ -95,265 +140,311 @@ def baixar_do_youtube(url, caminho_saida):
         print(f"Erro ao baixar do YouTube: {str(e)}")
         return None
 
-def extrair_audio(caminho_video, caminho_saida):
-    """Extrai o áudio do vídeo com configurações otimizadas."""
+def _gancho_progresso_download(progresso_callback):
+    """Adapta o progress_hook do yt-dlp para o formato (valor, texto) usado na transcrição."""
+    def gancho(d):
+        if d.get('status') != 'downloading':
+            return
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        percentual = int(100 * d.get('downloaded_bytes', 0) / total) if total else 0
+        velocidade = d.get('speed')
+        texto = f"Baixando áudio: {percentual}%"
+        if velocidade:
+            texto += f" ({velocidade / 1024 / 1024:.1f} MB/s)"
+        progresso_callback(min(4, percentual * 4 // 100), texto)
+    return gancho
+
+def baixar_audio_youtube(url, caminho_saida, fragmentos_concorrentes=4, progresso_callback=None):
+    """
+    Baixa só o áudio (bestaudio) e já converte para WAV PCM 16 kHz mono, o formato da transcrição.
+    Os downloads parciais ficam em saida_audio/parciais com o id do vídeo no nome,
+    então uma nova tentativa continua de onde parou.
+    """
     try:
         timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_video))[0]
-        caminho_audio = os.path.join(caminho_saida, f"audio_{timestamp}_{nome_base}.mp3")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_video,
-            '-vn',                # Remove vídeo
-            '-acodec', 'libmp3lame',  # Codec MP3
-            '-ab', '192k',        # Bitrate
-            '-ar', '44100',       # Sample rate
-            '-af', 'volume=2.0',  # Aumenta volume
-            '-y',                 # Sobrescreve se existir
-            caminho_audio
-        ]
-        
-        print("\nExtraindo áudio...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        
-        if processo.returncode == 0 and os.path.exists(caminho_audio):
-            if os.path.getsize(caminho_audio) > 0:
-                print(f"Áudio extraído com sucesso: {caminho_audio}")
-                return caminho_audio
-            else:
-                print("Erro: Arquivo de áudio gerado está vazio")
-                return None
-        else:
-            print(f"Erro ao extrair áudio: {processo.stderr}")
-            return None
-            
+        pasta_parciais = os.path.join(caminho_saida, "parciais")
+        if not os.path.exists(pasta_parciais):
+            os.makedirs(pasta_parciais)
+        opcoes_ydl = {
+            'format': 'bestaudio/best',
+            'outtmpl': os.path.join(pasta_parciais, "%(id)s.%(ext)s"),  # Nome estável para retomar o download
+            'continuedl': True,
+            'concurrent_fragment_downloads': fragmentos_concorrentes,
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'wav',
+            }],
+            'postprocessor_args': {'extractaudio': ['-ar', '16000', '-ac', '1']},
+            'prefer_ffmpeg': True,
+        }
+        if progresso_callback:
+            opcoes_ydl['progress_hooks'] = [_gancho_progresso_download(progresso_callback)]
+
+        with yt_dlp.YoutubeDL(opcoes_ydl) as ydl:
+            print("\nBaixando áudio do YouTube...")
+            info = ydl.extract_info(url, download=True)
+            downloads = info.get('requested_downloads') or [{}]
+            caminho_parcial = downloads[0].get('filepath') or \
+                os.path.splitext(ydl.prepare_filename(info))[0] + '.wav'
+
+        titulo = "".join(c for c in info.get('title', info['id']) if c not in '\\/:*?"<>|')
+        caminho_audio = os.path.join(caminho_saida, f"audio_{timestamp}_{titulo}.wav")
+        os.replace(caminho_parcial, caminho_audio)
+        print(f"Áudio baixado: {caminho_audio}")
+        return caminho_audio
     except Exception as e:
-        print(f"Erro ao extrair áudio: {str(e)}")
+        print(f"Erro ao baixar áudio do YouTube: {str(e)}")
         return None
 
-def converter_para_telefonia(caminho_audio, caminho_saida):
-    """Converte o áudio para o padrão de telefonia."""
+def transcrever_do_youtube(url, modelo_escolhido, idioma=None, progresso_callback=None, diretorio_saida=None, **opcoes):
+    """
+    Caminho direto URL -> transcrição: baixa só o áudio já em 16 kHz mono e chama
+    transcrever_com_diarizacao. 'opcoes' é repassado à transcrição (backend, usar_cache...).
+    """
+    from transcricao_core import transcrever_com_diarizacao
+
+    caminho_audio = baixar_audio_youtube(
+        url, diretorio_saida or criar_diretorio_saida(), progresso_callback=progresso_callback
+    )
+    if not caminho_audio:
+        raise RuntimeError("Não foi possível baixar o áudio do YouTube.")
+    return transcrever_com_diarizacao(caminho_audio, modelo_escolhido, idioma, progresso_callback, **opcoes)
+
+# Perfil gerado sempre, junto com os formatos selecionados
+PERFIL_AUDIO_BASE = 'audio_base'
+
+def converter_para_perfil(caminho_audio, caminho_saida, nome_perfil):
+    """Converte um áudio já extraído (com o ganho base aplicado) para um perfil do registro."""
     try:
-        timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_audio))[0]
-        caminho_telefonia = os.path.join(caminho_saida, f"telefonia_{timestamp}_{nome_base}.wav")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_audio,
-            '-ar', '8000',        # Sample rate para telefonia
-            '-ac', '1',           # Mono
-            '-acodec', 'pcm_s16le',  # 16-bit PCM
-            '-af', 'volume=3.0,highpass=f=300,lowpass=f=3400',  # Filtros de áudio
-            '-y',                 # Sobrescreve se existir
-            caminho_telefonia
-        ]
-        
-        print("\nConvertendo para formato telefônico...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        
-        if processo.returncode == 0 and os.path.exists(caminho_telefonia):
-            if os.path.getsize(caminho_telefonia) > 0:
-                print(f"Conversão concluída: {caminho_telefonia}")
-                return caminho_telefonia
+        perfil = PERFIS[nome_perfil]
+        destinos = _destinos_conversao(caminho_audio, caminho_saida, [nome_perfil], incluir_mp3=False)
+        caminho_destino = destinos[0][1]
+        comando = compilar_comando(caminho_audio, destinos, ganho_base=False)
+
+        print(f"\nConvertendo para {perfil['descricao'] or nome_perfil}...")
+        processo = executar_ffmpeg_reservado(comando, imprimir_progresso, saidas=[caminho_destino])
+
+        if processo.returncode == 0 and os.path.exists(caminho_destino):
+            if os.path.getsize(caminho_destino) > 0:
+                print(f"Conversão concluída: {caminho_destino}")
+                return caminho_destino
             else:
-                print("Erro: Arquivo de áudio telefônico gerado está vazio")
+                print("Erro: Arquivo de áudio gerado está vazio")
                 return None
         else:
             print(f"Erro na conversão: {processo.stderr}")
             return None
-            
+
     except Exception as e:
-        print(f"Erro na conversão telefônica: {str(e)}")
+        print(f"Erro na conversão {nome_perfil}: {str(e)}")
         return None
 
+def converter_para_telefonia(caminho_audio, caminho_saida):
+    """Converte o áudio para o padrão de telefonia."""
+    return converter_para_perfil(caminho_audio, caminho_saida, 'telefonia')
+
 def converter_para_alta_qualidade(caminho_audio, caminho_saida):
     """Converte para áudio de alta qualidade (FLAC)."""
-    try:
-        timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_audio))[0]
-        caminho_hq = os.path.join(caminho_saida, f"hq_{timestamp}_{nome_base}.flac")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_audio,
-            '-c:a', 'flac',        # Codec FLAC (sem perdas)
-            '-ar', '96000',        # Sample rate alto
-            '-bits_per_raw_sample', '24',  # Profundidade de bits
-            '-y',                  # Sobrescreve se existir
-            caminho_hq
-        ]
-        
-        print("\nConvertendo para formato de alta qualidade (FLAC)...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        return caminho_hq if processo.returncode == 0 else None
-    except Exception as e:
-        print(f"Erro na conversão HQ: {str(e)}")
-        return None
+    return converter_para_perfil(caminho_audio, caminho_saida, 'alta_qualidade')
 
 def converter_para_podcast(caminho_audio, caminho_saida):
     """Converte para formato ideal para podcasts."""
-    try:
-        timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_audio))[0]
-        caminho_podcast = os.path.join(caminho_saida, f"podcast_{timestamp}_{nome_base}.m4a")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_audio,
-            '-c:a', 'aac',         # Codec AAC
-            '-b:a', '192k',        # Bitrate bom para voz
-            '-ar', '44100',        # Sample rate padrão
-            '-af', 'loudnorm',     # Normalização de volume
-            '-y',                  # Sobrescreve se existir
-            caminho_podcast
-        ]
-        
-        print("\nConvertendo para formato de podcast...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        return caminho_podcast if processo.returncode == 0 else None
-    except Exception as e:
-        print(f"Erro na conversão podcast: {str(e)}")
-        return None
+    return converter_para_perfil(caminho_audio, caminho_saida, 'podcast')
 
 def converter_para_streaming(caminho_audio, caminho_saida):
     """Converte para formato otimizado para streaming."""
-    try:
-        timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_audio))[0]
-        caminho_stream = os.path.join(caminho_saida, f"stream_{timestamp}_{nome_base}.ogg")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_audio,
-            '-c:a', 'libvorbis',   # Codec Vorbis
-            '-q:a', '6',           # Qualidade VBR
-            '-ar', '48000',        # Sample rate para streaming
-            '-y',                  # Sobrescreve se existir
-            caminho_stream
-        ]
-        
-        print("\nConvertendo para formato de streaming...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        return caminho_stream if processo.returncode == 0 else None
-    except Exception as e:
-        print(f"Erro na conversão streaming: {str(e)}")
-        return None
+    return converter_para_perfil(caminho_audio, caminho_saida, 'streaming')
 
 def converter_para_radio(caminho_audio, caminho_saida):
     """Converte para formato de rádio FM."""
-    try:
-        timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_audio))[0]
-        caminho_radio = os.path.join(caminho_saida, f"radio_{timestamp}_{nome_base}.wav")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_audio,
-            '-ar', '44100',        # Sample rate padrão para FM
-            '-ac', '2',            # Estéreo
-            '-acodec', 'pcm_s16le', # PCM 16-bit
-            '-af', 'acompressor=threshold=-16dB:ratio=4,volume=2', # Compressão dinâmica
-            '-y',                  # Sobrescreve se existir
-            caminho_radio
-        ]
-        
-        print("\nConvertendo para formato de rádio...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        return caminho_radio if processo.returncode == 0 else None
-    except Exception as e:
-        print(f"Erro na conversão rádio: {str(e)}")
-        return None
+    return converter_para_perfil(caminho_audio, caminho_saida, 'radio')
 
 def converter_para_whatsapp(caminho_audio, caminho_saida):
     """Converte para formato ideal para WhatsApp."""
+    return converter_para_perfil(caminho_audio, caminho_saida, 'whatsapp')
+
+def _destinos_conversao(caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3=True):
+    """
+    Lista (perfil, caminho) das saídas pedidas, na ordem do registro de perfis.
+    formatos_selecionados aceita as opções do menu ('1'..'6') ou nomes de perfil.
+    """
+    timestamp = obter_timestamp_formatado()
+    nome_base = os.path.splitext(os.path.basename(caminho_origem))[0]
+    nomes = [n for n in resolver_perfis(formatos_selecionados) if n != PERFIL_AUDIO_BASE]
+    if incluir_mp3:
+        nomes.insert(0, PERFIL_AUDIO_BASE)
+    destinos = []
+    for nome in nomes:
+        perfil = PERFIS[nome]
+        destinos.append((nome, os.path.join(
+            caminho_saida, f"{perfil['prefixo']}_{timestamp}_{nome_base}.{perfil['extensao']}"
+        )))
+    return destinos
+
+def _chave_cache_saida(hash_origem, nome_perfil):
+    return gerar_chave_midia(hash_origem, {'ganho': GANHO_BASE, **PERFIS[nome_perfil]})
+
+def _separar_do_cache(cache, caminho_origem, destinos):
+    """Divide os destinos entre os que já existem no cache ({chave: caminho}) e os que faltam gerar."""
+    hash_origem = cache.hash_origem(caminho_origem)
+    reaproveitados = {}
+    faltando = []
+    for chave, caminho in destinos:
+        existente = cache.buscar(_chave_cache_saida(hash_origem, chave))
+        if existente:
+            print(f"Reaproveitado do cache: {existente}")
+            reaproveitados[chave] = existente
+        else:
+            faltando.append((chave, caminho))
+    return hash_origem, reaproveitados, faltando
+
+def planejar_conversao(caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3=True, cache=None):
+    """
+    Saídas de uma conversão: (hash da origem, {chave: caminho} reaproveitados do cache, [(chave, caminho)] a gerar).
+    Sem cache tudo é gerado e o hash é None.
+    """
+    destinos = _destinos_conversao(caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3)
+    if cache is None or not destinos:
+        return None, {}, destinos
+    return _separar_do_cache(cache, caminho_origem, destinos)
+
+def registrar_saida(cache, hash_origem, chave, caminho):
+    """Guarda no cache uma saída gerada, para a mesma origem e perfil serem reaproveitados depois."""
+    cache.registrar(_chave_cache_saida(hash_origem, chave), caminho)
+
+def converter_formatos(caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3=True,
+                       progresso_callback=None, cancelar=None, duracao_total=None, usar_cache=True):
+    """
+    Gera o MP3 base e todos os formatos selecionados com uma única decodificação da origem.
+    Saídas já geradas para o mesmo conteúdo e perfil são reaproveitadas do cache de saida_audio/.
+    Retorna um dicionário {chave: caminho} com as saídas geradas, ou None em caso de erro.
+    """
     try:
-        timestamp = obter_timestamp_formatado()
-        nome_base = os.path.splitext(os.path.basename(caminho_audio))[0]
-        caminho_whatsapp = os.path.join(caminho_saida, f"whatsapp_{timestamp}_{nome_base}.ogg")
-        
-        comando = [
-            'ffmpeg',
-            '-i', caminho_audio,
-            '-c:a', 'libopus',     # Codec Opus (usado pelo WhatsApp)
-            '-b:a', '128k',        # Bitrate balanceado
-            '-ar', '48000',        # Sample rate padrão para Opus
-            '-af', 'volume=1.5',   # Leve aumento de volume
-            '-y',                  # Sobrescreve se existir
-            caminho_whatsapp
-        ]
-        
-        print("\nConvertendo para formato do WhatsApp...")
-        processo = subprocess.run(comando, capture_output=True, text=True)
-        return caminho_whatsapp if processo.returncode == 0 else None
+        cache = CacheMidia(caminho_saida) if usar_cache else None
+        hash_origem, gerados, destinos = planejar_conversao(
+            caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3, cache
+        )
+        if not destinos:
+            return gerados
+
+        comando = compilar_comando(caminho_origem, destinos)
+        print(f"\nConvertendo {len(destinos)} formato(s) em uma única passada...")
+        processo = executar_ffmpeg_reservado(
+            comando, progresso_callback or imprimir_progresso, cancelar, duracao_total=duracao_total,
+            saidas=[caminho for _, caminho in destinos]
+        )
+        if processo.returncode != 0:
+            print(f"Erro na conversão: {processo.stderr}")
+            return None
+
+        for chave, caminho in destinos:
+            if os.path.exists(caminho) and os.path.getsize(caminho) > 0:
+                print(f"Conversão concluída: {caminho}")
+                gerados[chave] = caminho
+                if cache is not None:
+                    registrar_saida(cache, hash_origem, chave, caminho)
+            else:
+                print(f"Erro: Arquivo gerado está vazio: {caminho}")
+        return gerados
+
     except Exception as e:
-        print(f"Erro na conversão WhatsApp: {str(e)}")
+        print(f"Erro na conversão: {str(e)}")
         return None
 
-def processar_video(origem, diretorio_saida, formatos_selecionados):
-    """Função principal que executa todo o processamento."""
-    print("\nVerificando instalação do FFmpeg...")
+def converter_formatos_paralelo(caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3=True,
+                                max_trabalhadores=None, timeout=None, cancelar=None, usar_cache=True):
+    """
+    Converte cada formato em um processo FFmpeg próprio, rodando em paralelo no pool.
+    Retorna (gerados, erros): {chave: caminho} e {chave: mensagem}.
+    """
+    cache = CacheMidia(caminho_saida) if usar_cache else None
+    hash_origem, gerados, destinos = planejar_conversao(
+        caminho_origem, caminho_saida, formatos_selecionados, incluir_mp3, cache
+    )
+    tarefas = {
+        chave: (compilar_comando(caminho_origem, [(chave, caminho)]), caminho)
+        for chave, caminho in destinos
+    }
+    print(f"\nConvertendo {len(tarefas)} formato(s) em paralelo...")
+    resultados = executar_tarefas(tarefas, max_trabalhadores, timeout, cancelar, utilizacao_callback=imprimir_utilizacao)
+    erros = {}
+    for chave, _ in destinos:
+        resultado = resultados[chave]
+        if resultado["erro"]:
+            print(f"Erro na conversão '{chave}': {resultado['erro']}")
+            erros[chave] = resultado["erro"]
+        else:
+            print(f"Conversão concluída em {resultado['duracao_s']}s: {resultado['caminho']}")
+            gerados[chave] = resultado["caminho"]
+            if cache is not None:
+                registrar_saida(cache, hash_origem, chave, resultado["caminho"])
+    return gerados, erros
+
+def imprimir_utilizacao(relatorio):
+    print(f"Uso de CPU: {relatorio['utilizacao_cpu']:.0%} de {relatorio['threads']} thread(s) reservadas, "
+          f"{relatorio['utilizacao_maquina']:.0%} da máquina")
+
+def verificar_ffmpeg():
+    """Confere se FFmpeg e FFprobe estão acessíveis."""
     try:
         subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
         subprocess.run(['ffprobe', '-version'], capture_output=True, check=True)
+        return True
     except Exception:
         print("Erro: FFmpeg ou FFprobe não está instalado ou não está acessível!")
-        return None, None
+        return False
 
-    # Processamento inicial do vídeo
+def obter_video(origem, diretorio_saida, progresso_callback=None, cancelar=None):
+    """Copia/processa o arquivo local ou baixa a URL; retorna o caminho do vídeo ou None."""
     if verifica_arquivo_local(origem):
-        caminho_video = processar_video_local(origem, diretorio_saida)
+        return processar_video_local(origem, diretorio_saida, progresso_callback, cancelar)
     elif verifica_url(origem):
-        caminho_video = baixar_do_youtube(origem, diretorio_saida)
-    else:
-        print("Erro: Fonte inválida. Forneça uma URL válida ou caminho de arquivo local.")
+        return baixar_do_youtube(origem, diretorio_saida)
+    print("Erro: Fonte inválida. Forneça uma URL válida ou caminho de arquivo local.")
+    return None
+
+def processar_video(origem, diretorio_saida, formatos_selecionados, paralelo=False, max_trabalhadores=None, timeout=None,
+                    progresso_callback=None, cancelar=None):
+    """
+    Função principal que executa todo o processamento.
+    Com paralelo=True cada formato vira uma tarefa própria no pool de conversão.
+    progresso_callback recebe o andamento de cada FFmpeg e cancelar (threading.Event) interrompe a conversão.
+    """
+    print("\nVerificando instalação do FFmpeg...")
+    if not verificar_ffmpeg():
         return None, None
 
+    # Processamento inicial do vídeo
+    caminho_video = obter_video(origem, diretorio_saida, progresso_callback, cancelar)
     if not caminho_video:
         return None, None
-    
-    # Extração do áudio base para conversões
-    caminho_audio = extrair_audio(caminho_video, diretorio_saida)
-    if not caminho_audio:
-        return caminho_video, None
-
-    arquivos_gerados = [caminho_video, caminho_audio]
 
-    # Processa os formatos selecionados
-    if '1' in formatos_selecionados:  # Padrão telefonia
-        caminho_telefonia = converter_para_telefonia(caminho_audio, diretorio_saida)
-        if caminho_telefonia:
-            arquivos_gerados.append(caminho_telefonia)
-
-    if '2' in formatos_selecionados:  # Alta Qualidade
-        caminho_hq = converter_para_alta_qualidade(caminho_audio, diretorio_saida)
-        if caminho_hq:
-            arquivos_gerados.append(caminho_hq)
-
-    if '3' in formatos_selecionados:  # Podcast
-        caminho_podcast = converter_para_podcast(caminho_audio, diretorio_saida)
-        if caminho_podcast:
-            arquivos_gerados.append(caminho_podcast)
-
-    if '4' in formatos_selecionados:  # Streaming
-        caminho_stream = converter_para_streaming(caminho_audio, diretorio_saida)
-        if caminho_stream:
-            arquivos_gerados.append(caminho_stream)
-
-    if '5' in formatos_selecionados:  # Rádio
-        caminho_radio = converter_para_radio(caminho_audio, diretorio_saida)
-        if caminho_radio:
-            arquivos_gerados.append(caminho_radio)
+    if paralelo:
+        gerados, _ = converter_formatos_paralelo(
+            caminho_video, diretorio_saida, formatos_selecionados,
+            max_trabalhadores=max_trabalhadores, timeout=timeout, cancelar=cancelar
+        )
+    else:
+        # Áudio base e formatos selecionados saem de uma única decodificação do vídeo
+        info = sondar_midia(caminho_video)
+        gerados = converter_formatos(
+            caminho_video, diretorio_saida, formatos_selecionados,
+            progresso_callback=progresso_callback, cancelar=cancelar, duracao_total=info and info["duracao"]
+        )
+    if not gerados or PERFIL_AUDIO_BASE not in gerados:
+        return caminho_video, None
 
-    if '6' in formatos_selecionados:  # WhatsApp
-        caminho_whatsapp = converter_para_whatsapp(caminho_audio, diretorio_saida)
-        if caminho_whatsapp:
-            arquivos_gerados.append(caminho_whatsapp)
+    arquivos_gerados = [caminho_video] + list(gerados.values())
+    CacheMidia(diretorio_saida).aplicar_limite(protegidos=arquivos_gerados)
 
     return caminho_video, arquivos_gerados
 
 if __name__ == "__main__":
+    # Com argumentos, roda o modo em lote (manifesto) sem nenhuma pergunta interativa
+    if len(sys.argv) > 1:
+        from lote_midia import main
+        sys.exit(main(sys.argv[1:]))
+
     try:
         print("\nProcessador de Vídeo e Áudio")
         print("============================")
@@ -364,18 +455,15 @@ if __name__ == "__main__":
         origem = input("\nDigite a URL do vídeo ou o caminho do arquivo local: ")
         
         print("\nEscolha os formatos de saída desejados:")
-        print("1. Padrão Telefonia (WAV 8kHz)")
-        print("2. Alta Qualidade (FLAC 96kHz)")
-        print("3. Podcast (M4A)")
-        print("4. Streaming (OGG)")
-        print("5. Rádio FM (WAV)")
-        print("6. WhatsApp (OGG/OPUS)")
+        for perfil in perfis_do_menu():
+            print(f"{perfil['opcao']}. {perfil['descricao']}")
         
         formatos = input("\nDigite os números dos formatos desejados (separados por vírgula): ").split(',')
         formatos = [f.strip() for f in formatos]  # Remove espaços em branco
+        paralelo = input("\nConverter cada formato em um processo próprio, em paralelo? (s/N): ").strip().lower() == 's'
         
         diretorio_saida = criar_diretorio_saida()
-        caminho_video, arquivos_gerados = processar_video(origem, diretorio_saida, formatos)
+        caminho_video, arquivos_gerados = processar_video(origem, diretorio_saida, formatos, paralelo=paralelo)
         
         if arquivos_gerados:
             print("\nProcessamento concluído com sucesso!")
@@ -5,6 +5,7 @@ from pyannote.audio import Pipeline
 from datetime import timedelta
 import ffmpeg
 from dotenv import load_dotenv  # NOVO!
+from pos_processamento import remover_repeticoes
 
 # Carregar variáveis de ambiente do .env
 load_dotenv()
@@ -26,29 +27,6 @@ if not HUGGINGFACE_TOKEN:
 def format_timestamp(seconds):
     return str(timedelta(seconds=float(seconds))).split('.')[0]
 
-def remove_repeticoes(segments):
-    if not segments:
-        return segments
-
-    cleaned_segments = []
-    previous_segment = None
-    
-    for segment in segments:
-        if previous_segment is None:
-            cleaned_segments.append(segment)
-            previous_segment = segment
-            continue
-            
-        current_text = segment["text"].strip().lower()
-        previous_text = previous_segment["text"].strip().lower()
-        cleaned_current = ''.join(c for c in current_text if c.isalnum() or c.isspace())
-        cleaned_prev = ''.join(c for c in previous_text if c.isalnum() or c.isspace())
-        if (abs(len(cleaned_current) - len(cleaned_prev)) > 10 or  
-            (cleaned_current not in cleaned_prev and cleaned_prev not in cleaned_current)):
-            cleaned_segments.append(segment)
-            previous_segment = segment
-    return cleaned_segments
-
 modelos_disponiveis = ["tiny", "base", "small", "medium", "large"]
 
 print("Modelos disponíveis:")
@@ -133,7 +111,7 @@ try:
                 "text": segment_text.strip()
             })
 
-    segments = remove_repeticoes(segments)
+    segments = remover_repeticoes(segments)
 
     print("Salvando transcrição com identificação de falantes...")
     caminho_transcr = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}.txt")
@@ -0,0 +1,69 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from executor_ffmpeg import executar_ffmpeg
+from governador_recursos import obter_governador, comando_com_threads, total_nucleos
+
+def numero_trabalhadores(max_trabalhadores=None):
+    """Quantidade de conversões simultâneas: por padrão, uma por núcleo disponível para o processo."""
+    return max(1, max_trabalhadores or total_nucleos())
+
+def _executar_tarefa(nome, comando, caminho_saida, timeout, cancelar, threads_tarefa):
+    # Uma passada do FFmpeg pode gerar várias saídas (lista de caminhos)
+    saidas = [caminho_saida] if isinstance(caminho_saida, str) else list(caminho_saida)
+    inicio = time.perf_counter()
+    resultado = {"nome": nome, "caminho": None, "erro": None, "duracao_s": None, "threads": None}
+    if cancelar is not None and cancelar.is_set():
+        resultado["erro"] = "Conversão cancelada"
+        return resultado
+    try:
+        # Calculado quando a tarefa começa, para acompanhar os trabalhos que entraram ou saíram
+        resultado["threads"] = threads_tarefa()
+        processo = executar_ffmpeg(comando_com_threads(comando, resultado["threads"], saidas), cancelar=cancelar, timeout=timeout)
+        if processo.tempo_esgotado:
+            resultado["erro"] = f"Tempo limite de {timeout}s excedido"
+        elif processo.cancelado:
+            resultado["erro"] = "Conversão cancelada"
+        elif processo.returncode != 0:
+            resultado["erro"] = processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else \
+                f"FFmpeg terminou com código {processo.returncode}"
+        elif any(not os.path.exists(saida) or os.path.getsize(saida) == 0 for saida in saidas):
+            resultado["erro"] = "Arquivo gerado está vazio"
+        else:
+            resultado["caminho"] = caminho_saida
+    except Exception as e:
+        resultado["erro"] = str(e)
+    resultado["duracao_s"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+def executar_tarefas(tarefas, max_trabalhadores=None, timeout=None, cancelar=None, utilizacao_callback=None):
+    """
+    Executa comandos FFmpeg independentes em paralelo.
+    'tarefas' é um dicionário {nome: (comando, caminho_saida)}; caminho_saida pode ser uma lista
+    quando o comando grava várias saídas. Cada tarefa é um processo
+    FFmpeg; o pool limita quantos rodam ao mesmo tempo. O lote inteiro é uma reserva no governador
+    de recursos: no máximo uma tarefa simultânea por thread do orçamento, que é dividido igualmente entre elas.
+    cancelar (threading.Event) interrompe as tarefas em andamento e as que ainda não começaram.
+    utilizacao_callback recebe, no fim, as threads e a utilização de CPU alcançada pelo lote.
+    Retorna {nome: {"caminho", "erro", "duracao_s", "threads"}} com o resultado de cada tarefa.
+    """
+    if not tarefas:
+        return {}
+    resultados = {}
+    with obter_governador().reservar("conversao") as reserva:
+        # Mais processos FFmpeg que threads no orçamento disputariam os mesmos núcleos
+        trabalhadores = min(numero_trabalhadores(max_trabalhadores), len(tarefas), reserva.threads)
+
+        def threads_tarefa():
+            return max(1, reserva.threads // trabalhadores)
+
+        with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+            futuros = {
+                nome: executor.submit(_executar_tarefa, nome, comando, caminho, timeout, cancelar, threads_tarefa)
+                for nome, (comando, caminho) in tarefas.items()
+            }
+            for nome, futuro in futuros.items():
+                resultados[nome] = futuro.result()
+    if utilizacao_callback:
+        utilizacao_callback(reserva.relatorio)
+    return resultados
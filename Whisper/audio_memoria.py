@@ -0,0 +1,123 @@
+import os
+import tempfile
+import numpy as np
+from executor_ffmpeg import executar_ffmpeg
+
+TAXA_AMOSTRAGEM = 16000
+BYTES_POR_AMOSTRA = 4
+# Acima deste tamanho (~30 min a 16 kHz) o áudio decodificado vai para um arquivo mapeado em memória
+LIMITE_MEMORIA_BYTES = 30 * 60 * TAXA_AMOSTRAGEM * BYTES_POR_AMOSTRA
+
+class AudioDecodificado:
+    """
+    Áudio mono float32 decodificado uma única vez e compartilhado entre as etapas.
+    'amostras' é um array NumPy (ou np.memmap em arquivos longos).
+    """
+    def __init__(self, amostras, taxa, caminho_mmap=None):
+        self.amostras = amostras
+        self.taxa = taxa
+        self.caminho_mmap = caminho_mmap
+
+    @property
+    def duracao(self):
+        return len(self.amostras) / self.taxa
+
+    def para_pyannote(self):
+        """Formato em memória aceito pelo pipeline do pyannote."""
+        import torch
+        return {"waveform": torch.from_numpy(self.amostras).unsqueeze(0), "sample_rate": self.taxa}
+
+    def para_arquivo(self, pasta_temp=None):
+        """
+        Caminho de um arquivo float32 bruto com as amostras, para outro processo abrir com
+        abrir_audio_mapeado sem receber o áudio por pickle. Áudios em memmap usam o próprio arquivo;
+        nos demais o arquivo é criado aqui e removido em fechar().
+        """
+        if self.caminho_mmap is None:
+            fd, self.caminho_mmap = tempfile.mkstemp(prefix="audio_", suffix=".f32", dir=pasta_temp)
+            with os.fdopen(fd, "wb") as f:
+                self.amostras.tofile(f)
+        return self.caminho_mmap
+
+    def fechar(self):
+        """Libera o buffer e remove o arquivo temporário do memmap, se houver."""
+        # O memmap só é desfeito quando a última referência ao array é liberada
+        self.amostras = None
+        if self.caminho_mmap and os.path.exists(self.caminho_mmap):
+            try:
+                os.remove(self.caminho_mmap)
+            except OSError:
+                pass
+        self.caminho_mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def abrir_audio_mapeado(caminho, taxa=TAXA_AMOSTRAGEM):
+    """Abre, sem copiar, um arquivo gerado por para_arquivo. O arquivo continua pertencendo a quem o criou."""
+    if os.path.getsize(caminho) == 0:
+        return AudioDecodificado(np.zeros(0, dtype=np.float32), taxa)
+    # 'c' (copy-on-write): o array é gravável para o torch, mas o arquivo nunca é alterado
+    return AudioDecodificado(np.memmap(caminho, dtype=np.float32, mode="c"), taxa)
+
+def decodificar_audio(caminho_arquivo, taxa=TAXA_AMOSTRAGEM, pasta_temp=None, progresso_callback=None, cancelar=None):
+    """
+    Decodifica qualquer arquivo de áudio/vídeo para float32 mono em uma única chamada do FFmpeg,
+    lendo a saída pelo pipe. Arquivos longos são despejados em disco e mapeados com np.memmap.
+    progresso_callback e cancelar são repassados ao executar_ffmpeg.
+    """
+    comando = [
+        'ffmpeg',
+        '-nostdin',
+        '-loglevel', 'error',
+        '-i', caminho_arquivo,
+        '-vn',                   # Ignora o vídeo
+        '-ac', '1',              # Mono
+        '-ar', str(taxa),        # Sample rate esperado pelo Whisper e pelo pyannote
+        '-f', 'f32le',           # Float32 bruto no stdout
+        'pipe:1'
+    ]
+
+    estado = {"buffer": bytearray(), "total": 0, "arquivo": None, "caminho": None}
+
+    def consumir(bloco):
+        estado["total"] += len(bloco)
+        if estado["arquivo"] is None and estado["total"] > LIMITE_MEMORIA_BYTES:
+            fd, estado["caminho"] = tempfile.mkstemp(prefix="audio_", suffix=".f32", dir=pasta_temp)
+            estado["arquivo"] = os.fdopen(fd, "wb")
+            estado["arquivo"].write(estado["buffer"])
+            estado["buffer"] = bytearray()
+        if estado["arquivo"] is not None:
+            estado["arquivo"].write(bloco)
+        else:
+            estado["buffer"] += bloco
+
+    def descartar_mmap():
+        if estado["arquivo"] is not None:
+            estado["arquivo"].close()
+        if estado["caminho"] and os.path.exists(estado["caminho"]):
+            os.remove(estado["caminho"])
+
+    try:
+        processo = executar_ffmpeg(comando, progresso_callback, cancelar, consumidor_stdout=consumir)
+    except BaseException:
+        descartar_mmap()
+        raise
+
+    if processo.returncode != 0:
+        descartar_mmap()
+        if processo.cancelado:
+            raise RuntimeError("Extração de áudio cancelada.")
+        raise RuntimeError("Erro ao extrair áudio com FFmpeg: " + processo.stderr)
+
+    # Descarta um eventual byte incompleto no final do stream
+    total = estado["total"] - estado["total"] % BYTES_POR_AMOSTRA
+    if estado["arquivo"] is not None:
+        estado["arquivo"].close()
+        amostras = np.memmap(estado["caminho"], dtype=np.float32, mode="r+", shape=(total // BYTES_POR_AMOSTRA,))
+        return AudioDecodificado(amostras, taxa, estado["caminho"])
+    amostras = np.frombuffer(estado["buffer"], dtype=np.float32, count=total // BYTES_POR_AMOSTRA)
+    return AudioDecodificado(amostras, taxa)
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos que não podem ser carregados no processo da interface durante a inicialização
+MODULOS_PESADOS = ["torch", "whisper", "pyannote.audio", "numpy", "transcricao_core", "yt_dlp"]
+
+# Executado em um interpretador novo: mede do início do script até a janela aparecer
+CODIGO_MEDICAO = """
+import time
+inicio = time.perf_counter()
+import sys, json
+from PyQt5.QtWidgets import QApplication
+import transcricao_qt
+importacao = time.perf_counter()
+app = QApplication(sys.argv)
+janela = transcricao_qt.TranscricaoApp()
+janela.show()
+app.processEvents()
+visivel = time.perf_counter()
+carregados = [m for m in {modulos!r} if m in sys.modules]
+print(json.dumps({{
+    "importacao_ms": round((importacao - inicio) * 1000, 1),
+    "janela_ms": round((visivel - inicio) * 1000, 1),
+    "modulos_pesados": carregados,
+}}))
+sys.stdout.flush()
+janela.close()
+"""
+
+def medir_inicializacao(offscreen=False):
+    """Abre o app em um processo novo e devolve os tempos medidos (ms) e os módulos pesados carregados."""
+    ambiente = dict(os.environ)
+    if offscreen:
+        ambiente["QT_QPA_PLATFORM"] = "offscreen"
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-c", CODIGO_MEDICAO.format(modulos=MODULOS_PESADOS)],
+        cwd=PASTA_SCRIPT, env=ambiente, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    # A primeira linha chega assim que a janela aparece; o encerramento do app não entra na medição
+    linha = processo.stdout.readline()
+    total_ms = round((time.perf_counter() - inicio) * 1000, 1)
+    _, erros = processo.communicate()
+    if not linha.strip():
+        raise RuntimeError(f"Falha ao iniciar o app:\n{erros.strip()}")
+    medicao = json.loads(linha)
+    medicao["processo_ms"] = total_ms
+    return medicao
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo até a janela do app de transcrição aparecer.")
+    parser.add_argument("-n", "--execucoes", type=int, default=5)
+    parser.add_argument("--limite-ms", type=float, default=800, help="Tempo máximo (mediana, com o interpretador) aceitável")
+    parser.add_argument("--offscreen", action="store_true", help="Usa a plataforma 'offscreen' do Qt (sem monitor)")
+    args = parser.parse_args()
+
+    medicoes = []
+    for i in range(args.execucoes):
+        medicao = medir_inicializacao(args.offscreen)
+        medicoes.append(medicao)
+        print(f"[{i + 1}/{args.execucoes}] importação {medicao['importacao_ms']} ms, "
+              f"janela {medicao['janela_ms']} ms, processo {medicao['processo_ms']} ms")
+
+    mediana = statistics.median(m["processo_ms"] for m in medicoes)
+    pesados = sorted({m for medicao in medicoes for m in medicao["modulos_pesados"]})
+    print(f"\nMediana até a janela aparecer: {mediana:.1f} ms (limite {args.limite_ms:.0f} ms)")
+    falhou = False
+    if pesados:
+        print(f"FALHA: módulos pesados carregados na inicialização: {', '.join(pesados)}")
+        falhou = True
+    if mediana > args.limite_ms:
+        print("FALHA: inicialização acima do limite")
+        falhou = True
+    sys.exit(1 if falhou else 0)
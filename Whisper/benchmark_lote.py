@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import argparse
+import statistics
+from datetime import datetime
+
+from audio_memoria import decodificar_audio
+from benchmark_transcricao import taxa_erro_palavras, PASTA_BENCHMARKS
+from transcricao_lote import transcrever_lote, listar_arquivos
+from transcricao_core import obter_backend
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+PASTA_AUDIOS = os.path.join(PASTA_SCRIPT, "audios")
+
+def _texto(segmentos):
+    return " ".join(s["text"].strip() for s in segmentos)
+
+def transcrever_sequencial(caminhos, modelo_escolhido, idioma, backend="whisper"):
+    """O laço de referência: um arquivo por vez, decodificado e passado inteiro ao transcribe do modelo."""
+    modelo = obter_backend(backend, modelo_escolhido)
+    textos = {}
+    for caminho in caminhos:
+        audio = decodificar_audio(caminho)
+        try:
+            textos[caminho] = _texto(modelo.transcrever(audio.amostras, idioma))
+        finally:
+            audio.fechar()
+    return textos
+
+def transcrever_em_lote(caminhos, modelo_escolhido, idioma, tamanho_lote, backend="whisper"):
+    resultados = transcrever_lote(caminhos, modelo_escolhido, idioma, backend=backend, tamanho_lote=tamanho_lote)
+    return {caminho: _texto(r["segmentos"]) for caminho, r in resultados.items()}
+
+def medir(funcao, caminhos, repeticoes):
+    """Mediana de arquivos por minuto em 'repeticoes' execuções e os textos da última."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        textos = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempo = statistics.median(tempos)
+    return {"tempo_s": round(tempo, 2), "arquivos_por_minuto": round(len(caminhos) / tempo * 60, 1)}, textos
+
+def executar_benchmark(caminhos, modelo_escolhido, idioma, tamanhos_lote, repeticoes=3, backend="whisper"):
+    """
+    Compara o laço sequencial com o caminho em lote para cada tamanho de lote.
+    O carregamento do modelo fica fora da medição; WER é a divergência do texto em lote para o sequencial.
+    """
+    obter_backend(backend, modelo_escolhido)
+    duracao_total = 0.0
+    for caminho in caminhos:
+        audio = decodificar_audio(caminho)
+        duracao_total += audio.duracao
+        audio.fechar()
+
+    print(f"Sequencial ({len(caminhos)} arquivos, {duracao_total / 60:.1f} min de áudio)...")
+    sequencial, textos_referencia = medir(
+        lambda: transcrever_sequencial(caminhos, modelo_escolhido, idioma, backend), caminhos, repeticoes
+    )
+    linhas = [dict(config="sequencial", tamanho_lote=1, wer_vs_sequencial=0.0, aceleracao=1.0, **sequencial)]
+    for tamanho in tamanhos_lote:
+        print(f"Lote de {tamanho} janelas...")
+        medicao, textos = medir(
+            lambda: transcrever_em_lote(caminhos, modelo_escolhido, idioma, tamanho, backend), caminhos, repeticoes
+        )
+        wer = statistics.mean(taxa_erro_palavras(textos_referencia[c], textos[c]) for c in caminhos)
+        linhas.append(dict(
+            config=f"lote_{tamanho}", tamanho_lote=tamanho, wer_vs_sequencial=round(wer, 3),
+            aceleracao=round(sequencial["tempo_s"] / medicao["tempo_s"], 2), **medicao
+        ))
+    return {"modelo": modelo_escolhido, "backend": backend, "arquivos": len(caminhos),
+            "duracao_audio_s": round(duracao_total, 1), "repeticoes": repeticoes, "resultados": linhas}
+
+def salvar_relatorio(relatorio):
+    execucao = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pasta_execucao = os.path.join(PASTA_BENCHMARKS, f"{execucao}_lote")
+    os.makedirs(pasta_execucao, exist_ok=True)
+    with open(os.path.join(pasta_execucao, "resultados.json"), "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    linhas = [
+        f"{relatorio['arquivos']} arquivos, {relatorio['duracao_audio_s']} s de áudio, "
+        f"modelo {relatorio['modelo']} ({relatorio['backend']}), mediana de {relatorio['repeticoes']} execuções\n",
+        "| Configuração | Tempo (s) | Arquivos/min | Aceleração | WER vs sequencial |",
+        "|---|---|---|---|---|",
+    ]
+    for r in relatorio["resultados"]:
+        linhas.append(f"| {r['config']} | {r['tempo_s']} | {r['arquivos_por_minuto']} | {r['aceleracao']}x | {r['wer_vs_sequencial']} |")
+    caminho_tabela = os.path.join(pasta_execucao, "comparacao.md")
+    with open(caminho_tabela, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    return caminho_tabela, "\n".join(linhas)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arquivos por minuto: transcrição em lote x laço sequencial do transcribe.")
+    parser.add_argument("caminhos", nargs="*", default=[PASTA_AUDIOS], help="Arquivos ou pastas (padrão: audios/)")
+    parser.add_argument("--modelo", default="small")
+    parser.add_argument("--idioma", default=None)
+    parser.add_argument("--backend", default="whisper")
+    parser.add_argument("--lotes", default="4,8,16", help="Tamanhos de lote separados por vírgula")
+    parser.add_argument("-n", "--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    relatorio = executar_benchmark(
+        listar_arquivos(args.caminhos), args.modelo, args.idioma, [int(t) for t in args.lotes.split(",") if t.strip()], args.repeticoes, args.backend
+    )
+    caminho_tabela, texto_tabela = salvar_relatorio(relatorio)
+    print("\n" + texto_tabela)
+    print(f"\nRelatório salvo em: {caminho_tabela}")
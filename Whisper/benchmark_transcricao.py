@@ -0,0 +1,181 @@
+import os
+import re
+import csv
+import argparse
+import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+PASTA_AUDIOS = os.path.join(PASTA_SCRIPT, "audios")
+PASTA_TRANSCRICOES = os.path.join(PASTA_SCRIPT, "Transcricoes")
+PASTA_BENCHMARKS = os.path.join(PASTA_SCRIPT, "benchmarks")
+
+ARQUIVOS_PADRAO = ["teste.mp3", "teste2.mp3", "Teste3.m4a", "reuniao.mp4"]
+
+PADRAO_LINHA = re.compile(r"^\[[^\]]*\]\s*[^:]+:\s*(.*)$")
+PADRAO_PALAVRA = re.compile(r"\w+")
+
+def ler_texto_transcricao(caminho):
+    """Lê um arquivo transcricao_*.txt e devolve só o texto falado, sem tempos nem falantes."""
+    partes = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            encontrado = PADRAO_LINHA.match(linha.strip())
+            if encontrado:
+                partes.append(encontrado.group(1))
+    return " ".join(partes)
+
+def taxa_erro_palavras(referencia, hipotese):
+    """Word error rate (distância de edição por palavras / palavras da referência)."""
+    ref = PADRAO_PALAVRA.findall(referencia.lower())
+    hip = PADRAO_PALAVRA.findall(hipotese.lower())
+    if not ref:
+        return 0.0 if not hip else 1.0
+    anterior = list(range(len(hip) + 1))
+    for i, palavra_ref in enumerate(ref, 1):
+        atual = [i] + [0] * len(hip)
+        for j, palavra_hip in enumerate(hip, 1):
+            custo = 0 if palavra_ref == palavra_hip else 1
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+        anterior = atual
+    return anterior[-1] / len(ref)
+
+def _executar_combinacao(caminho_audio, modelo, backend, threads, compute_type, idioma, pasta_saida):
+    """Roda uma combinação em um processo novo, para que o pico de memória seja só dela."""
+    from transcricao_core import transcrever_com_diarizacao
+    # cpu_threads fixa as threads da combinação nos dois backends (0 = automático)
+    opcoes_backend = {"cpu_threads": threads or 0}
+    if backend == "ctranslate2":
+        opcoes_backend["compute_type"] = compute_type
+
+    resumos = []
+    transcrever_com_diarizacao(
+        caminho_audio, modelo, idioma,
+        usar_cache=False, backend=backend, opcoes_backend=opcoes_backend,
+        metricas_callback=resumos.append, pasta_saida=pasta_saida, identificar_falantes=False
+    )
+    return resumos[0]
+
+def executar_benchmark(arquivos, modelos, backends, threads_lista, compute_type="int8", idioma=None):
+    execucao = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pasta_execucao = os.path.join(PASTA_BENCHMARKS, execucao)
+    os.makedirs(pasta_execucao, exist_ok=True)
+    contexto = multiprocessing.get_context("spawn")
+
+    resultados = []
+    for modelo, backend, threads in itertools.product(modelos, backends, threads_lista):
+        rotulo = f"{modelo}/{backend}" + (f":{compute_type}" if backend == "ctranslate2" else "") + f"/{threads or 'auto'}t"
+        pasta_saida = os.path.join(pasta_execucao, rotulo.replace("/", "_").replace(":", "-"))
+        os.makedirs(pasta_saida, exist_ok=True)
+        for arquivo in arquivos:
+            caminho_audio = os.path.join(PASTA_AUDIOS, arquivo)
+            print(f"\n[{rotulo}] {arquivo}...")
+            linha = {"config": rotulo, "modelo": modelo, "backend": backend, "threads": threads,
+                     "arquivo": arquivo, "duracao_audio_s": None, "tempo_s": None,
+                     "fator_tempo_real": None, "pico_rss_mb": None, "wer": None, "erro": ""}
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                    resumo = executor.submit(
+                        _executar_combinacao, caminho_audio, modelo, backend, threads,
+                        compute_type, idioma, pasta_saida
+                    ).result()
+                linha.update({
+                    "duracao_audio_s": resumo["duracao_audio_s"],
+                    "tempo_s": resumo["tempo_parede_s"],
+                    "fator_tempo_real": resumo["fator_tempo_real"],
+                    "pico_rss_mb": resumo["pico_rss_mb"],
+                })
+                nome_base = os.path.splitext(arquivo)[0]
+                referencia = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}.txt")
+                hipotese = os.path.join(pasta_saida, f"transcricao_{nome_base}.txt")
+                if os.path.exists(referencia):
+                    linha["wer"] = round(taxa_erro_palavras(
+                        ler_texto_transcricao(referencia), ler_texto_transcricao(hipotese)
+                    ), 3)
+            except Exception as e:
+                linha["erro"] = str(e)
+                print(f"Erro: {e}")
+            resultados.append(linha)
+
+    return pasta_execucao, resultados
+
+def agregar_por_config(resultados):
+    """Soma tempos e durações por configuração e calcula RTF global, pico e WER médio."""
+    agregados = {}
+    for linha in resultados:
+        item = agregados.setdefault(linha["config"], {
+            "config": linha["config"], "tempo_s": 0.0, "duracao_audio_s": 0.0,
+            "pico_rss_mb": 0.0, "wers": [], "erros": 0
+        })
+        if linha["erro"]:
+            item["erros"] += 1
+            continue
+        item["tempo_s"] += linha["tempo_s"] or 0.0
+        item["duracao_audio_s"] += linha["duracao_audio_s"] or 0.0
+        item["pico_rss_mb"] = max(item["pico_rss_mb"], linha["pico_rss_mb"] or 0.0)
+        if linha["wer"] is not None:
+            item["wers"].append(linha["wer"])
+    tabela = []
+    for item in agregados.values():
+        tabela.append({
+            "config": item["config"],
+            "fator_tempo_real": round(item["tempo_s"] / item["duracao_audio_s"], 3) if item["duracao_audio_s"] else None,
+            "pico_rss_mb": item["pico_rss_mb"],
+            "wer_medio": round(sum(item["wers"]) / len(item["wers"]), 3) if item["wers"] else None,
+            "erros": item["erros"],
+        })
+    tabela.sort(key=lambda t: (t["fator_tempo_real"] is None, t["fator_tempo_real"] or 0))
+    return tabela
+
+def salvar_relatorio(pasta_execucao, resultados, tabela, wer_maximo):
+    with open(os.path.join(pasta_execucao, "resultados.csv"), "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(resultados[0].keys()))
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+    escolhida = next(
+        (t for t in tabela if not t["erros"] and t["fator_tempo_real"] is not None
+         and (t["wer_medio"] is None or t["wer_medio"] <= wer_maximo)),
+        None
+    )
+    linhas = [
+        "| Configuração | RTF | Pico RSS (MB) | WER médio | Erros |",
+        "|---|---|---|---|---|",
+    ]
+    for t in tabela:
+        marcador = " **(escolhida)**" if t is escolhida else ""
+        linhas.append(
+            f"| {t['config']}{marcador} | {t['fator_tempo_real']} | {t['pico_rss_mb']} | {t['wer_medio']} | {t['erros']} |"
+        )
+    if escolhida:
+        linhas.append(f"\nConfiguração mais rápida com WER <= {wer_maximo}: {escolhida['config']}")
+    caminho_tabela = os.path.join(pasta_execucao, "comparacao.md")
+    with open(caminho_tabela, "w", encoding="utf-8") as f:
+        f.write("\n".join(linhas) + "\n")
+    return caminho_tabela, "\n".join(linhas)
+
+def _lista(texto, tipo=str):
+    return [tipo(item.strip()) for item in texto.split(",") if item.strip()]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de throughput da transcrição por modelo, backend e threads.")
+    parser.add_argument("--arquivos", default=",".join(ARQUIVOS_PADRAO), help="Arquivos de audios/ separados por vírgula")
+    parser.add_argument("--modelos", default="tiny,base,small,medium")
+    parser.add_argument("--backends", default="whisper,ctranslate2")
+    parser.add_argument("--threads", default="0", help="Quantidades de threads separadas por vírgula (0 = automático)")
+    parser.add_argument("--compute-type", default="int8", help="Quantização do backend ctranslate2")
+    parser.add_argument("--idioma", default=None)
+    parser.add_argument("--wer-maximo", type=float, default=0.35, help="WER máximo aceitável para escolher a configuração")
+    args = parser.parse_args()
+
+    pasta_execucao, resultados = executar_benchmark(
+        _lista(args.arquivos), _lista(args.modelos), _lista(args.backends),
+        _lista(args.threads, int), args.compute_type, args.idioma
+    )
+    caminho_tabela, texto_tabela = salvar_relatorio(
+        pasta_execucao, resultados, agregar_por_config(resultados), args.wer_maximo
+    )
+    print("\n" + texto_tabela)
+    print(f"\nRelatório salvo em: {caminho_tabela}")
@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+from cache_transcricao import hash_do_arquivo, salvar_json_atomico
+
+NOME_INDICE = "indice_cache.json"
+# Tamanho máximo de saida_audio/ antes de apagar os arquivos usados há mais tempo
+LIMITE_PADRAO_BYTES = 5 * 1024 ** 3
+# Um acerto só regrava o índice se o último acesso registrado for mais antigo que isso
+INTERVALO_ACESSO_S = 3600
+
+_trava = threading.Lock()
+
+def assinatura_perfil(perfil):
+    """Hash estável da definição de um perfil de conversão (mudou o perfil, muda a chave)."""
+    return hashlib.sha256(json.dumps(perfil, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def gerar_chave(hash_origem, perfil):
+    return f"{hash_origem}:{assinatura_perfil(perfil)}"
+
+class CacheMidia:
+    """
+    Índice de mídia derivada dentro de saida_audio/: mapeia (conteúdo da origem, perfil)
+    para o arquivo já gerado e mantém os arquivos do índice abaixo de limite_bytes (LRU por tamanho).
+    Arquivos do diretório que não estão no índice nunca são apagados.
+    """
+    def __init__(self, diretorio, limite_bytes=LIMITE_PADRAO_BYTES):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.caminho_indice = os.path.join(diretorio, NOME_INDICE)
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho_indice):
+            return {}
+        try:
+            with open(self.caminho_indice, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # O índice não pode ser refeito pela pasta, que também pode ter arquivos que não são do cache.
+            # A cópia ilegível fica guardada ao lado (para recuperar à mão) e o cache recomeça vazio.
+            copia = self.caminho_indice + ".corrompido"
+            try:
+                os.replace(self.caminho_indice, copia)
+            except OSError:
+                copia = self.caminho_indice
+            print(f"Índice do cache de mídia ilegível ({e}); guardado em {copia}. Os arquivos registrados "
+                  f"nele não entram mais no limite de tamanho do cache.", file=sys.stderr)
+            return {}
+
+    def _salvar(self, indice):
+        salvar_json_atomico(self.caminho_indice, indice, indent=1)
+
+    def hash_origem(self, caminho_origem):
+        return hash_do_arquivo(caminho_origem)
+
+    def buscar(self, chave):
+        """Retorna o caminho já gerado para a chave (e marca o uso), ou None."""
+        with _trava:
+            indice = self._carregar()
+            registro = indice.get(chave)
+            if not registro:
+                return None
+            caminho = registro["arquivo"]
+            if not os.path.exists(caminho) or os.path.getsize(caminho) != registro["tamanho"]:
+                del indice[chave]
+                self._salvar(indice)
+                return None
+            # Para a ordem de remoção basta o último acesso aproximado: evita regravar o índice a cada acerto
+            agora = time.time()
+            if agora - registro["ultimo_acesso"] > INTERVALO_ACESSO_S:
+                registro["ultimo_acesso"] = agora
+                self._salvar(indice)
+            return caminho
+
+    def registrar(self, chave, caminho):
+        with _trava:
+            indice = self._carregar()
+            indice[chave] = {
+                "arquivo": os.path.abspath(caminho),
+                "tamanho": os.path.getsize(caminho),
+                "ultimo_acesso": time.time(),
+            }
+            self._salvar(indice)
+
+    def aplicar_limite(self, protegidos=()):
+        """
+        Apaga os arquivos do índice usados há mais tempo até o total deles caber no limite.
+        Só arquivos registrados pelo cache entram na conta e podem ser removidos.
+        Retorna a lista de arquivos removidos.
+        """
+        protegidos = {os.path.abspath(p) for p in protegidos}
+        with _trava:
+            indice = self._carregar()
+            arquivos = []
+            total = 0
+            for chave, registro in indice.items():
+                caminho = registro["arquivo"]
+                if not os.path.isfile(caminho):
+                    continue
+                tamanho = os.path.getsize(caminho)
+                total += tamanho
+                arquivos.append((registro["ultimo_acesso"], tamanho, caminho, chave))
+
+            removidos = []
+            chaves_removidas = set()
+            for _, tamanho, caminho, chave in sorted(arquivos):
+                if total <= self.limite_bytes:
+                    break
+                if caminho in protegidos:
+                    continue
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    continue
+                total -= tamanho
+                removidos.append(caminho)
+                chaves_removidas.add(chave)
+
+            if chaves_removidas:
+                self._salvar({k: r for k, r in indice.items() if k not in chaves_removidas})
+            return removidos
@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import gzip
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+PASTA_CACHE = os.path.join(PASTA_SCRIPT, "cache_transcricoes")
+INDICE_HASHES_PATH = os.path.join(PASTA_CACHE, "hashes.json")
+
+# Incrementar sempre que uma mudança no pipeline alterar o resultado salvo no cache
+VERSAO_PIPELINE = "1"
+
+TAMANHO_BLOCO = 1024 * 1024
+# Arquivos lembrados no índice de hashes; acima disso saem primeiro os que sumiram e depois os mais antigos
+LIMITE_INDICE_HASHES = 5000
+
+# O índice é lido, alterado e regravado por várias threads (lotes e conversões em paralelo)
+_trava_indice = threading.Lock()
+
+def criar_pasta_cache(pasta=PASTA_CACHE):
+    """Cria a pasta do cache de transcrições se ainda não existir."""
+    if not os.path.exists(pasta):
+        os.makedirs(pasta)
+    return pasta
+
+def calcular_hash_arquivo(caminho):
+    """Calcula o SHA-256 do conteúdo do arquivo lendo em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+def _carregar_indice_hashes():
+    if not os.path.exists(INDICE_HASHES_PATH):
+        return {}
+    try:
+        with open(INDICE_HASHES_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        # Índice corrompido: os hashes são recalculados e o índice é refeito
+        print(f"Índice de hashes ilegível ({e}); será recriado.", file=sys.stderr)
+        return {}
+
+@contextmanager
+def gravacao_atomica(caminho, modo="w", **opcoes):
+    """
+    Abre um temporário exclusivo na mesma pasta de 'caminho' (modo e opções como em open) e,
+    se o bloco terminar sem erro, troca o arquivo de uma vez. Escritas concorrentes, de threads
+    ou de processos diferentes, não se misturam nem deixam o arquivo pela metade.
+    """
+    descritor, temporario = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(caminho)), suffix=".tmp")
+    try:
+        with os.fdopen(descritor, modo, **opcoes) as f:
+            yield f
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+def salvar_json_atomico(caminho, dados, indent=None):
+    """Grava 'dados' em JSON com gravacao_atomica (compacto, a menos que 'indent' seja informado)."""
+    with gravacao_atomica(caminho, encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=indent, separators=None if indent else (",", ":"))
+
+def _limitar_indice(indice, limite):
+    if len(indice) <= limite:
+        return indice
+    indice = {caminho: registro for caminho, registro in indice.items() if os.path.exists(caminho)}
+    # O dicionário mantém a ordem de inserção: os primeiros são os calculados há mais tempo
+    return dict(list(indice.items())[-limite:])
+
+def hash_do_arquivo(caminho):
+    """
+    Retorna o hash do conteúdo do arquivo, reaproveitando o valor já calculado
+    enquanto caminho, tamanho e data de modificação não mudarem.
+    """
+    caminho = os.path.abspath(caminho)
+    info = os.stat(caminho)
+    assinatura = f"{info.st_size}:{info.st_mtime_ns}"
+    with _trava_indice:
+        registro = _carregar_indice_hashes().get(caminho)
+    if registro and registro.get("assinatura") == assinatura:
+        return registro["hash"]
+    # O hash é calculado fora da trava; só a atualização do índice é serializada
+    hash_audio = calcular_hash_arquivo(caminho)
+    with _trava_indice:
+        indice = _carregar_indice_hashes()
+        indice.pop(caminho, None)
+        indice[caminho] = {"assinatura": assinatura, "hash": hash_audio}
+        try:
+            criar_pasta_cache(os.path.dirname(INDICE_HASHES_PATH))
+            salvar_json_atomico(INDICE_HASHES_PATH, _limitar_indice(indice, LIMITE_INDICE_HASHES))
+        except OSError as e:
+            print(f"Não foi possível gravar o índice de hashes: {e}", file=sys.stderr)
+    return hash_audio
+
+def gerar_chave(hash_audio, modelo, idioma, backend="whisper"):
+    """Monta a chave do cache a partir do conteúdo do áudio, modelo, idioma, backend e versão do pipeline."""
+    bruto = f"{hash_audio}|{modelo}|{idioma or 'auto'}|{backend}|{VERSAO_PIPELINE}"
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+def _caminho_entrada(chave, pasta):
+    return os.path.join(pasta, chave[:2], f"{chave}.json.gz")
+
+def _compactar_segmentos(segmentos):
+    compactos = []
+    for s in segmentos:
+        compacto = [round(s["start"], 3), round(s["end"], 3), s["text"]]
+        if "words" in s:
+            compacto.append([[p["word"], round(p["start"], 3), round(p["end"], 3)] for p in s["words"]])
+        compactos.append(compacto)
+    return compactos
+
+def _expandir_segmentos(compactos):
+    segmentos = []
+    for compacto in compactos:
+        segmento = {"start": compacto[0], "end": compacto[1], "text": compacto[2]}
+        if len(compacto) > 3:
+            segmento["words"] = [{"word": p, "start": inicio, "end": fim} for p, inicio, fim in compacto[3]]
+        segmentos.append(segmento)
+    return segmentos
+
+def carregar_do_cache(chave, pasta=PASTA_CACHE):
+    """
+    Retorna um dicionário com 'turnos' (diarização), 'segmentos' (Whisper),
+    'traducao' (ou None), 'duracao' do áudio e 'palavras' (se os segmentos têm tempos por palavra),
+    ou None se a chave não estiver no cache.
+    """
+    caminho = _caminho_entrada(chave, pasta)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with gzip.open(caminho, "rt", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if dados.get("versao") != VERSAO_PIPELINE:
+        return None
+    traducao = dados.get("traducao")
+    return {
+        "turnos": [tuple(t) for t in dados["turnos"]],
+        "segmentos": _expandir_segmentos(dados["segmentos"]),
+        "traducao": _expandir_segmentos(traducao) if traducao is not None else None,
+        "duracao": dados.get("duracao"),
+        "palavras": dados.get("palavras", False),
+    }
+
+def salvar_no_cache(chave, turnos, segmentos, traducao=None, duracao=None, pasta=PASTA_CACHE, palavras=False):
+    """Grava diarização, segmentos brutos e tradução em JSON compactado com gzip."""
+    caminho = _caminho_entrada(chave, pasta)
+    criar_pasta_cache(os.path.dirname(caminho))
+    dados = {
+        "versao": VERSAO_PIPELINE,
+        "turnos": [[round(inicio, 3), round(fim, 3), falante] for inicio, fim, falante in turnos],
+        "segmentos": _compactar_segmentos(segmentos),
+        "traducao": _compactar_segmentos(traducao) if traducao is not None else None,
+        "duracao": round(duracao, 3) if duracao else None,
+        "palavras": palavras,
+    }
+    with gravacao_atomica(caminho, "wb") as bruto, gzip.open(bruto, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(dados, f, ensure_ascii=False, separators=(",", ":"))
+    return caminho
@@ -0,0 +1,180 @@
+import os
+import json
+from datetime import timedelta
+
+# Buffer de escrita dos arquivos de saída
+TAMANHO_BUFFER = 64 * 1024
+
+AVISO_SEM_FALA = "AVISO: Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.\n"
+AVISO_SEM_FALA_INGLES = "WARNING: No speech segments were detected or all segments were filtered.\n"
+MENSAGEM_SEM_FALA = "Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados."
+
+def format_timestamp(seconds):
+    return str(timedelta(seconds=float(seconds))).split('.')[0]
+
+def _tempo_milissegundos(segundos, separador):
+    total = int(round(float(segundos) * 1000))
+    horas, resto = divmod(total, 3600000)
+    minutos, resto = divmod(resto, 60000)
+    segs, ms = divmod(resto, 1000)
+    return f"{horas:02d}:{minutos:02d}:{segs:02d}{separador}{ms:03d}"
+
+def formatar_linha(segmento, campo="text"):
+    """Linha no formato exibido na interface e gravado no TXT."""
+    return (f"[{format_timestamp(segmento['start'])} -> {format_timestamp(segmento['end'])}] "
+            f"{segmento['speaker']}: {segmento[campo]}\n\n")
+
+class EscritorTranscricao:
+    """
+    Grava os segmentos em um formato de arquivo. 'campo' escolhe o texto gravado
+    ("text" para a transcrição, "traducao" para a tradução); segmentos sem esse texto são pulados.
+    """
+    extensao = None
+
+    def __init__(self, caminho, campo="text", aviso_vazio=AVISO_SEM_FALA):
+        self.caminho = caminho
+        self.campo = campo
+        self.aviso_vazio = aviso_vazio
+        self.arquivo = open(caminho, "w", encoding="utf-8", buffering=TAMANHO_BUFFER)
+        self.escritos = 0
+
+    def iniciar(self):
+        pass
+
+    def escrever(self, segmento):
+        texto = segmento.get(self.campo)
+        if texto:
+            self.escritos += 1
+            self._escrever(segmento, texto)
+
+    def _escrever(self, segmento, texto):
+        raise NotImplementedError
+
+    def vazio(self):
+        pass
+
+    def fechar(self):
+        self.arquivo.close()
+
+class EscritorTXT(EscritorTranscricao):
+    extensao = "txt"
+
+    def _escrever(self, segmento, texto):
+        self.arquivo.write(formatar_linha(segmento, self.campo))
+
+    def vazio(self):
+        self.arquivo.write(self.aviso_vazio)
+
+class EscritorSRT(EscritorTranscricao):
+    extensao = "srt"
+
+    def _escrever(self, segmento, texto):
+        self.arquivo.write(
+            f"{self.escritos}\n{_tempo_milissegundos(segmento['start'], ',')} --> "
+            f"{_tempo_milissegundos(segmento['end'], ',')}\n{segmento['speaker']}: {texto}\n\n"
+        )
+
+class EscritorVTT(EscritorTranscricao):
+    extensao = "vtt"
+
+    def iniciar(self):
+        self.arquivo.write("WEBVTT\n\n")
+
+    def _escrever(self, segmento, texto):
+        self.arquivo.write(
+            f"{_tempo_milissegundos(segmento['start'], '.')} --> {_tempo_milissegundos(segmento['end'], '.')}\n"
+            f"<v {segmento['speaker']}>{texto}\n\n"
+        )
+
+class EscritorJSONL(EscritorTranscricao):
+    """Um objeto JSON por segmento, com os tempos de cada palavra quando disponíveis."""
+    extensao = "jsonl"
+
+    def _escrever(self, segmento, texto):
+        registro = {
+            "inicio": round(segmento["start"], 3),
+            "fim": round(segmento["end"], 3),
+            "falante": segmento["speaker"],
+            "texto": texto,
+        }
+        if self.campo == "text" and segmento.get("words"):
+            registro["palavras"] = [
+                {"palavra": p["word"], "inicio": round(p["start"], 3), "fim": round(p["end"], 3)}
+                for p in segmento["words"]
+            ]
+        self.arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+ESCRITORES = {
+    EscritorTXT.extensao: EscritorTXT,
+    EscritorSRT.extensao: EscritorSRT,
+    EscritorVTT.extensao: EscritorVTT,
+    EscritorJSONL.extensao: EscritorJSONL,
+}
+
+def criar_escritores(pasta, nome_base, formatos, traduzir=False):
+    """
+    Um escritor por formato (transcricao_<nome>.<ext>) e, com traduzir,
+    outro para a tradução em inglês (transcricao_<nome>_ingles.<ext>).
+    """
+    escritores = []
+    try:
+        for formato in formatos:
+            if formato not in ESCRITORES:
+                raise ValueError(f"Formato de saída desconhecido: {formato}")
+            classe = ESCRITORES[formato]
+            escritores.append(classe(os.path.join(pasta, f"transcricao_{nome_base}.{classe.extensao}")))
+            if traduzir:
+                escritores.append(classe(
+                    os.path.join(pasta, f"transcricao_{nome_base}_ingles.{classe.extensao}"),
+                    campo="traducao", aviso_vazio=AVISO_SEM_FALA_INGLES
+                ))
+    except BaseException:
+        for escritor in escritores:
+            escritor.fechar()
+        raise
+    return escritores
+
+def escrever_transcricao(segmentos, escritores):
+    """Percorre os segmentos uma única vez, repassando cada um a todos os escritores. Retorna os caminhos gravados."""
+    try:
+        for escritor in escritores:
+            escritor.iniciar()
+        for segmento in segmentos:
+            for escritor in escritores:
+                escritor.escrever(segmento)
+        for escritor in escritores:
+            if not escritor.escritos:
+                escritor.vazio()
+    finally:
+        for escritor in escritores:
+            escritor.fechar()
+    return [escritor.caminho for escritor in escritores]
+
+class VisaoTranscricao:
+    """
+    Visão da transcrição para a interface: guarda os segmentos e formata cada linha só quando pedida.
+    str() monta o texto completo uma vez (em tempo linear) e o reaproveita.
+    """
+    def __init__(self, segmentos, arquivos=()):
+        self.segmentos = segmentos
+        self.arquivos = list(arquivos)
+        self._texto = None
+
+    def __len__(self):
+        return len(self.segmentos)
+
+    def __getitem__(self, indice):
+        return formatar_linha(self.segmentos[indice])
+
+    def __iter__(self):
+        for segmento in self.segmentos:
+            yield formatar_linha(segmento)
+
+    def __str__(self):
+        if self._texto is None:
+            self._texto = "".join(self) if self.segmentos else MENSAGEM_SEM_FALA
+        return self._texto
+
+    def __getstate__(self):
+        # O texto montado não atravessa processos; é refeito sob demanda
+        return {**self.__dict__, "_texto": None}
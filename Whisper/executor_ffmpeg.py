@@ -0,0 +1,138 @@
+import time
+import threading
+import subprocess
+from collections import deque
+
+LINHAS_STDERR = 50
+TAMANHO_BLOCO = 1024 * 1024
+
+class ResultadoFFmpeg:
+    """Resultado de uma execução do FFmpeg, com os mesmos nomes usados por subprocess.run."""
+    def __init__(self, returncode, stderr, cancelado=False, tempo_esgotado=False):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.cancelado = cancelado
+        self.tempo_esgotado = tempo_esgotado
+
+def _converter_progresso(bloco, duracao_total):
+    """Transforma um bloco key=value do '-progress' em {tempo_s, velocidade, fps, percentual}."""
+    tempo_us = bloco.get("out_time_us") or bloco.get("out_time_ms")
+    try:
+        tempo_s = int(tempo_us) / 1_000_000 if tempo_us and tempo_us != "N/A" else None
+    except ValueError:
+        tempo_s = None
+    try:
+        velocidade = float(bloco.get("speed", "").rstrip("x"))
+    except ValueError:
+        velocidade = None
+    try:
+        fps = float(bloco.get("fps", ""))
+    except ValueError:
+        fps = None
+    percentual = None
+    if duracao_total and tempo_s is not None:
+        percentual = min(100.0, round(100 * tempo_s / duracao_total, 1))
+    return {
+        "tempo_s": tempo_s,
+        "velocidade": velocidade,
+        "fps": fps,
+        "percentual": percentual,
+        "fim": bloco.get("progress") == "end",
+    }
+
+def formatar_progresso(progresso):
+    """Texto curto de throughput, ex.: '00:01:23 processados (12.5x)'."""
+    partes = []
+    if progresso["tempo_s"] is not None:
+        segundos = int(progresso["tempo_s"])
+        partes.append(f"{segundos // 3600:02d}:{segundos // 60 % 60:02d}:{segundos % 60:02d} processados")
+    if progresso["velocidade"] is not None:
+        partes.append(f"({progresso['velocidade']:.1f}x)")
+    if progresso["fps"]:
+        partes.append(f"{progresso['fps']:.0f} fps")
+    return " ".join(partes)
+
+def executar_ffmpeg(comando, progresso_callback=None, cancelar=None, timeout=None, duracao_total=None,
+                    consumidor_stdout=None, linhas_stderr=LINHAS_STDERR):
+    """
+    Executa um comando FFmpeg lendo o progresso em tempo real.
+    - progresso_callback recebe dicionários com tempo_s, velocidade, fps e percentual
+      (percentual só quando duracao_total é informada).
+    - cancelar é um threading.Event; quando acionado, o processo é encerrado.
+    - timeout (segundos) encerra o processo se for excedido.
+    - consumidor_stdout recebe os blocos de bytes do stdout quando a saída vai para 'pipe:1';
+      nesse caso o progresso é lido do stderr.
+    Só as últimas linhas_stderr linhas do stderr são mantidas em memória.
+    """
+    canal_progresso = 'pipe:2' if consumidor_stdout else 'pipe:1'
+    comando = [comando[0], '-progress', canal_progresso, '-nostats'] + list(comando[1:])
+
+    try:
+        processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise RuntimeError("FFmpeg não está instalado ou não está acessível!")
+
+    cauda_stderr = deque(maxlen=linhas_stderr)
+    estado = {"cancelado": False, "tempo_esgotado": False}
+
+    def ler_linhas_progresso(fluxo, guardar_outras):
+        bloco = {}
+        for linha in iter(fluxo.readline, b""):
+            texto = linha.decode("utf-8", errors="replace").strip()
+            chave, separador, valor = texto.partition("=")
+            if separador and " " not in chave:
+                bloco[chave] = valor
+                if chave == "progress":
+                    if progresso_callback:
+                        progresso_callback(_converter_progresso(bloco, duracao_total))
+                    bloco = {}
+            elif guardar_outras and texto:
+                cauda_stderr.append(texto)
+
+    def ler_stderr():
+        if consumidor_stdout:
+            ler_linhas_progresso(processo.stderr, True)
+        else:
+            for linha in iter(processo.stderr.readline, b""):
+                texto = linha.decode("utf-8", errors="replace").rstrip()
+                if texto:
+                    cauda_stderr.append(texto)
+
+    def vigiar():
+        limite = time.monotonic() + timeout if timeout else None
+        while processo.poll() is None:
+            if cancelar is not None and cancelar.wait(0.2):
+                estado["cancelado"] = True
+            elif cancelar is None:
+                time.sleep(0.2)
+            if limite and time.monotonic() > limite:
+                estado["tempo_esgotado"] = True
+            if estado["cancelado"] or estado["tempo_esgotado"]:
+                processo.kill()
+                return
+
+    leitor_stderr = threading.Thread(target=ler_stderr, daemon=True)
+    vigia = threading.Thread(target=vigiar, daemon=True)
+    leitor_stderr.start()
+    vigia.start()
+    try:
+        if consumidor_stdout:
+            for bloco in iter(lambda: processo.stdout.read(TAMANHO_BLOCO), b""):
+                consumidor_stdout(bloco)
+        else:
+            ler_linhas_progresso(processo.stdout, False)
+        processo.wait()
+    except BaseException:
+        processo.kill()
+        processo.wait()
+        raise
+    finally:
+        leitor_stderr.join()
+        vigia.join()
+
+    stderr = "\n".join(cauda_stderr)
+    if estado["cancelado"]:
+        stderr = (stderr + "\nConversão cancelada.").strip()
+    elif estado["tempo_esgotado"]:
+        stderr = (stderr + f"\nTempo limite de {timeout}s excedido.").strip()
+    return ResultadoFFmpeg(processo.returncode, stderr, estado["cancelado"], estado["tempo_esgotado"])
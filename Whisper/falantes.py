@@ -0,0 +1,264 @@
+import os
+import json
+import sqlite3
+import argparse
+import numpy as np
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+FALANTES_DB_PATH = os.path.join(PASTA_SCRIPT, "falantes.db")
+
+# Similaridade de cosseno mínima para considerar que um rótulo da gravação é um falante conhecido.
+# Acima do limiar de agrupamento do pyannote: entre reuniões diferentes é melhor criar um falante
+# novo do que juntar duas pessoas.
+LIMIAR_SIMILARIDADE = 0.6
+PREFIXO_NOVO_FALANTE = "Falante"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS falantes (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    embedding BLOB NOT NULL,
+    ocorrencias INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS diarizacoes (
+    hash_audio TEXT NOT NULL,
+    configuracao TEXT NOT NULL,
+    turnos TEXT NOT NULL,
+    PRIMARY KEY (hash_audio, configuracao)
+);
+CREATE TABLE IF NOT EXISTS falantes_gravacao (
+    hash_audio TEXT NOT NULL,
+    configuracao TEXT NOT NULL,
+    rotulo TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    falante_id INTEGER,
+    PRIMARY KEY (hash_audio, configuracao, rotulo)
+);
+CREATE INDEX IF NOT EXISTS idx_falantes_gravacao_falante ON falantes_gravacao(falante_id);
+"""
+
+def _para_blob(vetor):
+    return np.asarray(vetor, dtype=np.float32).tobytes()
+
+def _de_blob(blob):
+    return np.frombuffer(blob, dtype=np.float32)
+
+def _normalizar(matriz):
+    normas = np.linalg.norm(matriz, axis=-1, keepdims=True)
+    return matriz / np.maximum(normas, 1e-12)
+
+class BancoFalantes:
+    """
+    Falantes conhecidos e diarizações já feitas, em SQLite.
+    - 'diarizacoes' guarda os turnos de cada gravação (pelo hash do áudio), para não diarizar de novo;
+    - 'falantes_gravacao' guarda o embedding de cada rótulo (SPEAKER_00...) da gravação e a quem ele foi associado;
+    - 'falantes' guarda o embedding médio de cada pessoa. A busca é por cosseno sobre uma
+      matriz NumPy normalizada, mantida em memória e refeita só quando os falantes mudam.
+    """
+    def __init__(self, caminho=FALANTES_DB_PATH, limiar=LIMIAR_SIMILARIDADE):
+        self.caminho = caminho
+        self.limiar = limiar
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.executescript(ESQUEMA)
+        self._indice = None
+
+    def fechar(self):
+        self.conexao.close()
+
+    def _matriz(self):
+        """(ids, matriz normalizada) dos falantes conhecidos."""
+        if self._indice is None:
+            linhas = self.conexao.execute("SELECT id, embedding FROM falantes ORDER BY id").fetchall()
+            ids = [linha["id"] for linha in linhas]
+            matriz = _normalizar(np.stack([_de_blob(l["embedding"]) for l in linhas])) if linhas else None
+            self._indice = (ids, matriz)
+        return self._indice
+
+    def diarizacao_em_cache(self, hash_audio, configuracao):
+        """Turnos [(inicio, fim, rotulo)] de uma diarização já feita, ou None."""
+        linha = self.conexao.execute(
+            "SELECT turnos FROM diarizacoes WHERE hash_audio = ? AND configuracao = ?", (hash_audio, configuracao)
+        ).fetchone()
+        if linha is None:
+            return None
+        return [tuple(t) for t in json.loads(linha["turnos"])]
+
+    def salvar_diarizacao(self, hash_audio, configuracao, turnos, embeddings):
+        """
+        Guarda os turnos e o embedding de cada rótulo ({rotulo: vetor}) de uma gravação.
+        Se a gravação já estava guardada (diarizada de novo, sem cache), cada rótulo mantém o falante
+        a que já tinha sido associado: a gravação não entra de novo na média nem nas ocorrências dele.
+        """
+        with self.conexao:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO diarizacoes (hash_audio, configuracao, turnos) VALUES (?, ?, ?)",
+                (hash_audio, configuracao, json.dumps([list(t) for t in turnos]))
+            )
+            associados = dict(self.conexao.execute(
+                "SELECT rotulo, falante_id FROM falantes_gravacao WHERE hash_audio = ? AND configuracao = ?",
+                (hash_audio, configuracao)
+            ).fetchall())
+            self.conexao.execute(
+                "DELETE FROM falantes_gravacao WHERE hash_audio = ? AND configuracao = ?", (hash_audio, configuracao)
+            )
+            self.conexao.executemany(
+                "INSERT INTO falantes_gravacao (hash_audio, configuracao, rotulo, embedding, falante_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((hash_audio, configuracao, rotulo, _para_blob(vetor), associados.get(rotulo))
+                 for rotulo, vetor in embeddings.items())
+            )
+
+    def buscar(self, embedding, limite=5):
+        """Falantes conhecidos mais parecidos com o embedding: [(nome, similaridade)]."""
+        ids, matriz = self._matriz()
+        if matriz is None:
+            return []
+        similaridades = matriz @ _normalizar(np.asarray(embedding, dtype=np.float32))
+        melhores = np.argsort(-similaridades)[:limite]
+        nomes = dict(self.conexao.execute("SELECT id, nome FROM falantes").fetchall())
+        return [(nomes[ids[i]], float(similaridades[i])) for i in melhores]
+
+    def identificar(self, hash_audio, configuracao):
+        """
+        Nome do falante conhecido de cada rótulo da gravação ({rotulo: nome}).
+        Rótulos ainda não associados são comparados com os falantes conhecidos (cada falante
+        no máximo uma vez por gravação, pelos pares mais parecidos primeiro); os que não passam
+        do limiar viram falantes novos. A associação fica gravada, então repetir a gravação não custa nada.
+        """
+        linhas = self.conexao.execute(
+            "SELECT rotulo, embedding, falante_id FROM falantes_gravacao WHERE hash_audio = ? AND configuracao = ?",
+            (hash_audio, configuracao)
+        ).fetchall()
+        pendentes = [l for l in linhas if l["falante_id"] is None]
+        if pendentes:
+            with self.conexao:
+                self._associar(hash_audio, configuracao, pendentes, {l["falante_id"] for l in linhas} - {None})
+        return dict(self.conexao.execute(
+            "SELECT g.rotulo, f.nome FROM falantes_gravacao g JOIN falantes f ON f.id = g.falante_id "
+            "WHERE g.hash_audio = ? AND g.configuracao = ?", (hash_audio, configuracao)
+        ).fetchall())
+
+    def _associar(self, hash_audio, configuracao, pendentes, usados):
+        vetores = _normalizar(np.stack([_de_blob(l["embedding"]) for l in pendentes]))
+        ids, matriz = self._matriz()
+        associacao = {}
+        if matriz is not None:
+            similaridades = vetores @ matriz.T
+            for posicao in np.argsort(-similaridades, axis=None):
+                i, j = np.unravel_index(posicao, similaridades.shape)
+                if similaridades[i, j] < self.limiar:
+                    break
+                if i in associacao or ids[j] in usados:
+                    continue
+                associacao[i] = ids[j]
+                usados.add(ids[j])
+
+        for i, linha in enumerate(pendentes):
+            if i in associacao:
+                falante_id = associacao[i]
+                anterior = self.conexao.execute(
+                    "SELECT embedding, ocorrencias FROM falantes WHERE id = ?", (falante_id,)
+                ).fetchone()
+                # Média dos embeddings normalizados de todas as gravações em que a pessoa apareceu
+                n = anterior["ocorrencias"]
+                media = (_de_blob(anterior["embedding"]) * n + vetores[i]) / (n + 1)
+                self.conexao.execute(
+                    "UPDATE falantes SET embedding = ?, ocorrencias = ? WHERE id = ?", (_para_blob(media), n + 1, falante_id)
+                )
+            else:
+                proximo = self.conexao.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM falantes").fetchone()[0]
+                falante_id = self.conexao.execute(
+                    "INSERT INTO falantes (nome, embedding) VALUES (?, ?)",
+                    (self._nome_livre(f"{PREFIXO_NOVO_FALANTE} {proximo}"), _para_blob(vetores[i]))
+                ).lastrowid
+            self.conexao.execute(
+                "UPDATE falantes_gravacao SET falante_id = ? WHERE hash_audio = ? AND configuracao = ? AND rotulo = ?",
+                (falante_id, hash_audio, configuracao, linha["rotulo"])
+            )
+        self._indice = None
+
+    def _nome_livre(self, nome):
+        base, n = nome, 2
+        while self.conexao.execute("SELECT 1 FROM falantes WHERE nome = ?", (nome,)).fetchone():
+            nome = f"{base} ({n})"
+            n += 1
+        return nome
+
+    def rotular_turnos(self, hash_audio, configuracao, turnos):
+        """Troca os rótulos da diarização (SPEAKER_00...) pelos nomes dos falantes identificados."""
+        nomes = self.identificar(hash_audio, configuracao)
+        return [(inicio, fim, nomes.get(rotulo, rotulo)) for inicio, fim, rotulo in turnos]
+
+    def listar(self):
+        return [dict(linha) for linha in self.conexao.execute(
+            "SELECT f.id, f.nome, f.ocorrencias, COUNT(DISTINCT g.hash_audio) AS gravacoes FROM falantes f "
+            "LEFT JOIN falantes_gravacao g ON g.falante_id = f.id GROUP BY f.id ORDER BY f.nome"
+        )]
+
+    def renomear(self, nome, novo_nome):
+        with self.conexao:
+            if self.conexao.execute("SELECT 1 FROM falantes WHERE nome = ?", (novo_nome,)).fetchone():
+                raise ValueError(f"Já existe um falante chamado {novo_nome}")
+            if not self.conexao.execute("UPDATE falantes SET nome = ? WHERE nome = ?", (novo_nome, nome)).rowcount:
+                raise ValueError(f"Falante não encontrado: {nome}")
+
+    def juntar(self, nome, destino):
+        """Junta dois falantes que são a mesma pessoa; o embedding fica com a média ponderada dos dois."""
+        with self.conexao:
+            origem = self.conexao.execute("SELECT * FROM falantes WHERE nome = ?", (nome,)).fetchone()
+            alvo = self.conexao.execute("SELECT * FROM falantes WHERE nome = ?", (destino,)).fetchone()
+            if origem is None or alvo is None:
+                raise ValueError(f"Falante não encontrado: {nome if origem is None else destino}")
+            if origem["id"] == alvo["id"]:
+                return
+            total = origem["ocorrencias"] + alvo["ocorrencias"]
+            media = (_de_blob(origem["embedding"]) * origem["ocorrencias"]
+                     + _de_blob(alvo["embedding"]) * alvo["ocorrencias"]) / total
+            self.conexao.execute(
+                "UPDATE falantes SET embedding = ?, ocorrencias = ? WHERE id = ?", (_para_blob(media), total, alvo["id"])
+            )
+            self.conexao.execute("UPDATE falantes_gravacao SET falante_id = ? WHERE falante_id = ?", (alvo["id"], origem["id"]))
+            self.conexao.execute("DELETE FROM falantes WHERE id = ?", (origem["id"],))
+        self._indice = None
+
+    def esquecer(self, nome):
+        """Remove um falante; as gravações dele voltam a ser identificadas na próxima transcrição."""
+        with self.conexao:
+            linha = self.conexao.execute("SELECT id FROM falantes WHERE nome = ?", (nome,)).fetchone()
+            if linha is None:
+                raise ValueError(f"Falante não encontrado: {nome}")
+            self.conexao.execute("UPDATE falantes_gravacao SET falante_id = NULL WHERE falante_id = ?", (linha["id"],))
+            self.conexao.execute("DELETE FROM falantes WHERE id = ?", (linha["id"],))
+        self._indice = None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerencia os falantes reconhecidos entre gravações.")
+    parser.add_argument("--banco", default=FALANTES_DB_PATH)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("listar", help="Lista os falantes conhecidos")
+    renomear = comandos.add_parser("renomear", help="Dá um nome a um falante (ex.: 'Falante 3' 'Maria')")
+    renomear.add_argument("nome")
+    renomear.add_argument("novo_nome")
+    juntar = comandos.add_parser("juntar", help="Junta dois falantes que são a mesma pessoa")
+    juntar.add_argument("nome")
+    juntar.add_argument("destino")
+    esquecer = comandos.add_parser("esquecer", help="Remove um falante")
+    esquecer.add_argument("nome")
+    args = parser.parse_args()
+
+    banco = BancoFalantes(args.banco)
+    try:
+        if args.comando == "listar":
+            for f in banco.listar():
+                print(f"{f['nome']}: {f['gravacoes']} gravação(ões)")
+        elif args.comando == "renomear":
+            banco.renomear(args.nome, args.novo_nome)
+        elif args.comando == "juntar":
+            banco.juntar(args.nome, args.destino)
+        elif args.comando == "esquecer":
+            banco.esquecer(args.nome)
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
+    finally:
+        banco.fechar()
@@ -0,0 +1,260 @@
+import os
+import sys
+import time
+import getpass
+import sqlite3
+import tempfile
+import threading
+
+def _nome_usuario():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return str(os.getuid()) if hasattr(os, "getuid") else "padrao"
+
+# Reservas ativas dos processos do usuário (transcrições, conversões FFmpeg, lotes). Um arquivo por
+# usuário: o de outro usuário no mesmo /tmp seria somente leitura
+RESERVAS_DB_PATH = os.path.join(tempfile.gettempdir(), f"estagio_reservas_cpu_{_nome_usuario()}.db")
+# Variáveis lidas pelas bibliotecas de álgebra linear (OpenMP, MKL, OpenBLAS) ao serem carregadas
+VARIAVEIS_THREADS = ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS reservas (
+    id INTEGER PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    tipo TEXT NOT NULL,
+    peso REAL NOT NULL,
+    threads INTEGER NOT NULL,
+    inicio REAL NOT NULL
+);
+"""
+
+def total_nucleos():
+    """Núcleos que este processo pode usar (respeita a afinidade de CPU, quando disponível)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+def _processo_vivo(pid):
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION; STILL_ACTIVE = 259
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        codigo = ctypes.c_ulong()
+        try:
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(codigo))
+        finally:
+            kernel32.CloseHandle(handle)
+        return codigo.value == 259
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def aplicar_ambiente(threads):
+    """
+    Limita as threads de OpenMP/MKL/OpenBLAS deste processo e dos processos que ele abrir.
+    Só tem efeito antes de torch/numpy serem importados: essas bibliotecas leem as variáveis ao carregar.
+    """
+    os.environ.update({variavel: str(threads) for variavel in VARIAVEIS_THREADS})
+
+def comando_com_threads(comando, threads, saidas=None):
+    """
+    Insere '-threads N' no comando FFmpeg antes de cada arquivo de saída
+    (por padrão, o último argumento).
+    """
+    saidas = set(saidas or [comando[-1]])
+    resultado = []
+    for i, argumento in enumerate(comando):
+        if argumento in saidas and (i == 0 or comando[i - 1] != "-i"):
+            resultado += ["-threads", str(threads)]
+        resultado.append(argumento)
+    return resultado
+
+def _tempos_cpu():
+    tempos = os.times()
+    # children_* só conta filhos já encerrados (FFmpeg, por exemplo); no Windows ficam zerados
+    return tempos.user + tempos.system + tempos.children_user + tempos.children_system
+
+class MedidorUtilizacao:
+    """
+    Tempo de CPU do processo (e dos filhos já encerrados) em relação ao tempo de parede.
+    Com vários trabalhos no mesmo processo o tempo de CPU é de todos eles juntos.
+    """
+    def __init__(self):
+        self._inicio_parede = time.perf_counter()
+        self._inicio_cpu = _tempos_cpu()
+        self.cpu_externo_s = 0.0
+
+    def adicionar_cpu(self, segundos):
+        """Soma CPU medida em outro processo que ainda não terminou (ex.: diarização em paralelo)."""
+        self.cpu_externo_s += segundos or 0.0
+
+    def resultado(self, threads, nucleos=None):
+        parede = time.perf_counter() - self._inicio_parede
+        cpu = _tempos_cpu() - self._inicio_cpu + self.cpu_externo_s
+        nucleos = nucleos or total_nucleos()
+        return {
+            "threads": threads,
+            "tempo_cpu_total_s": round(cpu, 3),
+            # Fração do orçamento de threads efetivamente ocupada, e da máquina inteira
+            "utilizacao_cpu": round(cpu / (parede * threads), 3) if parede > 0 else None,
+            "utilizacao_maquina": round(cpu / (parede * nucleos), 3) if parede > 0 else None,
+        }
+
+class Reserva:
+    """
+    Fatia dos núcleos de um trabalho em andamento. threads é recalculado a cada leitura,
+    então quem consulta entre etapas acompanha trabalhos que começaram ou terminaram.
+    Ao sair do bloco 'with', relatorio traz as threads e a utilização alcançada.
+    """
+    def __init__(self, governador, id_reserva, tipo, peso, threads):
+        self.governador = governador
+        self.id = id_reserva
+        self.tipo = tipo
+        self.peso = peso
+        self.threads_iniciais = threads
+        self.medidor = MedidorUtilizacao()
+        self.relatorio = None
+
+    @property
+    def threads(self):
+        # Sem registro no banco (ver GovernadorRecursos._sem_banco): fica com o orçamento inicial
+        if self.id is None:
+            return self.threads_iniciais
+        return self.governador.orcamento(self.peso, reserva=self.id)
+
+    def adicionar_cpu(self, segundos):
+        self.medidor.adicionar_cpu(segundos)
+
+    def liberar(self):
+        if self.relatorio is None:
+            self.governador._remover(self.id)
+            self.relatorio = self.medidor.resultado(self.threads_iniciais, self.governador.nucleos)
+        return self.relatorio
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+class GovernadorRecursos:
+    """
+    Divide os núcleos da máquina entre os trabalhos pesados ativos, inclusive de outros processos.
+    Cada trabalho reserva um peso; o orçamento de threads dele é a parte proporcional dos núcleos
+    entre todas as reservas vivas (no mínimo 1). Reservas de processos encerrados são descartadas.
+    Se o banco de reservas falhar, os trabalhos seguem com todos os núcleos em vez de falhar.
+    """
+    def __init__(self, caminho=RESERVAS_DB_PATH, nucleos=None):
+        self.caminho = caminho
+        self.nucleos = nucleos or total_nucleos()
+        # A conexão é compartilhada pelas threads do processo (ex.: o pool de conversões)
+        self._trava = threading.RLock()
+        self._avisado = False
+        self.conexao = None
+        try:
+            self.conexao = sqlite3.connect(caminho, timeout=10, check_same_thread=False, isolation_level=None)
+            self.conexao.row_factory = sqlite3.Row
+            self.conexao.executescript(ESQUEMA)
+        except sqlite3.Error as e:
+            self._sem_banco(e)
+            self.conexao = None
+
+    def fechar(self):
+        if self.conexao is not None:
+            self.conexao.close()
+
+    def _sem_banco(self, erro):
+        if not self._avisado:
+            self._avisado = True
+            print(f"Banco de reservas de CPU indisponível ({erro}); usando todos os núcleos.", file=sys.stderr)
+
+    def _limpar_mortas(self):
+        pids = [linha["pid"] for linha in self.conexao.execute("SELECT DISTINCT pid FROM reservas")]
+        for pid in pids:
+            if not _processo_vivo(pid):
+                self.conexao.execute("DELETE FROM reservas WHERE pid = ?", (pid,))
+
+    def _peso_total(self):
+        return self.conexao.execute("SELECT COALESCE(SUM(peso), 0) FROM reservas").fetchone()[0]
+
+    def orcamento(self, peso=1, reserva=None):
+        """Threads para um trabalho de 'peso'; sem 'reserva', como se ele começasse agora."""
+        if self.conexao is None:
+            return self.nucleos
+        try:
+            with self._trava:
+                total = self._peso_total() + (0 if reserva is not None else peso)
+        except sqlite3.Error as e:
+            self._sem_banco(e)
+            return self.nucleos
+        return max(1, int(self.nucleos * peso / total)) if total else self.nucleos
+
+    def reservar(self, tipo, peso=1):
+        """Registra um trabalho e devolve a Reserva (use com 'with' para liberar ao terminar)."""
+        if self.conexao is None:
+            return Reserva(self, None, tipo, peso, self.nucleos)
+        with self._trava:
+            try:
+                self.conexao.execute("BEGIN IMMEDIATE")
+                try:
+                    self._limpar_mortas()
+                    threads = self.orcamento(peso)
+                    id_reserva = self.conexao.execute(
+                        "INSERT INTO reservas (pid, tipo, peso, threads, inicio) VALUES (?, ?, ?, ?, ?)",
+                        (os.getpid(), tipo, peso, threads, time.time())
+                    ).lastrowid
+                    self.conexao.execute("COMMIT")
+                except BaseException:
+                    if self.conexao.in_transaction:
+                        self.conexao.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                self._sem_banco(e)
+                return Reserva(self, None, tipo, peso, self.nucleos)
+        return Reserva(self, id_reserva, tipo, peso, threads)
+
+    def _remover(self, id_reserva):
+        if self.conexao is None or id_reserva is None:
+            return
+        try:
+            with self._trava:
+                self.conexao.execute("DELETE FROM reservas WHERE id = ?", (id_reserva,))
+        except sqlite3.Error as e:
+            # Fica para trás até o processo encerrar; _limpar_mortas descarta depois
+            self._sem_banco(e)
+
+    def ativos(self):
+        """Reservas vivas, das mais antigas para as mais novas."""
+        if self.conexao is None:
+            return []
+        with self._trava:
+            self._limpar_mortas()
+            return [dict(linha) for linha in self.conexao.execute("SELECT * FROM reservas ORDER BY inicio")]
+
+_governador = None
+
+def obter_governador():
+    """Governador compartilhado pelo processo."""
+    global _governador
+    if _governador is None:
+        _governador = GovernadorRecursos()
+    return _governador
+
+if __name__ == "__main__":
+    governador = obter_governador()
+    ativos = governador.ativos()
+    print(f"{governador.nucleos} núcleos, {len(ativos)} trabalho(s) ativo(s); "
+          f"um novo trabalho receberia {governador.orcamento()} thread(s).")
+    for r in ativos:
+        print(f"  pid {r['pid']}: {r['tipo']} (peso {r['peso']:g}) há {time.time() - r['inicio']:.0f}s, "
+              f"agora com {governador.orcamento(r['peso'], reserva=r['id'])} thread(s)")
@@ -0,0 +1,146 @@
+import os
+import json
+import sqlite3
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+HISTORICO_DB_PATH = os.path.join(PASTA_SCRIPT, "historico.db")
+HISTORICO_JSON_PATH = os.path.join(PASTA_SCRIPT, "historico.json")
+PASTA_TRANSCRICOES = os.path.join(PASTA_SCRIPT, "Transcricoes")
+
+# user_version do banco: 1 = historico.json já importado
+VERSAO_MIGRACAO_JSON = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY,
+    arquivo TEXT NOT NULL UNIQUE,
+    nome TEXT NOT NULL,
+    data TEXT NOT NULL,
+    idioma TEXT NOT NULL DEFAULT 'auto'
+);
+CREATE INDEX IF NOT EXISTS idx_historico_data ON historico(data);
+CREATE INDEX IF NOT EXISTS idx_historico_idioma ON historico(idioma);
+CREATE VIRTUAL TABLE IF NOT EXISTS historico_fts USING fts5(
+    nome, conteudo, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+def _ler_conteudo(arquivo, nome):
+    """Texto da transcrição; se o caminho gravado não existe mais, procura pelo nome em Transcricoes/."""
+    for caminho in (arquivo, os.path.join(PASTA_TRANSCRICOES, nome)):
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8", errors="replace") as f:
+                return f.read()
+    return ""
+
+def _padrao_contem(texto):
+    """Padrão LIKE (com ESCAPE '\\') que encontra o texto em qualquer posição."""
+    return "%" + texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def consulta_fts(texto):
+    """Converte o texto digitado em uma consulta FTS5: todas as palavras, cada uma como prefixo."""
+    palavras = texto.replace('"', " ").split()
+    return " ".join(f'"{p}"*' for p in palavras)
+
+class HistoricoTranscricoes:
+    """
+    Histórico de transcrições em SQLite. Os metadados ficam em 'historico' (indexada por
+    data e idioma) e o nome e o conteúdo das transcrições em 'historico_fts' (busca por texto).
+    """
+    def __init__(self, caminho=HISTORICO_DB_PATH):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.executescript(ESQUEMA)
+
+    def fechar(self):
+        self.conexao.close()
+
+    def migrar_json(self, caminho_json=HISTORICO_JSON_PATH):
+        """Importa o historico.json antigo uma única vez. Retorna quantos itens foram importados."""
+        versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao >= VERSAO_MIGRACAO_JSON:
+            return 0
+        importados = 0
+        if os.path.exists(caminho_json):
+            try:
+                with open(caminho_json, "r", encoding="utf-8") as f:
+                    itens = json.load(f)
+            except Exception:
+                itens = []
+            with self.conexao:
+                # O JSON está do mais recente para o mais antigo
+                for h in reversed(itens):
+                    self._inserir(h["arquivo"], h["nome"], h["data"], h.get("idioma", "auto"),
+                                  _ler_conteudo(h["arquivo"], h["nome"]))
+                    importados += 1
+        self.conexao.execute(f"PRAGMA user_version = {VERSAO_MIGRACAO_JSON}")
+        return importados
+
+    def _inserir(self, arquivo, nome, data, idioma, conteudo):
+        anterior = self.conexao.execute("SELECT id FROM historico WHERE arquivo = ?", (arquivo,)).fetchone()
+        if anterior:
+            self._remover(anterior["id"])
+        cursor = self.conexao.execute(
+            "INSERT INTO historico (arquivo, nome, data, idioma) VALUES (?, ?, ?, ?)",
+            (arquivo, nome, data, idioma or "auto")
+        )
+        self.conexao.execute(
+            "INSERT INTO historico_fts (rowid, nome, conteudo) VALUES (?, ?, ?)",
+            (cursor.lastrowid, nome, conteudo)
+        )
+
+    def _remover(self, id_item):
+        self.conexao.execute("DELETE FROM historico WHERE id = ?", (id_item,))
+        self.conexao.execute("DELETE FROM historico_fts WHERE rowid = ?", (id_item,))
+
+    def adicionar(self, arquivo, nome, data, idioma, conteudo=None, max_itens=None):
+        """Adiciona (ou substitui, pelo caminho do arquivo) um item e descarta os mais antigos além de max_itens."""
+        if conteudo is None:
+            conteudo = _ler_conteudo(arquivo, nome)
+        with self.conexao:
+            self._inserir(arquivo, nome, data, idioma, conteudo)
+            if max_itens:
+                excedentes = self.conexao.execute(
+                    "SELECT id FROM historico ORDER BY data DESC, id DESC LIMIT -1 OFFSET ?", (max_itens,)
+                ).fetchall()
+                for linha in excedentes:
+                    self._remover(linha["id"])
+
+    def remover(self, id_item):
+        with self.conexao:
+            self._remover(id_item)
+
+    def limpar(self):
+        with self.conexao:
+            self.conexao.execute("DELETE FROM historico")
+            self.conexao.execute("DELETE FROM historico_fts")
+
+    def buscar(self, texto="", idiomas=(), limite=None):
+        """
+        Itens do mais recente para o mais antigo. Com texto, filtra pelos que contêm o texto no nome
+        ou na data (em qualquer posição, como o filtro antigo), que têm todas as palavras (como prefixo)
+        no nome ou no conteúdo, ou cujo idioma está em 'idiomas'.
+        """
+        texto = texto.strip()
+        sql = "SELECT id, arquivo, nome, data, idioma FROM historico"
+        parametros = []
+        if texto:
+            condicoes = ["nome LIKE ? ESCAPE '\\'", "data LIKE ? ESCAPE '\\'"]
+            parametros += [_padrao_contem(texto)] * 2
+            consulta = consulta_fts(texto)
+            if consulta:
+                condicoes.append("id IN (SELECT rowid FROM historico_fts WHERE historico_fts MATCH ?)")
+                parametros.append(consulta)
+            if idiomas:
+                condicoes.append(f"idioma IN ({', '.join('?' for _ in idiomas)})")
+                parametros += list(idiomas)
+            sql += " WHERE " + " OR ".join(condicoes)
+        sql += " ORDER BY data DESC, id DESC"
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        return [dict(linha) for linha in self.conexao.execute(sql, parametros)]
+
+    def total(self):
+        return self.conexao.execute("SELECT COUNT(*) FROM historico").fetchone()[0]
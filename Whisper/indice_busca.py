@@ -0,0 +1,245 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+
+from historico_db import consulta_fts
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+INDICE_DB_PATH = os.path.join(PASTA_SCRIPT, "indice_transcricoes.db")
+PASTA_TRANSCRICOES = os.path.join(PASTA_SCRIPT, "Transcricoes")
+
+# Quando a mesma transcrição existe em vários formatos, indexa o primeiro desta lista
+# (JSONL, SRT e VTT têm milissegundos; o TXT só tem segundos)
+PRIORIDADE_FORMATOS = ["jsonl", "srt", "vtt", "txt"]
+SUFIXO_TRADUCAO = "_ingles"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS arquivos (
+    id INTEGER PRIMARY KEY,
+    caminho TEXT NOT NULL UNIQUE,
+    transcricao TEXT NOT NULL,
+    traducao INTEGER NOT NULL DEFAULT 0,
+    modificado_ns INTEGER NOT NULL,
+    tamanho INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segmentos (
+    id INTEGER PRIMARY KEY,
+    arquivo_id INTEGER NOT NULL,
+    inicio_ms INTEGER NOT NULL,
+    fim_ms INTEGER NOT NULL,
+    falante TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segmentos_arquivo ON segmentos(arquivo_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segmentos_fts USING fts5(
+    texto, falante, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+"""
+
+_LINHA_TXT = re.compile(r"^\[(\d+):(\d\d):(\d\d) -> (\d+):(\d\d):(\d\d)\] ([^:]+): (.*)$")
+_TEMPO_LEGENDA = re.compile(r"(\d+):(\d\d):(\d\d)[,.](\d{3})")
+_FALANTE_VTT = re.compile(r"^<v ([^>]+)>(.*)$")
+
+def _ms(horas, minutos, segundos, milissegundos=0):
+    return ((int(horas) * 60 + int(minutos)) * 60 + int(segundos)) * 1000 + int(milissegundos)
+
+def _ler_txt(arquivo):
+    for linha in arquivo:
+        m = _LINHA_TXT.match(linha.rstrip("\n"))
+        if m:
+            yield _ms(*m.group(1, 2, 3)), _ms(*m.group(4, 5, 6)), m.group(7), m.group(8)
+
+def _ler_legenda(arquivo):
+    """Blocos de SRT ou VTT: a linha com '-->' traz os tempos e as seguintes, até a linha vazia, o texto."""
+    tempos = None
+    linhas = []
+    for linha in list(arquivo) + [""]:
+        linha = linha.strip()
+        if "-->" in linha:
+            tempos = _TEMPO_LEGENDA.findall(linha)
+            linhas = []
+        elif linha:
+            linhas.append(linha)
+        elif tempos and len(tempos) == 2 and linhas:
+            texto = " ".join(linhas)
+            m = _FALANTE_VTT.match(texto)
+            if m:
+                falante, texto = m.groups()
+            else:
+                falante, _, resto = texto.partition(": ")
+                falante, texto = (falante, resto) if resto else ("", texto)
+            yield _ms(*tempos[0]), _ms(*tempos[1]), falante, texto
+            tempos = None
+
+def _ler_jsonl(arquivo):
+    for linha in arquivo:
+        if linha.strip():
+            r = json.loads(linha)
+            yield int(round(r["inicio"] * 1000)), int(round(r["fim"] * 1000)), r.get("falante", ""), r["texto"]
+
+LEITORES = {"jsonl": _ler_jsonl, "srt": _ler_legenda, "vtt": _ler_legenda, "txt": _ler_txt}
+
+def arquivos_para_indexar(pasta=PASTA_TRANSCRICOES):
+    """Um arquivo por transcrição (e por tradução) da pasta, no formato de maior precisão disponível."""
+    escolhidos = {}
+    if not os.path.isdir(pasta):
+        return []
+    for nome in os.listdir(pasta):
+        base, ext = os.path.splitext(nome)
+        ext = ext[1:].lower()
+        if not base.startswith("transcricao_") or ext not in LEITORES:
+            continue
+        atual = escolhidos.get(base)
+        if atual is None or PRIORIDADE_FORMATOS.index(ext) < PRIORIDADE_FORMATOS.index(atual[1]):
+            escolhidos[base] = (nome, ext)
+    return sorted(os.path.join(pasta, nome) for nome, _ in escolhidos.values())
+
+class IndiceTranscricoes:
+    """
+    Índice de busca por segmento de todas as transcrições da pasta Transcricoes/.
+    'arquivos' guarda a data e o tamanho de cada arquivo indexado, para atualizar só o que mudou;
+    'segmentos' guarda falante e tempos (ms) e 'segmentos_fts' o texto pesquisável.
+    """
+    def __init__(self, caminho=INDICE_DB_PATH):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.executescript(ESQUEMA)
+
+    def fechar(self):
+        self.conexao.close()
+
+    def _remover_arquivo(self, id_arquivo):
+        self.conexao.execute(
+            "DELETE FROM segmentos_fts WHERE rowid IN (SELECT id FROM segmentos WHERE arquivo_id = ?)", (id_arquivo,)
+        )
+        self.conexao.execute("DELETE FROM segmentos WHERE arquivo_id = ?", (id_arquivo,))
+        self.conexao.execute("DELETE FROM arquivos WHERE id = ?", (id_arquivo,))
+
+    def _indexar_arquivo(self, caminho, info):
+        base, ext = os.path.splitext(os.path.basename(caminho))
+        traducao = base.endswith(SUFIXO_TRADUCAO)
+        transcricao = base[len("transcricao_"):]
+        if traducao:
+            transcricao = transcricao[:-len(SUFIXO_TRADUCAO)]
+        with open(caminho, "r", encoding="utf-8", errors="replace") as f:
+            segmentos = list(LEITORES[ext[1:].lower()](f))
+        cursor = self.conexao.execute(
+            "INSERT INTO arquivos (caminho, transcricao, traducao, modificado_ns, tamanho) VALUES (?, ?, ?, ?, ?)",
+            (caminho, transcricao, int(traducao), info.st_mtime_ns, info.st_size)
+        )
+        id_arquivo = cursor.lastrowid
+        # Os ids dos segmentos são reservados em sequência para servirem também de rowid no FTS
+        primeiro = self.conexao.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM segmentos").fetchone()[0]
+        self.conexao.executemany(
+            "INSERT INTO segmentos (id, arquivo_id, inicio_ms, fim_ms, falante) VALUES (?, ?, ?, ?, ?)",
+            ((primeiro + i, id_arquivo, inicio, fim, falante) for i, (inicio, fim, falante, _) in enumerate(segmentos))
+        )
+        self.conexao.executemany(
+            "INSERT INTO segmentos_fts (rowid, texto, falante) VALUES (?, ?, ?)",
+            ((primeiro + i, texto, falante) for i, (_, _, falante, texto) in enumerate(segmentos))
+        )
+        return len(segmentos)
+
+    def atualizar(self, pasta=PASTA_TRANSCRICOES):
+        """
+        Sincroniza o índice com a pasta: indexa arquivos novos, reindexa os que mudaram
+        (data ou tamanho) e remove os que sumiram. Retorna (arquivos indexados, arquivos removidos).
+        """
+        pasta = os.path.abspath(pasta)
+        indexados = {
+            linha["caminho"]: linha for linha in self.conexao.execute(
+                "SELECT id, caminho, modificado_ns, tamanho FROM arquivos WHERE substr(caminho, 1, ?) = ?",
+                (len(pasta) + 1, pasta + os.sep)
+            )
+        }
+        novos = removidos = 0
+        with self.conexao:
+            for caminho in arquivos_para_indexar(pasta):
+                info = os.stat(caminho)
+                anterior = indexados.pop(caminho, None)
+                if anterior and (anterior["modificado_ns"], anterior["tamanho"]) == (info.st_mtime_ns, info.st_size):
+                    continue
+                if anterior:
+                    self._remover_arquivo(anterior["id"])
+                self._indexar_arquivo(caminho, info)
+                novos += 1
+            # Sobraram os arquivos apagados e os substituídos por um formato mais preciso
+            for linha in indexados.values():
+                self._remover_arquivo(linha["id"])
+                removidos += 1
+        return novos, removidos
+
+    def buscar(self, texto, falante=None, traducao=None, limite=50):
+        """
+        Segmentos com todas as palavras do texto (como prefixo), dos mais relevantes para os menos.
+        Cada resultado traz transcrição, arquivo, tempos em ms, falante, texto e o texto com os
+        termos encontrados entre colchetes ('destaque'). traducao=True/False restringe à tradução ou ao original.
+        """
+        consulta = consulta_fts(texto)
+        if not consulta:
+            return []
+        sql = """
+            SELECT a.transcricao, a.caminho AS arquivo, a.traducao, s.inicio_ms, s.fim_ms, s.falante,
+                   segmentos_fts.texto, highlight(segmentos_fts, 0, '[', ']') AS destaque
+            FROM segmentos_fts
+            JOIN segmentos s ON s.id = segmentos_fts.rowid
+            JOIN arquivos a ON a.id = s.arquivo_id
+            WHERE segmentos_fts MATCH ?
+        """
+        parametros = [f"texto : ({consulta})"]
+        if falante:
+            sql += " AND s.falante = ?"
+            parametros.append(falante)
+        if traducao is not None:
+            sql += " AND a.traducao = ?"
+            parametros.append(int(traducao))
+        sql += " ORDER BY segmentos_fts.rank LIMIT ?"
+        parametros.append(limite)
+        return [dict(linha) for linha in self.conexao.execute(sql, parametros)]
+
+    def totais(self):
+        """(arquivos, segmentos) indexados."""
+        return (self.conexao.execute("SELECT COUNT(*) FROM arquivos").fetchone()[0],
+                self.conexao.execute("SELECT COUNT(*) FROM segmentos").fetchone()[0])
+
+def _formatar_ms(ms):
+    segundos, ms = divmod(ms, 1000)
+    minutos, segundos = divmod(segundos, 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas:d}:{minutos:02d}:{segundos:02d}.{ms:03d}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca trechos em todas as transcrições de Transcricoes/.")
+    parser.add_argument("texto", nargs="?", help="Palavras procuradas (todas, como prefixo)")
+    parser.add_argument("--falante", help="Só segmentos deste falante (ex.: SPEAKER_00)")
+    parser.add_argument("--traducao", choices=["sim", "nao"], help="Só traduções ou só originais")
+    parser.add_argument("-n", "--limite", type=int, default=20)
+    parser.add_argument("--pasta", default=PASTA_TRANSCRICOES)
+    parser.add_argument("--indice", default=INDICE_DB_PATH)
+    parser.add_argument("--json", action="store_true", help="Um resultado JSON por linha")
+    args = parser.parse_args()
+
+    indice = IndiceTranscricoes(args.indice)
+    inicio = time.perf_counter()
+    novos, removidos = indice.atualizar(args.pasta)
+    if novos or removidos or not args.texto:
+        arquivos, segmentos = indice.totais()
+        print(f"Índice atualizado em {(time.perf_counter() - inicio) * 1000:.0f} ms: {novos} arquivo(s) indexado(s), "
+              f"{removidos} removido(s); {arquivos} arquivos, {segmentos} segmentos.", file=sys.stderr)
+    if args.texto:
+        inicio = time.perf_counter()
+        traducao = None if args.traducao is None else args.traducao == "sim"
+        resultados = indice.buscar(args.texto, args.falante, traducao, args.limite)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        for r in resultados:
+            if args.json:
+                print(json.dumps(r, ensure_ascii=False))
+            else:
+                print(f"{r['transcricao']}{' (inglês)' if r['traducao'] else ''} "
+                      f"[{_formatar_ms(r['inicio_ms'])} -> {_formatar_ms(r['fim_ms'])}] {r['falante']}: {r['destaque']}")
+        print(f"{len(resultados)} resultado(s) em {duracao_ms:.1f} ms.", file=sys.stderr)
+    indice.fechar()
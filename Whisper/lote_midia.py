@@ -0,0 +1,205 @@
+import os
+import csv
+import json
+import time
+import argparse
+
+from Processamento_video import (
+    criar_diretorio_saida, verificar_ffmpeg, verifica_arquivo_local, obter_video,
+    planejar_conversao, registrar_saida, imprimir_utilizacao
+)
+from sondagem_midia import sondar_midia
+from cache_midia import CacheMidia
+from cache_transcricao import gravacao_atomica
+from perfis_conversao import resolver_perfis, compilar_comando
+from agendador_conversao import executar_tarefas
+
+def _sem_progresso(progresso):
+    pass
+
+def _normalizar_formatos(valor):
+    if isinstance(valor, (list, tuple)):
+        return sorted(str(f).strip() for f in valor if str(f).strip())
+    separador = ';' if ';' in valor else ','
+    return sorted(f.strip() for f in valor.split(separador) if f.strip())
+
+def ler_manifesto(caminho):
+    """
+    Lê o manifesto de entrada. CSV com colunas 'origem' e 'formatos' (ex.: "1;3;6")
+    ou JSON Lines com {"origem": ..., "formatos": [...]}.
+    """
+    jobs = []
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        if caminho.lower().endswith((".jsonl", ".json")):
+            registros = [json.loads(linha) for linha in f if linha.strip()]
+        else:
+            registros = list(csv.DictReader(f))
+    for registro in registros:
+        origem = (registro.get("origem") or "").strip().strip('"\'')
+        if origem:
+            jobs.append({"origem": origem, "formatos": _normalizar_formatos(registro.get("formatos") or [])})
+    return jobs
+
+def assinatura_origem(origem):
+    """Identifica o conteúdo da origem: tamanho e data de modificação para arquivos, a própria URL para links."""
+    if verifica_arquivo_local(origem):
+        info = os.stat(origem)
+        return f"{info.st_size}:{info.st_mtime_ns}"
+    return origem
+
+def _chave_job(job):
+    return job["origem"], tuple(job["formatos"])
+
+def carregar_resultados(caminho):
+    """Resultados de uma execução anterior, indexados por (origem, formatos)."""
+    resultados = {}
+    if os.path.exists(caminho):
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                if linha.strip():
+                    registro = json.loads(linha)
+                    resultados[_chave_job(registro)] = registro
+    return resultados
+
+def resultado_ainda_valido(anterior, job):
+    """Um job pode ser pulado se já deu certo com a mesma origem, os mesmos formatos e as saídas continuam intactas."""
+    if not anterior or anterior.get("status") not in ("ok", "pulado"):
+        return False
+    if anterior.get("formatos") != job["formatos"]:
+        return False
+    if anterior.get("assinatura") != assinatura_origem(job["origem"]):
+        return False
+    for saida in anterior.get("saidas", {}).values():
+        if not os.path.exists(saida["caminho"]) or os.path.getsize(saida["caminho"]) != saida["tamanho"]:
+            return False
+    return True
+
+def preparar_job(job, diretorio_saida, cache):
+    """
+    Obtém o vídeo de uma origem e separa os formatos já gerados (cache) dos que faltam.
+    Devolve (registro, plano): plano é (hash da origem, [(chave, caminho)] a gerar), ou None em caso de erro.
+    """
+    inicio = time.perf_counter()
+    registro = {
+        "origem": job["origem"], "formatos": job["formatos"], "assinatura": None,
+        "status": "erro", "video": None, "duracao_midia_s": None, "saidas": {},
+        "tempo_s": None, "erro": None,
+    }
+    plano = None
+    try:
+        registro["assinatura"] = assinatura_origem(job["origem"])
+        caminho_video = obter_video(job["origem"], diretorio_saida, _sem_progresso)
+        if not caminho_video:
+            raise RuntimeError("Falha ao obter o vídeo")
+        registro["video"] = caminho_video
+        info = sondar_midia(caminho_video)
+        registro["duracao_midia_s"] = info and info["duracao"]
+
+        hash_origem, reaproveitados, destinos = planejar_conversao(
+            caminho_video, diretorio_saida, job["formatos"], cache=cache
+        )
+        registro["saidas"] = {
+            chave: {"caminho": caminho, "tamanho": os.path.getsize(caminho)}
+            for chave, caminho in reaproveitados.items()
+        }
+        plano = (hash_origem, destinos)
+    except Exception as e:
+        registro["erro"] = str(e)
+    registro["tempo_s"] = round(time.perf_counter() - inicio, 3)
+    return registro, plano
+
+def concluir_job(registro, job, plano, resultado, cache):
+    """Confere as saídas da passada do FFmpeg (resultado de executar_tarefas, ou None se não houve) e fecha o registro."""
+    hash_origem, destinos = plano
+    for chave, caminho in destinos:
+        if os.path.exists(caminho) and os.path.getsize(caminho) > 0:
+            registro["saidas"][chave] = {"caminho": caminho, "tamanho": os.path.getsize(caminho)}
+            registrar_saida(cache, hash_origem, chave, caminho)
+    if resultado is not None:
+        registro["tempo_s"] = round(registro["tempo_s"] + (resultado["duracao_s"] or 0), 3)
+
+    faltando = [nome for nome in resolver_perfis(job["formatos"]) if nome not in registro["saidas"]]
+    if not registro["saidas"]:
+        registro["erro"] = f"Falha na conversão dos formatos: {resultado['erro']}" if resultado else \
+            "Falha na conversão dos formatos"
+    elif faltando:
+        registro["erro"] = f"Formatos não gerados: {', '.join(faltando)}"
+    else:
+        registro["status"] = "ok"
+    return registro
+
+def processar_manifesto(caminho_manifesto, caminho_resultados, diretorio_saida=None, paralelismo=None, refazer=False):
+    """
+    Processa todos os jobs do manifesto e grava um registro JSON por job em caminho_resultados.
+    As origens são obtidas uma a uma; depois cada job vira uma tarefa (todos os formatos numa única
+    passada do FFmpeg) no agendador de conversões, com até 'paralelismo' tarefas simultâneas.
+    Jobs cujas saídas já existem e correspondem à entrada são pulados (a menos que refazer=True).
+    """
+    if not verificar_ffmpeg():
+        return []
+    if diretorio_saida:
+        os.makedirs(diretorio_saida, exist_ok=True)
+    else:
+        diretorio_saida = criar_diretorio_saida()
+    jobs = ler_manifesto(caminho_manifesto)
+    anteriores = {} if refazer else carregar_resultados(caminho_resultados)
+    cache = CacheMidia(diretorio_saida)
+
+    # Indexados pela linha do manifesto: a mesma origem pode aparecer com formatos diferentes
+    registros = {}
+    planos = {}
+    tarefas = {}
+    planejados = set()
+    for indice, job in enumerate(jobs):
+        anterior = anteriores.get(_chave_job(job))
+        if resultado_ainda_valido(anterior, job):
+            registros[indice] = {**anterior, "status": "pulado"}
+            print(f"Pulando (já processado): {job['origem']}")
+            continue
+        registros[indice], planos[indice] = preparar_job(job, diretorio_saida, cache)
+        if planos[indice] is None:
+            print(f"[{indice + 1}/{len(jobs)}] {job['origem']} -> ERRO: {registros[indice]['erro']}")
+            continue
+        # A mesma origem em outra linha pode pedir uma saída já planejada (ex.: o MP3 base): gera uma vez só
+        destinos = [(chave, caminho) for chave, caminho in planos[indice][1] if caminho not in planejados]
+        planejados.update(caminho for _, caminho in destinos)
+        if destinos:
+            tarefas[indice] = (compilar_comando(registros[indice]["video"], destinos), [c for _, c in destinos])
+
+    if tarefas:
+        print(f"\nConvertendo {len(tarefas)} origem(ns)...")
+    resultados = executar_tarefas(tarefas, paralelismo, utilizacao_callback=imprimir_utilizacao)
+    for indice, plano in planos.items():
+        if plano is None:
+            continue
+        registro = concluir_job(registros[indice], jobs[indice], plano, resultados.get(indice), cache)
+        situacao = "OK" if registro["status"] == "ok" else f"ERRO: {registro['erro']}"
+        print(f"[{indice + 1}/{len(jobs)}] {registro['origem']} -> {situacao}")
+
+    protegidos = [r["video"] for r in registros.values() if r.get("video")]
+    protegidos += [s["caminho"] for r in registros.values() for s in r.get("saidas", {}).values()]
+    cache.aplicar_limite(protegidos)
+
+    with gravacao_atomica(caminho_resultados, encoding="utf-8") as f:
+        for indice in range(len(jobs)):
+            f.write(json.dumps(registros[indice], ensure_ascii=False) + "\n")
+    return [registros[indice] for indice in range(len(jobs))]
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Processa em lote as origens de um manifesto CSV/JSONL.")
+    parser.add_argument("manifesto", help="CSV (origem,formatos) ou JSONL com as origens a processar")
+    parser.add_argument("-r", "--resultados", help="Manifesto de resultados (JSONL); padrão: <manifesto>.resultados.jsonl")
+    parser.add_argument("-o", "--saida", help="Diretório de saída; padrão: saida_audio/")
+    parser.add_argument("-j", "--paralelismo", type=int, default=None,
+                        help="Conversões simultâneas; padrão: uma por núcleo, dentro do orçamento de CPU")
+    parser.add_argument("--refazer", action="store_true", help="Ignora resultados anteriores e processa tudo de novo")
+    args = parser.parse_args(argumentos)
+
+    caminho_resultados = args.resultados or os.path.splitext(args.manifesto)[0] + ".resultados.jsonl"
+    registros = processar_manifesto(args.manifesto, caminho_resultados, args.saida, args.paralelismo, args.refazer)
+    erros = sum(1 for r in registros if r["status"] == "erro")
+    print(f"\n{len(registros)} job(s), {erros} com erro. Resultados em: {caminho_resultados}")
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+METRICAS_PATH = os.path.join(PASTA_SCRIPT, "metricas.jsonl")
+
+NOMES_ETAPAS = {
+    "cache": "Cache",
+    "extracao": "Extração",
+    "vad": "VAD",
+    "diarizacao": "Diarização",
+    "identificacao": "Falantes",
+    "carregamento_modelo": "Modelo",
+    "transcricao": "Transcrição",
+    "traducao": "Tradução",
+    "combinacao": "Combinação",
+    "escrita": "Escrita",
+}
+
+def pico_memoria_mb():
+    """
+    Pico de memória residente em MB desde o início do processo (None se não for possível medir).
+    Só cresce: serve para o job inteiro, não para atribuir memória a uma etapa.
+    """
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB, macOS em bytes
+        return round(pico / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+def memoria_atual_mb():
+    """Memória residente do processo agora, em MB (None se não for possível medir)."""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+        return round(paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+class MedidorEtapas:
+    """
+    Mede tempo de parede, tempo de CPU e memória residente no início e no fim de cada etapa
+    de um job de transcrição, e o pico de memória do processo no total. Grava em JSON Lines.
+    """
+    def __init__(self, arquivo, caminho_log=METRICAS_PATH, **contexto):
+        self.job = uuid.uuid4().hex[:12]
+        self.arquivo = arquivo
+        self.caminho_log = caminho_log
+        self.contexto = contexto
+        self.etapas = []
+        self.duracao_audio = None
+        self._inicio_parede = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio_parede = time.perf_counter()
+        inicio_cpu = time.process_time()
+        rss_inicio = memoria_atual_mb()
+        try:
+            yield
+        finally:
+            self.etapas.append({
+                "etapa": nome,
+                "tempo_parede_s": round(time.perf_counter() - inicio_parede, 3),
+                "tempo_cpu_s": round(time.process_time() - inicio_cpu, 3),
+                "rss_inicio_mb": rss_inicio,
+                "rss_fim_mb": memoria_atual_mb(),
+            })
+
+    def adicionar_etapa(self, nome, tempo_parede_s, tempo_cpu_s=None, rss_inicio_mb=None, rss_fim_mb=None):
+        """Registra uma etapa medida fora deste processo (ex.: diarização em paralelo)."""
+        self.etapas.append({
+            "etapa": nome,
+            "tempo_parede_s": tempo_parede_s,
+            "tempo_cpu_s": tempo_cpu_s,
+            "rss_inicio_mb": rss_inicio_mb,
+            "rss_fim_mb": rss_fim_mb,
+        })
+
+    def resumo(self):
+        tempo_total = time.perf_counter() - self._inicio_parede
+        fator = None
+        if self.duracao_audio:
+            fator = round(tempo_total / self.duracao_audio, 3)
+        return {
+            "job": self.job,
+            "arquivo": self.arquivo,
+            "etapas": list(self.etapas),
+            "tempo_parede_s": round(tempo_total, 3),
+            "tempo_cpu_s": round(time.process_time() - self._inicio_cpu, 3),
+            "pico_rss_mb": pico_memoria_mb(),
+            "duracao_audio_s": round(self.duracao_audio, 3) if self.duracao_audio else None,
+            "fator_tempo_real": fator,
+            **self.contexto,
+        }
+
+    def registrar(self):
+        """Anexa um registro por etapa e um registro 'total' ao log de métricas; retorna o resumo."""
+        resumo = self.resumo()
+        data = datetime.now().isoformat(timespec="seconds")
+        base = {"job": self.job, "data": data, "arquivo": self.arquivo, **self.contexto}
+        try:
+            with open(self.caminho_log, "a", encoding="utf-8") as f:
+                for etapa in self.etapas:
+                    f.write(json.dumps({**base, **etapa}, ensure_ascii=False) + "\n")
+                total = {k: v for k, v in resumo.items() if k != "etapas"}
+                f.write(json.dumps({**total, "data": data, "etapa": "total"}, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+        return resumo
+
+def formatar_resumo(resumo):
+    """Texto curto para a barra de status: tempo por etapa e fator de tempo real."""
+    partes = [
+        f"{NOMES_ETAPAS.get(e['etapa'], e['etapa'])} {e['tempo_parede_s']:.1f}s"
+        for e in resumo["etapas"]
+    ]
+    partes.append(f"Total {resumo['tempo_parede_s']:.1f}s")
+    if resumo.get("fator_tempo_real") is not None:
+        partes.append(f"RTF {resumo['fator_tempo_real']:.2f}")
+    if resumo.get("pico_rss_mb") is not None:
+        partes.append(f"Pico do processo {resumo['pico_rss_mb']:.0f} MB")
+    if resumo.get("utilizacao_cpu") is not None:
+        partes.append(f"CPU {resumo['utilizacao_cpu']:.0%} de {resumo['threads']} threads")
+    return " | ".join(partes)
@@ -0,0 +1,124 @@
+# Ganho aplicado ao áudio base antes de todos os perfis
+GANHO_BASE = 'volume=2.0'
+
+PERFIS = {}
+
+def registrar_perfil(nome, prefixo, extensao, codec, taxa=None, canais=None, filtros=(), argumentos=(),
+                     opcao=None, descricao=""):
+    """
+    Adiciona (ou substitui) um perfil no registro.
+    - filtros: estágios de filtro do FFmpeg aplicados depois do ganho base, em ordem
+    - taxa: sample rate de saída, aplicado como estágio 'aresample' (compartilhável entre perfis)
+    - argumentos: opções extras do encoder (bitrate, qualidade...)
+    - opcao: atalho numérico usado no menu interativo
+    """
+    PERFIS[nome] = {
+        'nome': nome,
+        'prefixo': prefixo,
+        'extensao': extensao,
+        'codec': codec,
+        'taxa': taxa,
+        'canais': canais,
+        'filtros': list(filtros),
+        'argumentos': list(argumentos),
+        'opcao': opcao,
+        'descricao': descricao,
+    }
+    return PERFIS[nome]
+
+registrar_perfil('audio_base', 'audio', 'mp3', 'libmp3lame', taxa=44100,
+                 argumentos=['-b:a', '192k'], descricao="MP3 base (192k)")
+registrar_perfil('telefonia', 'telefonia', 'wav', 'pcm_s16le', taxa=8000, canais=1,
+                 filtros=['volume=3.0', 'highpass=f=300', 'lowpass=f=3400'],
+                 opcao='1', descricao="Padrão Telefonia (WAV 8kHz)")
+registrar_perfil('alta_qualidade', 'hq', 'flac', 'flac', taxa=96000,
+                 argumentos=['-bits_per_raw_sample', '24'],
+                 opcao='2', descricao="Alta Qualidade (FLAC 96kHz)")
+registrar_perfil('podcast', 'podcast', 'm4a', 'aac', taxa=44100,
+                 filtros=['loudnorm'], argumentos=['-b:a', '192k'],
+                 opcao='3', descricao="Podcast (M4A)")
+registrar_perfil('streaming', 'stream', 'ogg', 'libvorbis', taxa=48000,
+                 argumentos=['-q:a', '6'],
+                 opcao='4', descricao="Streaming (OGG)")
+registrar_perfil('radio', 'radio', 'wav', 'pcm_s16le', taxa=44100, canais=2,
+                 filtros=['acompressor=threshold=-16dB:ratio=4', 'volume=2'],
+                 opcao='5', descricao="Rádio FM (WAV)")
+registrar_perfil('whatsapp', 'whatsapp', 'ogg', 'libopus', taxa=48000,
+                 filtros=['volume=1.5'], argumentos=['-b:a', '128k'],
+                 opcao='6', descricao="WhatsApp (OGG/OPUS)")
+
+def perfis_do_menu():
+    """Perfis com atalho numérico, na ordem do menu."""
+    return sorted((p for p in PERFIS.values() if p['opcao']), key=lambda p: p['opcao'])
+
+def resolver_perfis(formatos_selecionados):
+    """Converte opções do menu ('1'..'6') ou nomes de perfil em nomes, na ordem do registro."""
+    selecionados = {str(f).strip() for f in formatos_selecionados}
+    return [
+        nome for nome, perfil in PERFIS.items()
+        if nome in selecionados or (perfil['opcao'] and perfil['opcao'] in selecionados)
+    ]
+
+def estagios_filtro(perfil, ganho_base=True):
+    """Sequência de estágios do grafo até o encoder do perfil."""
+    estagios = [GANHO_BASE] if ganho_base else []
+    estagios += perfil['filtros']
+    if perfil['taxa']:
+        estagios.append(f"aresample={perfil['taxa']}")
+    return estagios
+
+def argumentos_encoder(perfil):
+    argumentos = []
+    if perfil['canais']:
+        argumentos += ['-ac', str(perfil['canais'])]
+    return argumentos + ['-c:a', perfil['codec']] + perfil['argumentos']
+
+def compilar_comando(caminho_origem, destinos, ganho_base=True):
+    """
+    Compila um plano com vários perfis em um único comando FFmpeg.
+    'destinos' é uma lista de (nome_do_perfil, caminho). Estágios iniciais iguais entre
+    perfis formam uma árvore: cada estágio roda uma vez e asplit distribui o resultado.
+    """
+    raiz = {'filhos': {}, 'saidas': []}
+    for indice, (nome, _) in enumerate(destinos):
+        no = raiz
+        for estagio in estagios_filtro(PERFIS[nome], ganho_base):
+            no = no['filhos'].setdefault(estagio, {'filhos': {}, 'saidas': []})
+        no['saidas'].append(indice)
+
+    grafo = []
+    rotulos_saida = {}
+    contador = [0]
+
+    def novo_rotulo():
+        contador[0] += 1
+        return f'n{contador[0]}'
+
+    def emitir(no, entrada):
+        consumidores = [('filtro', estagio, filho) for estagio, filho in no['filhos'].items()]
+        consumidores += [('saida', indice, None) for indice in no['saidas']]
+        if len(consumidores) == 1:
+            entradas = [entrada]
+        else:
+            entradas = [novo_rotulo() for _ in consumidores]
+            grafo.append(f"[{entrada}]asplit={len(consumidores)}" + ''.join(f'[{r}]' for r in entradas))
+        for rotulo, (tipo, valor, filho) in zip(entradas, consumidores):
+            if tipo == 'saida':
+                rotulos_saida[valor] = rotulo
+            else:
+                saida = novo_rotulo()
+                grafo.append(f"[{rotulo}]{valor}[{saida}]")
+                emitir(filho, saida)
+
+    emitir(raiz, '0:a:0')
+
+    comando = ['ffmpeg', '-y', '-i', caminho_origem]
+    mapeamentos = []
+    for indice, (nome, caminho) in enumerate(destinos):
+        rotulo = rotulos_saida[indice]
+        # Sem nenhum estágio, o stream de entrada é mapeado direto
+        mapa = rotulo if rotulo == '0:a:0' else f'[{rotulo}]'
+        mapeamentos += ['-map', mapa] + argumentos_encoder(PERFIS[nome]) + [caminho]
+    if grafo:
+        comando += ['-filter_complex', ';'.join(grafo)]
+    return comando + mapeamentos
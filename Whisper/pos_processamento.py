@@ -0,0 +1,82 @@
+from collections import Counter, deque
+
+# Quantos segmentos mantidos anteriores são comparados com o atual
+JANELA_REPETICAO = 4
+# Tamanho (em palavras) dos n-gramas usados para reconhecer trechos repetidos
+TAMANHO_NGRAMA = 3
+# Fração dos n-gramas do segmento que já apareceram na janela para ele ser considerado repetição
+LIMIAR_REPETICAO = 0.8
+# Diferença máxima de tamanho para o teste de "um contém o outro" com o segmento anterior
+DIFERENCA_MAXIMA_CONTIDO = 10
+
+BASE_HASH = 1_000_003
+MODULO_HASH = (1 << 61) - 1
+
+class _TabelaNormalizacao(dict):
+    """
+    Tabela para str.translate: minúsculas, mantém letras, números e espaços e descarta o resto.
+    Cada caractere é classificado só na primeira vez que aparece.
+    """
+    def __missing__(self, codigo):
+        caractere = chr(codigo)
+        valor = caractere.lower() if caractere.isalnum() or caractere.isspace() else None
+        self[codigo] = valor
+        return valor
+
+_TABELA = _TabelaNormalizacao()
+
+def normalizar_texto(texto):
+    """Texto em minúsculas, sem pontuação e com espaços simples, em uma única passada."""
+    return " ".join(texto.translate(_TABELA).split())
+
+def hashes_ngramas(palavras, n=TAMANHO_NGRAMA):
+    """Conjunto de hashes de todos os n-gramas de palavras, com hash rolante (tempo linear)."""
+    if len(palavras) < n:
+        return set()
+    valores = [hash(p) & MODULO_HASH for p in palavras]
+    potencia = pow(BASE_HASH, n - 1, MODULO_HASH)
+    atual = 0
+    for valor in valores[:n]:
+        atual = (atual * BASE_HASH + valor) % MODULO_HASH
+    resultado = {atual}
+    for i in range(n, len(valores)):
+        atual = ((atual - valores[i - n] * potencia) * BASE_HASH + valores[i]) % MODULO_HASH
+        resultado.add(atual)
+    return resultado
+
+def _contido(atual, anterior):
+    return (abs(len(atual) - len(anterior)) <= DIFERENCA_MAXIMA_CONTIDO
+            and (atual in anterior or anterior in atual))
+
+def remover_repeticoes(segmentos, janela=JANELA_REPETICAO, n=TAMANHO_NGRAMA, limiar=LIMIAR_REPETICAO):
+    """
+    Remove segmentos que repetem o que já foi dito, como os laços que o Whisper gera em silêncio.
+    Um segmento é descartado se:
+    - contém ou está contido no segmento mantido anterior (com tamanhos parecidos), ou
+    - pelo menos 'limiar' dos seus n-gramas já aparecem nos últimos 'janela' segmentos mantidos,
+      o que pega laços que voltam dois ou três segmentos atrás.
+    Cada segmento é normalizado e tem seus n-gramas calculados uma única vez: tempo linear no total de palavras.
+    """
+    mantidos = []
+    recentes = deque()
+    contagem = Counter()
+    anterior = None
+    for segmento in segmentos:
+        texto = normalizar_texto(segmento["text"])
+        if anterior is not None and _contido(texto, anterior):
+            continue
+        ngramas = hashes_ngramas(texto.split(), n)
+        if ngramas and sum(1 for h in ngramas if h in contagem) >= limiar * len(ngramas):
+            continue
+
+        mantidos.append(segmento)
+        anterior = texto
+        recentes.append(ngramas)
+        contagem.update(ngramas)
+        if len(recentes) > janela:
+            antigos = recentes.popleft()
+            contagem.subtract(antigos)
+            for h in antigos:
+                if contagem[h] <= 0:
+                    del contagem[h]
+    return mantidos
@@ -0,0 +1,69 @@
+import os
+import json
+import subprocess
+
+# Containers em que um stream AAC pode ser mantido como está num .mp4
+CONTAINERS_MP4 = ('mov', 'mp4', 'm4a', '3gp', '3g2', 'mj2')
+# O ffprobe dá o mesmo format_name para MOV, 3GP e M4A; a marca (major_brand) é que separa o MP4 de fato
+MARCAS_NAO_MP4 = ('qt', '3g', 'm4a', 'm4b', 'mj2')
+
+def sondar_midia(caminho):
+    """
+    Lê container, duração e codecs com o ffprobe.
+    Retorna {"formato", "marca", "extensao", "duracao", "video", "audio"}
+    (video/audio são None se não houver stream) ou None se o ffprobe falhar.
+    """
+    comando = [
+        'ffprobe',
+        '-v', 'error',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        caminho
+    ]
+    try:
+        processo = subprocess.run(comando, capture_output=True, text=True)
+        if processo.returncode != 0:
+            return None
+        dados = json.loads(processo.stdout)
+    except Exception:
+        return None
+
+    info = {
+        "formato": dados.get("format", {}).get("format_name", ""),
+        "marca": dados.get("format", {}).get("tags", {}).get("major_brand", "").strip().lower(),
+        "extensao": os.path.splitext(caminho)[1].lower(),
+        "duracao": float(dados.get("format", {}).get("duration") or 0) or None,
+        "video": None,
+        "audio": None,
+    }
+    for stream in dados.get("streams", []):
+        tipo = stream.get("codec_type")
+        if tipo == "video" and info["video"] is None and not stream.get("disposition", {}).get("attached_pic"):
+            info["video"] = {"codec": stream.get("codec_name")}
+        elif tipo == "audio" and info["audio"] is None:
+            info["audio"] = {
+                "codec": stream.get("codec_name"),
+                "taxa": int(stream.get("sample_rate") or 0),
+                "canais": int(stream.get("channels") or 0),
+            }
+    return info
+
+def e_container_mp4(info):
+    """Arquivo .mp4 de fato: família ISO/MOV no ffprobe, extensão .mp4 e marca que não é de MOV/3GP/M4A."""
+    if not any(nome in CONTAINERS_MP4 for nome in info["formato"].split(",")):
+        return False
+    marca = info.get("marca", "")
+    return info.get("extensao") == ".mp4" and not marca.startswith(MARCAS_NAO_MP4)
+
+def planejar_remux(info):
+    """
+    Decide o que fazer para ter um .mp4 com áudio AAC:
+    'pular' (a origem já serve), 'copiar' (só troca o container) ou 'recodificar_audio'.
+    Sem stream de áudio não há o que recodificar, mas o container ainda é trocado.
+    """
+    if info["audio"] is None:
+        return 'copiar'
+    if info["audio"]["codec"] != "aac":
+        return 'recodificar_audio'
+    return 'pular' if e_container_mp4(info) else 'copiar'
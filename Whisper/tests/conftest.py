@@ -0,0 +1,20 @@
+import os
+import sys
+import types
+
+# Os módulos do projeto ficam soltos na pasta Whisper/ e se importam pelo nome
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# O yt-dlp só é usado nos downloads, que os testes substituem por um falso;
+# sem ele instalado, um módulo vazio basta para importar Processamento_video
+try:
+    import yt_dlp  # noqa: F401
+except ImportError:
+    sys.modules["yt_dlp"] = types.ModuleType("yt_dlp")
+
+# O python-dotenv só é usado ao transcrever (para ler o token do .env);
+# sem ele instalado, um load_dotenv vazio basta para importar transcricao_core
+try:
+    import dotenv  # noqa: F401
+except ImportError:
+    sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+import agendador_conversao
+from agendador_conversao import executar_tarefas, numero_trabalhadores
+from executor_ffmpeg import ResultadoFFmpeg
+from governador_recursos import GovernadorRecursos, total_nucleos
+
+@pytest.fixture
+def governador(tmp_path, monkeypatch):
+    governador = GovernadorRecursos(str(tmp_path / "reservas.db"), nucleos=4)
+    monkeypatch.setattr(agendador_conversao, "obter_governador", lambda: governador)
+    yield governador
+    governador.fechar()
+
+@pytest.fixture
+def comandos(monkeypatch):
+    """
+    Substitui o FFmpeg: o último argumento é o arquivo de saída e o quarto diz o que simular
+    ('ok', 'vazio', 'erro', 'tempo', 'cancelado'). Guarda os comandos recebidos.
+    """
+    recebidos = []
+
+    def executar(comando, cancelar=None, timeout=None):
+        recebidos.append(comando)
+        acao, saida = comando[3], comando[-1]
+        if acao == "ok":
+            with open(saida, "wb") as f:
+                f.write(b"audio")
+        elif acao == "vazio":
+            open(saida, "wb").close()
+        elif acao == "erro":
+            return ResultadoFFmpeg(1, "linha 1\nInvalid data found")
+        elif acao == "tempo":
+            return ResultadoFFmpeg(-9, "", tempo_esgotado=True)
+        elif acao == "cancelado":
+            return ResultadoFFmpeg(-9, "", cancelado=True)
+        return ResultadoFFmpeg(0, "")
+    monkeypatch.setattr(agendador_conversao, "executar_ffmpeg", executar)
+    return recebidos
+
+def _tarefa(tmp_path, nome, acao):
+    saida = str(tmp_path / f"{nome}.mp3")
+    return ["ffmpeg", "-i", "origem.mp4", acao, saida], saida
+
+def test_numero_trabalhadores():
+    assert numero_trabalhadores(3) == 3
+    assert numero_trabalhadores() == total_nucleos()
+
+def test_sem_tarefas():
+    assert executar_tarefas({}) == {}
+
+def test_erros_coletados_por_tarefa(tmp_path, governador, comandos):
+    tarefas = {nome: _tarefa(tmp_path, nome, nome) for nome in ("ok", "vazio", "erro", "tempo")}
+    relatorios = []
+    resultados = executar_tarefas(tarefas, timeout=5, utilizacao_callback=relatorios.append)
+
+    assert resultados["ok"]["caminho"] == tarefas["ok"][1] and resultados["ok"]["erro"] is None
+    assert resultados["vazio"]["erro"] == "Arquivo gerado está vazio"
+    assert resultados["erro"]["erro"] == "Invalid data found"
+    assert resultados["tempo"]["erro"] == "Tempo limite de 5s excedido"
+    assert all(r["duracao_s"] is not None for r in resultados.values())
+    assert len(relatorios) == 1 and governador.ativos() == []
+
+def test_threads_divididas_entre_as_tarefas(tmp_path, governador, comandos):
+    tarefas = {str(i): _tarefa(tmp_path, str(i), "ok") for i in range(6)}
+    resultados = executar_tarefas(tarefas, max_trabalhadores=2)
+    # 4 núcleos para 2 tarefas simultâneas; '-threads' entra antes do arquivo de saída
+    assert {r["threads"] for r in resultados.values()} == {2}
+    assert all(c[-3:-1] == ["-threads", "2"] for c in comandos)
+
+def test_cancelamento(tmp_path, governador, comandos):
+    cancelar = threading.Event()
+    cancelar.set()
+    resultados = executar_tarefas({"a": _tarefa(tmp_path, "a", "ok")}, cancelar=cancelar)
+    assert resultados["a"]["erro"] == "Conversão cancelada"
+    assert comandos == []
+
+    resultados = executar_tarefas({"b": _tarefa(tmp_path, "b", "cancelado")}, cancelar=threading.Event())
+    assert resultados["b"]["erro"] == "Conversão cancelada"
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pytest
+
+import audio_memoria
+from audio_memoria import AudioDecodificado, abrir_audio_mapeado, decodificar_audio
+from executor_ffmpeg import ResultadoFFmpeg
+
+def _ffmpeg_falso(amostras, tamanho_bloco=1000, returncode=0, sobra=b""):
+    """Substitui executar_ffmpeg: entrega as amostras ao consumidor do stdout em blocos."""
+    dados = np.asarray(amostras, dtype=np.float32).tobytes() + sobra
+
+    def executar(comando, progresso_callback=None, cancelar=None, consumidor_stdout=None):
+        for i in range(0, len(dados), tamanho_bloco):
+            consumidor_stdout(dados[i:i + tamanho_bloco])
+        return ResultadoFFmpeg(returncode, "erro simulado" if returncode else "")
+    return executar
+
+def test_audio_curto_fica_em_memoria(monkeypatch):
+    amostras = np.linspace(-1, 1, 800, dtype=np.float32)
+    monkeypatch.setattr(audio_memoria, "executar_ffmpeg", _ffmpeg_falso(amostras, sobra=b"\x01\x02"))
+    audio = decodificar_audio("x.wav", taxa=100)
+    assert audio.caminho_mmap is None
+    np.testing.assert_array_equal(audio.amostras, amostras)
+    assert audio.duracao == 8.0
+
+def test_audio_longo_vai_para_memmap(monkeypatch, tmp_path):
+    amostras = np.arange(5000, dtype=np.float32)
+    monkeypatch.setattr(audio_memoria, "LIMITE_MEMORIA_BYTES", 4096)
+    monkeypatch.setattr(audio_memoria, "executar_ffmpeg", _ffmpeg_falso(amostras))
+    audio = decodificar_audio("x.wav", pasta_temp=str(tmp_path))
+    assert isinstance(audio.amostras, np.memmap)
+    assert os.path.dirname(audio.caminho_mmap) == str(tmp_path)
+    np.testing.assert_array_equal(audio.amostras, amostras)
+    caminho = audio.caminho_mmap
+    audio.fechar()
+    assert not os.path.exists(caminho)
+
+def test_erro_do_ffmpeg_remove_o_memmap(monkeypatch, tmp_path):
+    monkeypatch.setattr(audio_memoria, "LIMITE_MEMORIA_BYTES", 16)
+    monkeypatch.setattr(audio_memoria, "executar_ffmpeg", _ffmpeg_falso(np.ones(100), returncode=1))
+    with pytest.raises(RuntimeError, match="erro simulado"):
+        decodificar_audio("x.wav", pasta_temp=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+def test_para_arquivo_e_abrir_mapeado(tmp_path):
+    amostras = np.random.default_rng(0).standard_normal(1234).astype(np.float32)
+    with AudioDecodificado(amostras, 16000) as audio:
+        caminho = audio.para_arquivo(str(tmp_path))
+        assert audio.para_arquivo(str(tmp_path)) == caminho
+        mapeado = abrir_audio_mapeado(caminho)
+        np.testing.assert_array_equal(mapeado.amostras, amostras)
+        # Copy-on-write: alterar o array no outro lado não mexe no arquivo
+        mapeado.amostras[0] = 99.0
+        np.testing.assert_array_equal(np.fromfile(caminho, dtype=np.float32), amostras)
+        del mapeado
+    assert not os.path.exists(caminho)
+
+def test_abrir_mapeado_arquivo_vazio(tmp_path):
+    caminho = tmp_path / "vazio.f32"
+    caminho.write_bytes(b"")
+    assert len(abrir_audio_mapeado(str(caminho)).amostras) == 0
@@ -0,0 +1,70 @@
+import os
+import json
+
+import cache_midia
+from cache_midia import CacheMidia, gerar_chave
+
+def _arquivo(pasta, nome, tamanho):
+    caminho = pasta / nome
+    caminho.write_bytes(b"x" * tamanho)
+    return str(caminho)
+
+def test_busca_e_registro(tmp_path):
+    cache = CacheMidia(str(tmp_path))
+    chave = gerar_chave("abc", {"codec": "mp3"})
+    assert cache.buscar(chave) is None
+    caminho = _arquivo(tmp_path, "a.mp3", 10)
+    cache.registrar(chave, caminho)
+    assert cache.buscar(chave) == os.path.abspath(caminho)
+    assert chave != gerar_chave("abc", {"codec": "wav"})
+
+def test_arquivo_alterado_sai_do_indice(tmp_path):
+    cache = CacheMidia(str(tmp_path))
+    caminho = _arquivo(tmp_path, "a.mp3", 10)
+    cache.registrar("k", caminho)
+    _arquivo(tmp_path, "a.mp3", 11)
+    assert cache.buscar("k") is None
+    assert "k" not in json.loads((tmp_path / cache_midia.NOME_INDICE).read_text(encoding="utf-8"))
+
+def test_acerto_recente_nao_regrava_o_indice(tmp_path):
+    cache = CacheMidia(str(tmp_path))
+    cache.registrar("k", _arquivo(tmp_path, "a.mp3", 10))
+    indice = tmp_path / cache_midia.NOME_INDICE
+    antes = indice.stat().st_mtime_ns
+    os.utime(indice, ns=(antes - 10**9, antes - 10**9))
+    cache.buscar("k")
+    assert indice.stat().st_mtime_ns == antes - 10**9
+
+def test_limite_so_apaga_arquivos_do_indice(tmp_path):
+    cache = CacheMidia(str(tmp_path), limite_bytes=25)
+    alheio = _arquivo(tmp_path, "ferias.mp4", 1000)
+    antigo = _arquivo(tmp_path, "antigo.mp3", 10)
+    medio = _arquivo(tmp_path, "medio.mp3", 10)
+    novo = _arquivo(tmp_path, "novo.mp3", 10)
+    for chave, caminho in [("antigo", antigo), ("medio", medio), ("novo", novo)]:
+        cache.registrar(chave, caminho)
+    indice = json.loads((tmp_path / cache_midia.NOME_INDICE).read_text(encoding="utf-8"))
+    for i, chave in enumerate(["antigo", "medio", "novo"]):
+        indice[chave]["ultimo_acesso"] = i
+    cache._salvar(indice)
+
+    removidos = cache.aplicar_limite(protegidos=[antigo])
+    assert removidos == [os.path.abspath(medio)]
+    assert os.path.exists(alheio) and os.path.exists(antigo) and os.path.exists(novo)
+    assert cache.buscar("medio") is None and cache.buscar("novo")
+
+def test_indice_corrompido_e_guardado_e_avisado(tmp_path, capsys):
+    (tmp_path / cache_midia.NOME_INDICE).write_text("{corrompido", encoding="utf-8")
+    cache = CacheMidia(str(tmp_path))
+    assert cache.buscar("k") is None
+    assert "ilegível" in capsys.readouterr().err
+    assert (tmp_path / (cache_midia.NOME_INDICE + ".corrompido")).read_text(encoding="utf-8") == "{corrompido"
+    cache.registrar("k", _arquivo(tmp_path, "a.mp3", 10))
+    assert list(json.loads((tmp_path / cache_midia.NOME_INDICE).read_text(encoding="utf-8"))) == ["k"]
+
+def test_indice_gravado_sem_temporario_fixo(tmp_path):
+    # Outro processo gravando o índice ao mesmo tempo não compartilha o mesmo .tmp
+    (tmp_path / (cache_midia.NOME_INDICE + ".tmp")).write_text("de outro processo", encoding="utf-8")
+    CacheMidia(str(tmp_path)).registrar("k", _arquivo(tmp_path, "a.mp3", 10))
+    assert (tmp_path / (cache_midia.NOME_INDICE + ".tmp")).read_text(encoding="utf-8") == "de outro processo"
+    assert [p.name for p in tmp_path.glob("*.tmp")] == [cache_midia.NOME_INDICE + ".tmp"]
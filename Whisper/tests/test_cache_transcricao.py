@@ -0,0 +1,87 @@
+import json
+import threading
+
+import cache_transcricao
+
+def test_ida_e_volta_do_cache(tmp_path):
+    turnos = [(0.0, 2.5, "SPEAKER_00"), (2.5, 4.0, "SPEAKER_01")]
+    segmentos = [
+        {"start": 0.0, "end": 2.4, "text": " Olá", "words": [{"word": " Olá", "start": 0.1, "end": 0.5}]},
+        {"start": 2.6, "end": 3.9, "text": " tudo bem", "words": []},
+    ]
+    traducao = [{"start": 0.0, "end": 3.9, "text": " Hello"}]
+    chave = cache_transcricao.gerar_chave("abc", "small", None)
+    cache_transcricao.salvar_no_cache(chave, turnos, segmentos, traducao, duracao=4.0, pasta=str(tmp_path), palavras=True)
+
+    dados = cache_transcricao.carregar_do_cache(chave, pasta=str(tmp_path))
+    assert dados["turnos"] == turnos
+    assert dados["segmentos"] == segmentos
+    assert dados["traducao"] == traducao
+    assert dados["duracao"] == 4.0
+    assert dados["palavras"] is True
+    assert not list(tmp_path.rglob("*.tmp"))
+
+def test_chave_ausente_ou_de_outra_versao(tmp_path, monkeypatch):
+    chave = cache_transcricao.gerar_chave("abc", "small", "pt")
+    assert cache_transcricao.carregar_do_cache(chave, pasta=str(tmp_path)) is None
+    cache_transcricao.salvar_no_cache(chave, [], [], pasta=str(tmp_path))
+    monkeypatch.setattr(cache_transcricao, "VERSAO_PIPELINE", "outra")
+    assert cache_transcricao.carregar_do_cache(chave, pasta=str(tmp_path)) is None
+
+def test_chave_muda_com_modelo_idioma_e_backend():
+    base = cache_transcricao.gerar_chave("abc", "small", None)
+    assert base == cache_transcricao.gerar_chave("abc", "small", "auto")
+    assert base != cache_transcricao.gerar_chave("abc", "base", None)
+    assert base != cache_transcricao.gerar_chave("abc", "small", "pt")
+    assert base != cache_transcricao.gerar_chave("abc", "small", None, "ctranslate2:int8")
+
+def _indice_em(tmp_path, monkeypatch):
+    indice = tmp_path / "cache" / "hashes.json"
+    monkeypatch.setattr(cache_transcricao, "INDICE_HASHES_PATH", str(indice))
+    return indice
+
+def test_hash_reaproveitado_ate_o_arquivo_mudar(tmp_path, monkeypatch):
+    indice = _indice_em(tmp_path, monkeypatch)
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"um")
+    primeiro = cache_transcricao.hash_do_arquivo(str(audio))
+    assert primeiro == cache_transcricao.calcular_hash_arquivo(str(audio))
+    assert json.loads(indice.read_text(encoding="utf-8"))[str(audio)]["hash"] == primeiro
+
+    audio.write_bytes(b"outro conteudo")
+    assert cache_transcricao.hash_do_arquivo(str(audio)) != primeiro
+
+def test_indice_ilegivel_e_recriado(tmp_path, monkeypatch):
+    indice = _indice_em(tmp_path, monkeypatch)
+    indice.parent.mkdir()
+    indice.write_text("{quebrado", encoding="utf-8")
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"um")
+    cache_transcricao.hash_do_arquivo(str(audio))
+    assert str(audio) in json.loads(indice.read_text(encoding="utf-8"))
+
+def test_hashes_concorrentes_nao_se_perdem(tmp_path, monkeypatch):
+    indice = _indice_em(tmp_path, monkeypatch)
+    arquivos = []
+    for i in range(20):
+        arquivo = tmp_path / f"{i}.wav"
+        arquivo.write_bytes(str(i).encode())
+        arquivos.append(str(arquivo))
+    threads = [threading.Thread(target=cache_transcricao.hash_do_arquivo, args=(a,)) for a in arquivos]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(json.loads(indice.read_text(encoding="utf-8"))) == set(arquivos)
+    assert not list(indice.parent.glob("*.tmp"))
+
+def test_indice_limitado(tmp_path, monkeypatch):
+    indice = _indice_em(tmp_path, monkeypatch)
+    monkeypatch.setattr(cache_transcricao, "LIMITE_INDICE_HASHES", 3)
+    arquivos = []
+    for i in range(5):
+        arquivo = tmp_path / f"{i}.wav"
+        arquivo.write_bytes(str(i).encode())
+        arquivos.append(str(arquivo))
+        cache_transcricao.hash_do_arquivo(str(arquivo))
+    assert list(json.loads(indice.read_text(encoding="utf-8"))) == arquivos[-3:]
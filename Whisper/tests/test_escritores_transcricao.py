@@ -0,0 +1,84 @@
+import os
+import json
+import pickle
+
+import pytest
+
+from escritores_transcricao import (
+    criar_escritores, escrever_transcricao, formatar_linha, VisaoTranscricao,
+    AVISO_SEM_FALA, AVISO_SEM_FALA_INGLES, MENSAGEM_SEM_FALA
+)
+
+SEGMENTOS = [
+    {"start": 0.0, "end": 2.5004, "speaker": "SPEAKER_00", "text": "Bom dia.", "traducao": "Good morning.",
+     "words": [{"word": " Bom", "start": 0.12345, "end": 0.4}, {"word": " dia.", "start": 0.5, "end": 2.5004}]},
+    {"start": 3723.9996, "end": 3725.25, "speaker": "Maria", "text": "Tudo bem?"},
+]
+
+def _ler(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return f.read()
+
+def _gravar(pasta, formatos, segmentos=SEGMENTOS, traduzir=False):
+    return escrever_transcricao(segmentos, criar_escritores(str(pasta), "aula", formatos, traduzir))
+
+def test_txt(tmp_path):
+    [caminho] = _gravar(tmp_path, ["txt"])
+    assert caminho == str(tmp_path / "transcricao_aula.txt")
+    assert _ler(caminho) == (
+        "[0:00:00 -> 0:00:02] SPEAKER_00: Bom dia.\n\n"
+        "[1:02:03 -> 1:02:05] Maria: Tudo bem?\n\n"
+    )
+
+def test_srt_usa_virgula_e_numera_os_blocos(tmp_path):
+    [caminho] = _gravar(tmp_path, ["srt"])
+    assert _ler(caminho) == (
+        "1\n00:00:00,000 --> 00:00:02,500\nSPEAKER_00: Bom dia.\n\n"
+        "2\n01:02:04,000 --> 01:02:05,250\nMaria: Tudo bem?\n\n"
+    )
+
+def test_vtt_usa_ponto_e_cabecalho(tmp_path):
+    [caminho] = _gravar(tmp_path, ["vtt"])
+    assert _ler(caminho) == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:02.500\n<v SPEAKER_00>Bom dia.\n\n"
+        "01:02:04.000 --> 01:02:05.250\n<v Maria>Tudo bem?\n\n"
+    )
+
+def test_jsonl_com_tempos_das_palavras(tmp_path):
+    [caminho] = _gravar(tmp_path, ["jsonl"])
+    registros = [json.loads(linha) for linha in _ler(caminho).splitlines()]
+    assert registros == [
+        {"inicio": 0.0, "fim": 2.5, "falante": "SPEAKER_00", "texto": "Bom dia.",
+         "palavras": [{"palavra": " Bom", "inicio": 0.123, "fim": 0.4}, {"palavra": " dia.", "inicio": 0.5, "fim": 2.5}]},
+        {"inicio": 3724.0, "fim": 3725.25, "falante": "Maria", "texto": "Tudo bem?"},
+    ]
+
+def test_traducao_em_arquivo_proprio(tmp_path):
+    caminhos = _gravar(tmp_path, ["srt", "jsonl"], traduzir=True)
+    assert [os.path.basename(c) for c in caminhos] == [
+        "transcricao_aula.srt", "transcricao_aula_ingles.srt", "transcricao_aula.jsonl", "transcricao_aula_ingles.jsonl",
+    ]
+    # Só os segmentos com tradução, numerados a partir de 1, e sem os tempos das palavras
+    assert _ler(caminhos[1]) == "1\n00:00:00,000 --> 00:00:02,500\nSPEAKER_00: Good morning.\n\n"
+    assert json.loads(_ler(caminhos[3])) == {"inicio": 0.0, "fim": 2.5, "falante": "SPEAKER_00", "texto": "Good morning."}
+
+def test_sem_segmentos_grava_o_aviso(tmp_path):
+    caminhos = _gravar(tmp_path, ["txt", "vtt"], segmentos=[], traduzir=True)
+    assert _ler(caminhos[0]) == AVISO_SEM_FALA
+    assert _ler(caminhos[1]) == AVISO_SEM_FALA_INGLES
+    # Legendas vazias continuam válidas
+    assert _ler(caminhos[2]) == "WEBVTT\n\n"
+
+def test_formato_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="docx"):
+        criar_escritores(str(tmp_path), "aula", ["txt", "docx"])
+
+def test_visao_transcricao():
+    visao = VisaoTranscricao(SEGMENTOS, ["a.txt"])
+    assert len(visao) == 2
+    assert visao[1] == formatar_linha(SEGMENTOS[1])
+    assert str(visao) == "".join(formatar_linha(s) for s in SEGMENTOS)
+    copia = pickle.loads(pickle.dumps(visao))
+    assert copia._texto is None and str(copia) == str(visao) and copia.arquivos == ["a.txt"]
+    assert str(VisaoTranscricao([])) == MENSAGEM_SEM_FALA
@@ -0,0 +1,18 @@
+from executor_ffmpeg import _converter_progresso, formatar_progresso
+
+def test_bloco_de_progresso_completo():
+    bloco = {"out_time_us": "83500000", "speed": "12.5x", "fps": "240.0", "progress": "continue"}
+    progresso = _converter_progresso(bloco, duracao_total=167.0)
+    assert progresso == {"tempo_s": 83.5, "velocidade": 12.5, "fps": 240.0, "percentual": 50.0, "fim": False}
+    assert formatar_progresso(progresso) == "00:01:23 processados (12.5x) 240 fps"
+
+def test_out_time_ms_tambem_e_em_microssegundos():
+    assert _converter_progresso({"out_time_ms": "2000000"}, None)["tempo_s"] == 2.0
+
+def test_valores_ausentes_ou_invalidos():
+    progresso = _converter_progresso({"out_time_us": "N/A", "speed": "N/A", "fps": "", "progress": "end"}, 10.0)
+    assert progresso == {"tempo_s": None, "velocidade": None, "fps": None, "percentual": None, "fim": True}
+    assert formatar_progresso(progresso) == ""
+
+def test_percentual_limitado_a_100():
+    assert _converter_progresso({"out_time_us": "12000000"}, duracao_total=10.0)["percentual"] == 100.0
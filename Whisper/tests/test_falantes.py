@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from falantes import BancoFalantes, _de_blob
+
+@pytest.fixture
+def banco(tmp_path):
+    b = BancoFalantes(str(tmp_path / "falantes.db"))
+    yield b
+    b.fechar()
+
+def _falante(banco, nome):
+    return banco.conexao.execute("SELECT embedding, ocorrencias FROM falantes WHERE nome = ?", (nome,)).fetchone()
+
+def test_mesma_pessoa_em_outra_gravacao_entra_na_media(banco):
+    banco.salvar_diarizacao("a", "cfg", [(0.0, 1.0, "SPEAKER_00")], {"SPEAKER_00": [1.0, 0.0]})
+    assert banco.identificar("a", "cfg") == {"SPEAKER_00": "Falante 1"}
+    banco.salvar_diarizacao("b", "cfg", [(0.0, 1.0, "SPEAKER_00")], {"SPEAKER_00": [1.0, 0.2]})
+    assert banco.identificar("b", "cfg") == {"SPEAKER_00": "Falante 1"}
+    assert _falante(banco, "Falante 1")["ocorrencias"] == 2
+
+def test_diarizar_de_novo_mantem_a_associacao_sem_contar_duas_vezes(banco):
+    banco.salvar_diarizacao("a", "cfg", [(0.0, 1.0, "SPEAKER_00")], {"SPEAKER_00": [1.0, 0.0]})
+    banco.salvar_diarizacao("b", "cfg", [(0.0, 1.0, "SPEAKER_00")], {"SPEAKER_00": [1.0, 0.2]})
+    banco.identificar("a", "cfg")
+    banco.identificar("b", "cfg")
+    antes = _falante(banco, "Falante 1")
+
+    for _ in range(3):
+        banco.salvar_diarizacao("b", "cfg", [(0.0, 1.0, "SPEAKER_00")], {"SPEAKER_00": [1.0, 0.2]})
+        assert banco.identificar("b", "cfg") == {"SPEAKER_00": "Falante 1"}
+
+    depois = _falante(banco, "Falante 1")
+    assert depois["ocorrencias"] == antes["ocorrencias"] == 2
+    np.testing.assert_array_equal(_de_blob(depois["embedding"]), _de_blob(antes["embedding"]))
+
+def test_rotulo_novo_na_rediarizacao_e_associado(banco):
+    banco.salvar_diarizacao("a", "cfg", [(0.0, 1.0, "SPEAKER_00")], {"SPEAKER_00": [1.0, 0.0]})
+    banco.identificar("a", "cfg")
+    banco.salvar_diarizacao("a", "cfg", [(0.0, 1.0, "SPEAKER_00"), (1.0, 2.0, "SPEAKER_01")],
+                            {"SPEAKER_00": [1.0, 0.0], "SPEAKER_01": [0.0, 1.0]})
+    assert banco.identificar("a", "cfg") == {"SPEAKER_00": "Falante 1", "SPEAKER_01": "Falante 2"}
+    assert _falante(banco, "Falante 1")["ocorrencias"] == 1
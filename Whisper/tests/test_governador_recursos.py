@@ -0,0 +1,34 @@
+import sqlite3
+
+from governador_recursos import GovernadorRecursos
+
+def test_orcamento_dividido_entre_reservas(tmp_path):
+    governador = GovernadorRecursos(str(tmp_path / "reservas.db"), nucleos=8)
+    with governador.reservar("transcricao") as primeira:
+        assert primeira.threads == 8
+        with governador.reservar("conversao") as segunda:
+            assert primeira.threads == segunda.threads == 4
+        assert primeira.threads == 8
+    assert governador.ativos() == []
+    governador.fechar()
+
+def test_banco_que_nao_abre_usa_todos_os_nucleos(tmp_path):
+    governador = GovernadorRecursos(str(tmp_path / "nao_existe" / "reservas.db"), nucleos=6)
+    assert governador.orcamento() == 6
+    with governador.reservar("transcricao") as reserva:
+        assert reserva.id is None
+        assert reserva.threads == 6
+    assert reserva.relatorio["threads"] == 6
+
+def test_banco_somente_leitura_usa_todos_os_nucleos(tmp_path):
+    caminho = tmp_path / "reservas.db"
+    GovernadorRecursos(str(caminho), nucleos=4).fechar()
+    governador = GovernadorRecursos(str(caminho), nucleos=4)
+    governador.conexao.close()
+    governador.conexao = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True, isolation_level=None,
+                                         check_same_thread=False)
+    governador.conexao.row_factory = sqlite3.Row
+    with governador.reservar("conversao") as reserva:
+        assert reserva.id is None
+        assert reserva.threads == 4
+    governador.fechar()
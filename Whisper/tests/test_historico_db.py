@@ -0,0 +1,36 @@
+import pytest
+
+from historico_db import HistoricoTranscricoes
+
+@pytest.fixture
+def historico(tmp_path):
+    h = HistoricoTranscricoes(str(tmp_path / "historico.db"))
+    h.adicionar("/t/transcricao_reuniao.txt", "transcricao_reuniao.txt", "2024-03-15 10:00:00", "pt",
+                conteudo="Discussão do orçamento trimestral")
+    h.adicionar("/t/transcricao_aula_50%.txt", "transcricao_aula_50%.txt", "2024-04-02 09:30:00", "en",
+                conteudo="Introduction to statistics")
+    yield h
+    h.fechar()
+
+def _nomes(itens):
+    return [i["nome"] for i in itens]
+
+def test_sem_texto_lista_do_mais_recente(historico):
+    assert _nomes(historico.buscar()) == ["transcricao_aula_50%.txt", "transcricao_reuniao.txt"]
+
+def test_trecho_do_meio_do_nome_ou_da_data(historico):
+    assert _nomes(historico.buscar("niao")) == ["transcricao_reuniao.txt"]
+    assert _nomes(historico.buscar("03-15")) == ["transcricao_reuniao.txt"]
+    assert _nomes(historico.buscar("50%")) == ["transcricao_aula_50%.txt"]
+    assert historico.buscar("0%x") == []
+
+def test_palavras_do_conteudo_como_prefixo_e_sem_acento(historico):
+    assert _nomes(historico.buscar("orcam trimes")) == ["transcricao_reuniao.txt"]
+    assert _nomes(historico.buscar("statis")) == ["transcricao_aula_50%.txt"]
+
+def test_idioma_e_substituicao_pelo_caminho(historico):
+    assert _nomes(historico.buscar("ingles", idiomas=["en"])) == ["transcricao_aula_50%.txt"]
+    historico.adicionar("/t/transcricao_reuniao.txt", "transcricao_reuniao.txt", "2024-05-01 08:00:00", "pt",
+                        conteudo="nova versão")
+    assert historico.total() == 2
+    assert historico.buscar("orcamento") == []
@@ -0,0 +1,79 @@
+import os
+import json
+
+import pytest
+
+from indice_busca import IndiceTranscricoes, arquivos_para_indexar
+
+TXT = (
+    "[0:00:01 -> 0:00:04] SPEAKER_00: Bom dia, vamos falar do orçamento\n\n"
+    "[0:00:05 -> 0:00:09] SPEAKER_01: O relatório trimestral está pronto\n\n"
+)
+SRT = (
+    "1\n00:00:01,250 --> 00:00:04,500\nSPEAKER_00: Good morning, the budget\n\n"
+    "2\n00:00:05,000 --> 00:00:09,750\nSPEAKER_01: The quarterly report\nis ready\n"
+)
+
+@pytest.fixture
+def pasta(tmp_path):
+    pasta = tmp_path / "Transcricoes"
+    pasta.mkdir()
+    (pasta / "transcricao_reuniao.txt").write_text(TXT, encoding="utf-8")
+    (pasta / "transcricao_reuniao_ingles.srt").write_text(SRT, encoding="utf-8")
+    (pasta / "outro_arquivo.txt").write_text(TXT, encoding="utf-8")
+    return pasta
+
+@pytest.fixture
+def indice(tmp_path):
+    indice = IndiceTranscricoes(str(tmp_path / "indice.db"))
+    yield indice
+    indice.fechar()
+
+def test_formato_mais_preciso_por_transcricao(pasta):
+    (pasta / "transcricao_reuniao.jsonl").write_text("", encoding="utf-8")
+    nomes = [os.path.basename(c) for c in arquivos_para_indexar(str(pasta))]
+    assert nomes == ["transcricao_reuniao.jsonl", "transcricao_reuniao_ingles.srt"]
+
+def test_busca_por_prefixo_sem_acento(pasta, indice):
+    assert indice.atualizar(str(pasta)) == (2, 0)
+    assert indice.totais() == (2, 4)
+    resultados = indice.buscar("orcam")
+    assert len(resultados) == 1
+    r = resultados[0]
+    assert (r["transcricao"], r["traducao"], r["inicio_ms"], r["fim_ms"], r["falante"]) == ("reuniao", 0, 1000, 4000, "SPEAKER_00")
+    assert r["destaque"] == "Bom dia, vamos falar do [orçamento]"
+
+def test_legenda_com_milissegundos_e_filtros(pasta, indice):
+    indice.atualizar(str(pasta))
+    r, = indice.buscar("report ready", traducao=True)
+    assert (r["inicio_ms"], r["fim_ms"], r["falante"], r["texto"]) == (5000, 9750, "SPEAKER_01", "The quarterly report is ready")
+    assert indice.buscar("report", traducao=False) == []
+    assert indice.buscar("relatorio", falante="SPEAKER_00") == []
+    assert len(indice.buscar("relatorio", falante="SPEAKER_01")) == 1
+    assert indice.buscar("   ") == []
+
+def test_atualizacao_incremental(pasta, indice):
+    indice.atualizar(str(pasta))
+    assert indice.atualizar(str(pasta)) == (0, 0)
+
+    txt = pasta / "transcricao_reuniao.txt"
+    txt.write_text(TXT.replace("orçamento", "cronograma"), encoding="utf-8")
+    os.utime(txt, ns=(txt.stat().st_atime_ns, txt.stat().st_mtime_ns + 10**9))
+    assert indice.atualizar(str(pasta)) == (1, 0)
+    assert indice.buscar("orcamento") == []
+    assert len(indice.buscar("cronograma")) == 1
+    assert indice.totais() == (2, 4)
+
+    # Um JSONL novo substitui o TXT da mesma transcrição
+    (pasta / "transcricao_reuniao.jsonl").write_text(
+        json.dumps({"inicio": 1.5, "fim": 2.25, "falante": "SPEAKER_00", "texto": "agenda"}) + "\n", encoding="utf-8"
+    )
+    assert indice.atualizar(str(pasta)) == (1, 1)
+    r, = indice.buscar("agenda")
+    assert (r["inicio_ms"], r["fim_ms"]) == (1500, 2250)
+    assert indice.buscar("cronograma") == []
+
+    for arquivo in pasta.iterdir():
+        arquivo.unlink()
+    assert indice.atualizar(str(pasta)) == (0, 2)
+    assert indice.totais() == (0, 0)
@@ -0,0 +1,119 @@
+import os
+import json
+
+import pytest
+
+import lote_midia
+import agendador_conversao
+from lote_midia import ler_manifesto, resultado_ainda_valido, assinatura_origem, processar_manifesto
+from executor_ffmpeg import ResultadoFFmpeg
+from governador_recursos import GovernadorRecursos
+
+def test_manifesto_csv(tmp_path):
+    caminho = tmp_path / "lote.csv"
+    caminho.write_text('origem,formatos\n"a.mp4",3;1\n,2\n b.mp4 ,"6, 2"\nc.mp4,\n', encoding="utf-8")
+    assert ler_manifesto(str(caminho)) == [
+        {"origem": "a.mp4", "formatos": ["1", "3"]},
+        {"origem": "b.mp4", "formatos": ["2", "6"]},
+        {"origem": "c.mp4", "formatos": []},
+    ]
+
+def test_manifesto_jsonl(tmp_path):
+    caminho = tmp_path / "lote.jsonl"
+    caminho.write_text(
+        '{"origem": "https://youtu.be/x", "formatos": ["podcast", 1]}\n\n{"origem": "", "formatos": ["2"]}\n',
+        encoding="utf-8"
+    )
+    assert ler_manifesto(str(caminho)) == [{"origem": "https://youtu.be/x", "formatos": ["1", "podcast"]}]
+
+@pytest.fixture
+def anterior(tmp_path):
+    origem = tmp_path / "video.mp4"
+    origem.write_bytes(b"video")
+    saida = tmp_path / "audio.mp3"
+    saida.write_bytes(b"mp3")
+    job = {"origem": str(origem), "formatos": ["1"]}
+    registro = {
+        "origem": str(origem), "formatos": ["1"], "assinatura": assinatura_origem(str(origem)), "status": "ok",
+        "saidas": {"audio_base": {"caminho": str(saida), "tamanho": 3}},
+    }
+    return job, registro, origem, saida
+
+def test_resultado_valido_e_pulado(anterior):
+    job, registro, _, _ = anterior
+    assert resultado_ainda_valido(registro, job)
+    assert resultado_ainda_valido({**registro, "status": "pulado"}, job)
+    assert assinatura_origem("https://youtu.be/x") == "https://youtu.be/x"
+
+def test_resultado_invalido(anterior):
+    job, registro, origem, saida = anterior
+    assert not resultado_ainda_valido(None, job)
+    assert not resultado_ainda_valido({**registro, "status": "erro"}, job)
+    assert not resultado_ainda_valido(registro, {**job, "formatos": ["1", "2"]})
+    saida.write_bytes(b"mp3 regravado")
+    assert not resultado_ainda_valido(registro, job)
+    saida.write_bytes(b"mp3")
+    origem.write_bytes(b"outro video")
+    assert not resultado_ainda_valido(registro, job)
+
+@pytest.fixture
+def ambiente(tmp_path, monkeypatch):
+    """Manifesto processado sem FFmpeg: as origens locais já são o vídeo e cada saída do comando é gravada."""
+    pasta_saida = tmp_path / "saida"
+    governador = GovernadorRecursos(str(tmp_path / "reservas.db"), nucleos=2)
+    comandos = []
+
+    def executar(comando, cancelar=None, timeout=None):
+        comandos.append(comando)
+        for argumento in comando:
+            if argumento.startswith(str(pasta_saida)):
+                with open(argumento, "wb") as f:
+                    f.write(b"audio")
+        return ResultadoFFmpeg(0, "")
+
+    monkeypatch.setattr(lote_midia, "verificar_ffmpeg", lambda: True)
+    monkeypatch.setattr(lote_midia, "obter_video", lambda origem, diretorio, progresso: origem)
+    monkeypatch.setattr(lote_midia, "sondar_midia", lambda caminho: {"duracao": 10.0})
+    monkeypatch.setattr(lote_midia, "imprimir_utilizacao", lambda relatorio: None)
+    monkeypatch.setattr(agendador_conversao, "executar_ffmpeg", executar)
+    monkeypatch.setattr(agendador_conversao, "obter_governador", lambda: governador)
+    yield pasta_saida, comandos
+    governador.fechar()
+
+def test_linhas_repetidas_com_formatos_diferentes(tmp_path, ambiente):
+    pasta_saida, comandos = ambiente
+    origem = tmp_path / "aula.mp4"
+    origem.write_bytes(b"video")
+    manifesto = tmp_path / "lote.jsonl"
+    manifesto.write_text(
+        json.dumps({"origem": str(origem), "formatos": ["1"]}) + "\n"
+        + json.dumps({"origem": str(origem), "formatos": ["3"]}) + "\n", encoding="utf-8"
+    )
+    resultados = tmp_path / "resultados.jsonl"
+
+    registros = processar_manifesto(str(manifesto), str(resultados), str(pasta_saida))
+    assert os.path.isdir(pasta_saida)
+    assert [r["status"] for r in registros] == ["ok", "ok"]
+    assert set(registros[0]["saidas"]) == {"audio_base", "telefonia"}
+    assert set(registros[1]["saidas"]) == {"audio_base", "podcast"}
+    # Uma tarefa do agendador por linha
+    assert len(comandos) == 2
+    gravados = [json.loads(l) for l in resultados.read_text(encoding="utf-8").splitlines()]
+    assert [g["formatos"] for g in gravados] == [["1"], ["3"]]
+
+    # Na segunda execução as duas linhas são puladas, sem nenhum FFmpeg
+    registros = processar_manifesto(str(manifesto), str(resultados), str(pasta_saida))
+    assert [r["status"] for r in registros] == ["pulado", "pulado"]
+    assert len(comandos) == 2
+
+def test_erro_do_ffmpeg_fica_no_registro(tmp_path, ambiente, monkeypatch):
+    pasta_saida, _ = ambiente
+    monkeypatch.setattr(agendador_conversao, "executar_ffmpeg",
+                        lambda comando, cancelar=None, timeout=None: ResultadoFFmpeg(1, "Invalid data found"))
+    origem = tmp_path / "aula.mp4"
+    origem.write_bytes(b"video")
+    manifesto = tmp_path / "lote.csv"
+    manifesto.write_text(f"origem,formatos\n{origem},1\n", encoding="utf-8")
+    registros = processar_manifesto(str(manifesto), str(tmp_path / "r.jsonl"), str(pasta_saida))
+    assert registros[0]["status"] == "erro"
+    assert registros[0]["erro"] == "Falha na conversão dos formatos: Invalid data found"
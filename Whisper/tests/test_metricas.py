@@ -0,0 +1,36 @@
+import json
+
+from metricas import MedidorEtapas, formatar_resumo
+
+def test_registrar_grava_uma_linha_por_etapa_e_o_total(tmp_path):
+    log = tmp_path / "metricas.jsonl"
+    medidor = MedidorEtapas("a.mp3", caminho_log=str(log), modelo="small")
+    with medidor.etapa("extracao"):
+        pass
+    medidor.adicionar_etapa("diarizacao", 2.5, tempo_cpu_s=4.0, rss_inicio_mb=100.0, rss_fim_mb=150.0)
+    medidor.duracao_audio = 60.0
+    resumo = medidor.registrar()
+
+    linhas = [json.loads(l) for l in log.read_text(encoding="utf-8").splitlines()]
+    assert [l["etapa"] for l in linhas] == ["extracao", "diarizacao", "total"]
+    assert all(l["job"] == medidor.job and l["arquivo"] == "a.mp3" and l["modelo"] == "small" for l in linhas)
+    assert set(linhas[0]) >= {"tempo_parede_s", "tempo_cpu_s", "rss_inicio_mb", "rss_fim_mb", "data"}
+    assert linhas[1]["rss_fim_mb"] == 150.0
+    assert "etapas" not in linhas[2]
+    assert linhas[2]["duracao_audio_s"] == 60.0
+    assert resumo["fator_tempo_real"] == round(resumo["tempo_parede_s"] / 60.0, 3)
+
+def test_log_inacessivel_nao_interrompe(tmp_path):
+    medidor = MedidorEtapas("a.mp3", caminho_log=str(tmp_path / "nao_existe" / "m.jsonl"))
+    assert medidor.registrar()["arquivo"] == "a.mp3"
+
+def test_formatar_resumo():
+    resumo = {
+        "etapas": [{"etapa": "extracao", "tempo_parede_s": 1.24}, {"etapa": "outra", "tempo_parede_s": 3.0}],
+        "tempo_parede_s": 12.0, "fator_tempo_real": 0.2, "pico_rss_mb": 812.4,
+        "utilizacao_cpu": 0.75, "threads": 4,
+    }
+    assert formatar_resumo(resumo) == (
+        "Extração 1.2s | outra 3.0s | Total 12.0s | RTF 0.20 | Pico do processo 812 MB | CPU 75% de 4 threads"
+    )
+    assert formatar_resumo({"etapas": [], "tempo_parede_s": 1.0, "pico_rss_mb": None}) == "Total 1.0s"
@@ -0,0 +1,47 @@
+from perfis_conversao import compilar_comando, resolver_perfis, estagios_filtro, PERFIS
+
+def _grafo(comando):
+    return comando[comando.index('-filter_complex') + 1].split(';')
+
+def test_um_perfil_vira_uma_cadeia_sem_asplit():
+    comando = compilar_comando('in.mp4', [('telefonia', 'tel.wav')])
+    assert comando[:4] == ['ffmpeg', '-y', '-i', 'in.mp4']
+    assert _grafo(comando) == [
+        '[0:a:0]volume=2.0[n1]', '[n1]volume=3.0[n2]', '[n2]highpass=f=300[n3]',
+        '[n3]lowpass=f=3400[n4]', '[n4]aresample=8000[n5]',
+    ]
+    assert comando[comando.index('-map'):] == ['-map', '[n5]', '-ac', '1', '-c:a', 'pcm_s16le', 'tel.wav']
+
+def test_estagios_comuns_rodam_uma_vez():
+    comando = compilar_comando('in.mp4', [('audio_base', 'a.mp3'), ('podcast', 'p.m4a')])
+    grafo = _grafo(comando)
+    # O ganho base é compartilhado e só depois a árvore se divide
+    assert grafo[0] == '[0:a:0]volume=2.0[n1]'
+    assert grafo[1] == '[n1]asplit=2[n2][n3]'
+    assert sum(1 for estagio in grafo if 'aresample=44100' in estagio) == 2
+    assert comando.count('-map') == 2
+    assert comando[-1] == 'p.m4a'
+
+def test_mesma_taxa_sem_filtros_proprios_compartilha_o_aresample():
+    comando = compilar_comando('in.mp4', [('audio_base', 'a.mp3'), ('audio_base', 'b.mp3')])
+    grafo = _grafo(comando)
+    assert sum(1 for estagio in grafo if 'aresample' in estagio) == 1
+    assert grafo[-1].startswith('[n2]asplit=2')
+
+def test_sem_ganho_e_sem_estagios_mapeia_a_entrada():
+    PERFIS['copia_teste'] = dict(PERFIS['audio_base'], nome='copia_teste', taxa=None)
+    try:
+        comando = compilar_comando('in.mp4', [('copia_teste', 'c.mp3')], ganho_base=False)
+    finally:
+        del PERFIS['copia_teste']
+    assert '-filter_complex' not in comando
+    assert comando[comando.index('-map') + 1] == '0:a:0'
+
+def test_resolver_perfis_por_opcao_ou_nome_na_ordem_do_registro():
+    assert resolver_perfis(['6', '1']) == ['telefonia', 'whatsapp']
+    assert resolver_perfis(['podcast', ' 2 ']) == ['alta_qualidade', 'podcast']
+    assert resolver_perfis(['9']) == []
+
+def test_estagios_filtro():
+    assert estagios_filtro(PERFIS['whatsapp']) == ['volume=2.0', 'volume=1.5', 'aresample=48000']
+    assert estagios_filtro(PERFIS['whatsapp'], ganho_base=False) == ['volume=1.5', 'aresample=48000']
@@ -0,0 +1,46 @@
+from pos_processamento import remover_repeticoes, normalizar_texto, hashes_ngramas
+
+def _segmentos(*textos):
+    return [{"start": float(i), "end": i + 1.0, "text": t} for i, t in enumerate(textos)]
+
+def _textos(segmentos):
+    return [s["text"] for s in segmentos]
+
+def test_normalizar_texto():
+    assert normalizar_texto("  Olá,   MUNDO!! 2024 ") == "olá mundo 2024"
+
+def test_hashes_ngramas():
+    assert hashes_ngramas(["a", "b"]) == set()
+    assert len(hashes_ngramas("a b c a b c".split())) == 3
+    assert hashes_ngramas("x a b c".split()) & hashes_ngramas("a b c y".split())
+
+def test_fala_normal_e_mantida():
+    segmentos = _segmentos("bom dia a todos", "vamos começar a reunião", "o primeiro item é o orçamento")
+    assert remover_repeticoes(segmentos) == segmentos
+
+def test_repeticao_do_anterior_com_pontuacao_diferente():
+    segmentos = _segmentos("Obrigado por assistir.", "obrigado por assistir", "Obrigado, por assistir!")
+    assert _textos(remover_repeticoes(segmentos)) == ["Obrigado por assistir."]
+
+def test_segmento_contido_no_anterior():
+    segmentos = _segmentos("legendas pela comunidade", "legendas pela comunidade amara")
+    assert _textos(remover_repeticoes(segmentos)) == ["legendas pela comunidade"]
+
+def test_laco_que_volta_segmentos_atras():
+    segmentos = _segmentos(
+        "eu acho que a gente precisa revisar o contrato",
+        "sim concordo totalmente",
+        "eu acho que a gente precisa revisar o contrato",
+    )
+    assert _textos(remover_repeticoes(segmentos)) == _textos(segmentos[:2])
+
+def test_repeticao_fora_da_janela_volta_a_valer():
+    frase = "a reunião de hoje vai tratar do orçamento anual"
+    outros = ["primeiro assunto da pauta de hoje", "segundo assunto completamente novo",
+              "terceiro tema sobre contratações", "quarto ponto sobre viagens da equipe"]
+    segmentos = _segmentos(frase, *outros, frase)
+    assert _textos(remover_repeticoes(segmentos, janela=4)) == _textos(segmentos)
+    assert _textos(remover_repeticoes(segmentos, janela=5)) == _textos(segmentos[:-1])
+
+def test_lista_vazia():
+    assert remover_repeticoes([]) == []
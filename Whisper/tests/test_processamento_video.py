@@ -0,0 +1,77 @@
+import os
+import sys
+import types
+
+import pytest
+
+import Processamento_video
+from Processamento_video import baixar_audio_youtube, _gancho_progresso_download
+
+class YoutubeDLFalso:
+    """Registra as opções recebidas e 'baixa' um WAV vazio no caminho do outtmpl."""
+    opcoes = None
+
+    def __init__(self, opcoes):
+        YoutubeDLFalso.opcoes = opcoes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def extract_info(self, url, download=True):
+        caminho = self.opcoes["outtmpl"].replace("%(id)s", "abc123").replace("%(ext)s", "wav")
+        with open(caminho, "wb") as f:
+            f.write(b"RIFF")
+        for gancho in self.opcoes.get("progress_hooks", []):
+            gancho({"status": "downloading", "downloaded_bytes": 50, "total_bytes": 100, "speed": 2 * 1024 * 1024})
+        return {"id": "abc123", "title": "Aula 1/2: revisão", "requested_downloads": [{"filepath": caminho}]}
+
+@pytest.fixture(autouse=True)
+def youtube_falso(monkeypatch):
+    monkeypatch.setattr(Processamento_video.yt_dlp, "YoutubeDL", YoutubeDLFalso, raising=False)
+
+def test_baixa_so_o_audio_em_16khz_mono(tmp_path):
+    progresso = []
+    caminho = baixar_audio_youtube("https://youtu.be/abc123", str(tmp_path), progresso_callback=
+                                   lambda valor, texto: progresso.append((valor, texto)))
+    opcoes = YoutubeDLFalso.opcoes
+    assert opcoes["format"] == "bestaudio/best"
+    assert opcoes["continuedl"] is True
+    # Nome estável (id do vídeo) na pasta de parciais, para retomar o download
+    assert opcoes["outtmpl"] == os.path.join(str(tmp_path), "parciais", "%(id)s.%(ext)s")
+    assert opcoes["postprocessors"] == [{"key": "FFmpegExtractAudio", "preferredcodec": "wav"}]
+    assert opcoes["postprocessor_args"] == {"extractaudio": ["-ar", "16000", "-ac", "1"]}
+
+    assert os.path.dirname(caminho) == str(tmp_path)
+    assert os.path.basename(caminho).startswith("audio_") and caminho.endswith("_Aula 12 revisão.wav")
+    assert os.path.exists(caminho)
+    assert os.listdir(tmp_path / "parciais") == []
+    assert progresso == [(2, "Baixando áudio: 50% (2.0 MB/s)")]
+
+def test_sem_callback_nao_registra_gancho(tmp_path):
+    baixar_audio_youtube("https://youtu.be/abc123", str(tmp_path))
+    assert "progress_hooks" not in YoutubeDLFalso.opcoes
+
+def test_gancho_de_progresso():
+    recebidos = []
+    gancho = _gancho_progresso_download(lambda valor, texto: recebidos.append((valor, texto)))
+    gancho({"status": "finished"})
+    gancho({"status": "downloading", "downloaded_bytes": 10, "total_bytes_estimate": 10})
+    gancho({"status": "downloading", "downloaded_bytes": 10})
+    assert recebidos == [(4, "Baixando áudio: 100%"), (0, "Baixando áudio: 0%")]
+
+def test_transcrever_do_youtube_repassa_o_audio_baixado(tmp_path, monkeypatch):
+    # O núcleo de transcrição (torch, Whisper) é trocado por um falso que só registra a chamada
+    chamadas = []
+    nucleo = types.ModuleType("transcricao_core")
+    nucleo.transcrever_com_diarizacao = lambda *args, **opcoes: chamadas.append((args, opcoes)) or "visao"
+    monkeypatch.setitem(sys.modules, "transcricao_core", nucleo)
+    visao = Processamento_video.transcrever_do_youtube(
+        "https://youtu.be/abc123", "small", "pt", None, diretorio_saida=str(tmp_path), backend="whisper"
+    )
+    assert visao == "visao"
+    (caminho, modelo, idioma, _), opcoes = chamadas[0]
+    assert caminho.endswith(".wav") and (modelo, idioma) == ("small", "pt")
+    assert opcoes == {"backend": "whisper"}
@@ -0,0 +1,29 @@
+from sondagem_midia import planejar_remux
+
+FORMATO_ISO = "mov,mp4,m4a,3gp,3g2,mj2"
+
+def _info(extensao=".mp4", marca="isom", audio="aac", video="h264", formato=FORMATO_ISO):
+    return {
+        "formato": formato, "marca": marca, "extensao": extensao, "duracao": 10.0,
+        "video": {"codec": video} if video else None,
+        "audio": {"codec": audio, "taxa": 44100, "canais": 2} if audio else None,
+    }
+
+def test_mp4_com_aac_e_usado_como_esta():
+    assert planejar_remux(_info()) == 'pular'
+    assert planejar_remux(_info(marca="mp42")) == 'pular'
+
+def test_mov_3gp_e_m4a_trocam_o_container():
+    assert planejar_remux(_info(extensao=".mov", marca="qt")) == 'copiar'
+    assert planejar_remux(_info(extensao=".3gp", marca="3gp4")) == 'copiar'
+    assert planejar_remux(_info(extensao=".m4a", marca="m4a", video=None)) == 'copiar'
+    # Extensão .mp4 com marca QuickTime também não é MP4
+    assert planejar_remux(_info(marca="qt")) == 'copiar'
+
+def test_sem_audio_troca_o_container():
+    assert planejar_remux(_info(audio=None)) == 'copiar'
+    assert planejar_remux(_info(extensao=".mov", marca="qt", audio=None)) == 'copiar'
+
+def test_audio_que_nao_e_aac_e_recodificado():
+    assert planejar_remux(_info(audio="mp3")) == 'recodificar_audio'
+    assert planejar_remux(_info(extensao=".mkv", marca="", formato="matroska,webm", audio="opus")) == 'recodificar_audio'
@@ -0,0 +1,147 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import transcricao_core
+from transcricao_core import threads_fixadas, limitar_backend, obter_backend, _segmentos_dos_tokens, BackendWhisper
+
+@pytest.fixture
+def torch_falso(monkeypatch):
+    torch = types.ModuleType("torch")
+    torch.threads = 8
+    torch.get_num_threads = lambda: torch.threads
+    torch.set_num_threads = lambda n: setattr(torch, "threads", n)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    return torch
+
+def test_threads_fixadas():
+    assert threads_fixadas(None) == 0
+    assert threads_fixadas({"compute_type": "int8"}) == 0
+    assert threads_fixadas({"cpu_threads": 0}) == 0
+    assert threads_fixadas({"cpu_threads": None}) == 0
+    assert threads_fixadas({"cpu_threads": "3"}) == 3
+
+def test_limitar_backend_torch_restaura_as_threads(torch_falso):
+    with limitar_backend("whisper", {}, 2):
+        assert torch_falso.threads == 2
+    assert torch_falso.threads == 8
+
+def test_limitar_backend_ctranslate2_nao_altera_as_opcoes(torch_falso):
+    opcoes = {"compute_type": "int8", "cpu_threads": 0}
+    with limitar_backend("ctranslate2", opcoes, 2):
+        assert torch_falso.threads == 8
+    # As opções fazem parte da chave do modelo em cache: o orçamento do job não pode entrar nelas
+    assert opcoes == {"compute_type": "int8", "cpu_threads": 0}
+
+def test_obter_backend_reaproveita_o_modelo_entre_orcamentos(monkeypatch):
+    carregados = []
+    monkeypatch.setattr(transcricao_core, "criar_backend", lambda *args: carregados.append(args) or object())
+    monkeypatch.setitem(transcricao_core._carregados, "chave_modelo", None)
+    monkeypatch.setitem(transcricao_core._carregados, "modelo", None)
+    opcoes = {"compute_type": "int8"}
+    for threads in (4, 2, 1):
+        with limitar_backend("ctranslate2", opcoes, threads):
+            obter_backend("ctranslate2", "small", opcoes)
+    assert len(carregados) == 1
+
+class TokenizerFalso:
+    """Tokens de texto abaixo de eot, especiais entre eot e timestamp_begin, tempos a partir dele."""
+    eot = 100
+    timestamp_begin = 200
+    palavras = {1: " olá", 2: " mundo", 3: " tudo", 4: " bem", 5: "  "}
+
+    def decode(self, tokens):
+        return "".join(self.palavras[t] for t in tokens)
+
+def tempo(segundos):
+    return TokenizerFalso.timestamp_begin + round(segundos / transcricao_core.PRECISAO_TEMPO_S)
+
+def test_segmentos_dos_tokens_pareia_os_tempos():
+    # <|sot|> <|0.00|> olá mundo <|2.40|><|2.40|> tudo bem <|5.00|> <|eot|>
+    tokens = [150, tempo(0), 1, 2, tempo(2.4), tempo(2.4), 3, 4, tempo(5), 100]
+    segmentos = _segmentos_dos_tokens(tokens, TokenizerFalso(), 30.0)
+    assert [s["text"] for s in segmentos] == [" olá mundo", " tudo bem"]
+    assert [(s["start"], s["end"]) for s in segmentos] == [
+        (pytest.approx(0.0), pytest.approx(2.4)), (pytest.approx(2.4), pytest.approx(5.0))
+    ]
+
+def test_segmentos_dos_tokens_texto_sem_tempo_final_vai_ate_o_fim_da_janela():
+    tokens = [tempo(0), 1, tempo(1.5), tempo(2.5), 3, 4]
+    segmentos = _segmentos_dos_tokens(tokens, TokenizerFalso(), 4.0)
+    assert segmentos[-1] == {"start": pytest.approx(2.5), "end": 4.0, "text": " tudo bem"}
+
+def test_segmentos_dos_tokens_limita_o_fim_a_duracao_e_ignora_texto_vazio():
+    tokens = [tempo(0), 5, tempo(1), tempo(1), 1, tempo(8)]
+    segmentos = _segmentos_dos_tokens(tokens, TokenizerFalso(), 3.0)
+    assert segmentos == [{"start": pytest.approx(1.0), "end": 3.0, "text": " olá"}]
+    assert _segmentos_dos_tokens([tempo(0), tempo(2)], TokenizerFalso(), 3.0) == []
+
+class PilhaFalsa(list):
+    def to(self, dispositivo):
+        return self
+
+@pytest.fixture
+def whisper_falso(monkeypatch, torch_falso):
+    torch_falso.from_numpy = lambda amostras: amostras
+    torch_falso.stack = PilhaFalsa
+    whisper = types.ModuleType("whisper")
+    whisper.audio = types.SimpleNamespace(SAMPLE_RATE=16000)
+    whisper.pad_or_trim = lambda amostras: amostras
+    whisper.log_mel_spectrogram = lambda amostras, n_mels: ("mel", len(amostras), n_mels)
+    whisper.DecodingOptions = lambda **opcoes: opcoes
+    whisper.resultados = []
+
+    def decode(modelo, mels, opcoes):
+        whisper.chamada = (mels, opcoes)
+        return whisper.resultados
+    whisper.decode = decode
+    tokenizer = types.ModuleType("whisper.tokenizer")
+    tokenizer.get_tokenizer = lambda *args, **kwargs: TokenizerFalso()
+    monkeypatch.setitem(sys.modules, "whisper", whisper)
+    monkeypatch.setitem(sys.modules, "whisper.tokenizer", tokenizer)
+    return whisper
+
+def backend_whisper_falso(refeitas):
+    backend = BackendWhisper.__new__(BackendWhisper)
+    backend.modelo = types.SimpleNamespace(
+        dims=types.SimpleNamespace(n_mels=80), device=types.SimpleNamespace(type="cpu"),
+        is_multilingual=True, num_languages=99
+    )
+    backend.transcrever = lambda janela, idioma, tarefa: refeitas.append(len(janela)) or [{"refeita": True}]
+    return backend
+
+def resultado(tokens=(), sem_fala=0.1, logprob=-0.3, compressao=1.5):
+    return types.SimpleNamespace(tokens=list(tokens), no_speech_prob=sem_fala, avg_logprob=logprob,
+                                 compression_ratio=compressao)
+
+def test_transcrever_janelas_decodifica_em_lote(whisper_falso):
+    janelas = [np.zeros(30 * 16000, np.float32), np.zeros(2 * 16000, np.float32),
+               np.zeros(10 * 16000, np.float32), np.zeros(16000, np.float32)]
+    whisper_falso.resultados = [
+        resultado([tempo(0), 1, 2, tempo(5)]),
+        # Silêncio: pouca chance de fala e baixa probabilidade média
+        resultado([tempo(0), 1, tempo(1)], sem_fala=0.9, logprob=-1.5),
+        # Texto repetitivo: refeito sozinho pelo transcribe
+        resultado([tempo(0), 1, tempo(1)], compressao=3.0),
+        # O tempo final passa da janela de 1 s
+        resultado([tempo(0), 3, tempo(5)]),
+    ]
+    refeitas = []
+    saida = backend_whisper_falso(refeitas).transcrever_janelas(janelas, "auto")
+
+    mels, opcoes = whisper_falso.chamada
+    assert [mel[1] for mel in mels] == [len(janela) for janela in janelas]
+    assert opcoes == {"task": "transcribe", "language": None, "fp16": False}
+    assert refeitas == [10 * 16000]
+    assert saida == [
+        [{"start": 0.0, "end": pytest.approx(5.0), "text": " olá mundo"}],
+        [],
+        [{"refeita": True}],
+        [{"start": 0.0, "end": 1.0, "text": " tudo"}],
+    ]
+
+def test_transcrever_janelas_sem_janelas(whisper_falso):
+    assert backend_whisper_falso([]).transcrever_janelas([], "pt") == []
+    assert not hasattr(whisper_falso, "chamada")
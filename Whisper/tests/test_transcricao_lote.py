@@ -0,0 +1,53 @@
+import numpy as np
+
+import transcricao_lote
+from audio_memoria import AudioDecodificado
+from transcricao_lote import janelas_audio, transcrever_lote
+
+TAXA = 16000
+
+def test_janelas_audio_de_30_s_com_o_inicio_de_cada_uma():
+    amostras = np.arange(65 * TAXA, dtype=np.float32)
+    janelas = list(janelas_audio(amostras, TAXA))
+    assert [inicio for inicio, _ in janelas] == [0.0, 30.0, 60.0]
+    assert [len(janela) for _, janela in janelas] == [30 * TAXA, 30 * TAXA, 5 * TAXA]
+    # Cada janela começa na amostra correspondente ao seu início
+    assert [janela[0] for _, janela in janelas] == [0, 30 * TAXA, 60 * TAXA]
+
+def test_janelas_audio_descarta_sobra_curta_no_fim():
+    curta = np.zeros(30 * TAXA + int(0.1 * TAXA), np.float32)
+    assert [inicio for inicio, _ in janelas_audio(curta, TAXA)] == [0.0]
+    minima = np.zeros(30 * TAXA + int(0.2 * TAXA), np.float32)
+    assert [inicio for inicio, _ in janelas_audio(minima, TAXA)] == [0.0, 30.0]
+    assert list(janelas_audio(np.zeros(0, np.float32), TAXA)) == []
+
+class ModeloFalso:
+    """Devolve um segmento de 1 s a 2 s por janela, com tempos relativos a ela."""
+    def __init__(self):
+        self.lotes = []
+
+    def transcrever_janelas(self, janelas, idioma=None, tarefa="transcribe"):
+        self.lotes.append(len(janelas))
+        return [[{"start": 1.0, "end": 2.0, "text": f" {len(janela) // TAXA}s"}] for janela in janelas]
+
+def test_transcrever_lote_soma_o_inicio_da_janela(monkeypatch):
+    duracoes = {"a.wav": 65, "b.wav": 10}
+    modelo = ModeloFalso()
+    monkeypatch.setattr(transcricao_lote, "decodificar_audio", lambda caminho, cancelar=None:
+                        AudioDecodificado(np.zeros(duracoes[caminho] * TAXA, np.float32), TAXA))
+    monkeypatch.setattr(transcricao_lote, "obter_backend", lambda *args: modelo)
+    concluidos = []
+
+    resultados = transcrever_lote(["a.wav", "b.wav"], backend="ctranslate2", tamanho_lote=2,
+                                  arquivo_callback=lambda caminho, resultado: concluidos.append(caminho))
+
+    # A última janela de a.wav e a de b.wav dividem o segundo lote
+    assert modelo.lotes == [2, 2]
+    assert concluidos == ["a.wav", "b.wav"]
+    a, b = resultados["a.wav"], resultados["b.wav"]
+    assert [(s["start"], s["end"], s["text"]) for s in a["segmentos"]] == [
+        (1.0, 2.0, " 30s"), (31.0, 32.0, " 30s"), (61.0, 62.0, " 5s")
+    ]
+    assert [(s["start"], s["end"], s["text"]) for s in b["segmentos"]] == [(1.0, 2.0, " 10s")]
+    assert (a["duracao"], b["duracao"]) == (65.0, 10.0)
+    assert a["erro"] == b["erro"] == ""
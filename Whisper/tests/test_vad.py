@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from vad import RegioesFala, detectar_fala
+
+TAXA = 1000
+
+@pytest.fixture
+def regioes():
+    # Fala em [1 s, 3 s) e [6 s, 7 s) de um áudio de 10 s; 100 ms de separação no condensado
+    return RegioesFala([(1000, 3000), (6000, 7000)], TAXA, 10000)
+
+def test_inicios_e_proporcao(regioes):
+    assert regioes.inicios_condensados == [0, 2100]
+    assert regioes.proporcao_fala == pytest.approx(0.3)
+
+def test_condensar_junta_regioes_com_silencio():
+    amostras = np.arange(10, dtype=np.float32)
+    condensado = RegioesFala([(1, 3), (6, 7)], 100, 10, separacao_ms=20).condensar(amostras)
+    assert condensado.tolist() == [1, 2, 0, 0, 6]
+
+def test_para_original(regioes):
+    assert regioes.para_original(0.0) == 1.0
+    assert regioes.para_original(1.5) == 2.5
+    # Dentro do silêncio de separação: preso ao fim da primeira região
+    assert regioes.para_original(2.05) == 3.0
+    assert regioes.para_original(2.1) == 6.0
+    assert regioes.para_original(2.6) == 6.5
+    # Depois do fim do áudio condensado: preso ao fim da última região
+    assert regioes.para_original(50.0) == 7.0
+
+def test_sem_regioes_mantem_o_tempo():
+    assert RegioesFala([], TAXA, 10000).para_original(4.2) == 4.2
+
+def test_remapear_segmentos_e_palavras(regioes):
+    segmentos = [
+        {"start": 0.5, "end": 2.6, "text": " oi", "words": [{"word": " oi", "start": 2.2, "end": 2.6}]},
+    ]
+    assert regioes.remapear_segmentos(segmentos) == [
+        {"start": 1.5, "end": 6.5, "text": " oi", "words": [{"word": " oi", "start": 6.1, "end": 6.5}]},
+    ]
+    # A entrada não é alterada
+    assert segmentos[0]["start"] == 0.5
+    assert regioes.remapear_turnos([(0.0, 2.2, "SPEAKER_00")]) == [(1.0, 6.1, "SPEAKER_00")]
+
+def test_detectar_fala_por_energia():
+    taxa = 16000
+    rng = np.random.default_rng(0)
+    amostras = (rng.standard_normal(taxa * 6) * 0.001).astype(np.float32)
+    amostras[2 * taxa:4 * taxa] += np.sin(np.arange(2 * taxa) * 2 * np.pi * 220 / taxa).astype(np.float32) * 0.5
+    regioes = detectar_fala(amostras, taxa)
+    assert len(regioes) == 1
+    inicio, fim = regioes[0]
+    # Região de fala com a margem de 300 ms de cada lado
+    assert abs(inicio - int(1.7 * taxa)) <= 480 and abs(fim - int(4.3 * taxa)) <= 480
+
+def test_metodo_desconhecido():
+    with pytest.raises(ValueError):
+        detectar_fala(np.zeros(1600, dtype=np.float32), 16000, metodo="outro")
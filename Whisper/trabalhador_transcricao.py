@@ -0,0 +1,191 @@
+import time
+import queue
+import atexit
+import threading
+import multiprocessing
+
+# Tempo máximo de espera ao encerrar o processo antes de forçar o término
+TEMPO_ENCERRAMENTO_S = 5
+
+def _laco_trabalhador(fila_jobs, fila_eventos, cancelar):
+    """
+    Laço do processo de transcrição. Recebe jobs pela fila, um de cada vez, e publica
+    eventos (tipo, id_job, dados) em fila_eventos. O modelo carregado fica em memória
+    entre os jobs; None na fila encerra o processo. Ao iniciar publica ("pronto", None, erro).
+    """
+    # Antes de importar torch/numpy: as bibliotecas de álgebra linear dimensionam seus pools ao carregar.
+    # O orçamento de cada job é reaplicado depois com torch.set_num_threads (ver governador_recursos).
+    from governador_recursos import obter_governador, aplicar_ambiente
+    aplicar_ambiente(obter_governador().orcamento())
+
+    # Importado só no processo filho: o torch e os modelos nunca entram no processo da interface.
+    # As bibliotecas pesadas carregam aqui enquanto a interface já está aberta, antes do primeiro job.
+    from transcricao_core import transcrever_com_diarizacao, carregar_bibliotecas, encerrar_executor_diarizacao
+    from indice_busca import IndiceTranscricoes
+    try:
+        carregar_bibliotecas()
+        fila_eventos.put(("pronto", None, None))
+    except Exception as e:
+        fila_eventos.put(("pronto", None, str(e)))
+
+    def atualizar_indice():
+        # O índice de busca é auxiliar: se falhar aqui, a próxima atualização (ou a CLI) o recupera
+        try:
+            indice = IndiceTranscricoes()
+            try:
+                indice.atualizar()
+            finally:
+                indice.fechar()
+        except Exception:
+            pass
+
+    while True:
+        job = fila_jobs.get()
+        if job is None:
+            encerrar_executor_diarizacao()
+            break
+        id_job = job["id"]
+        fila_eventos.put(("inicio", id_job, None))
+
+        def progresso_callback(valor, texto=""):
+            fila_eventos.put(("progresso", id_job, (valor, texto)))
+
+        def metricas_callback(resumo):
+            fila_eventos.put(("metricas", id_job, resumo))
+
+        def segmentos_callback(lote):
+            # Só o que a interface exibe; palavras e tradução ficam nos arquivos
+            fila_eventos.put(("segmentos", id_job, [
+                {"start": s["start"], "end": s["end"], "speaker": s["speaker"], "text": s["text"]} for s in lote
+            ]))
+
+        transcrever = transcrever_com_diarizacao
+        if job.get("url"):
+            # Importado só quando preciso: o yt-dlp não é necessário para transcrever arquivos locais
+            from Processamento_video import transcrever_do_youtube as transcrever
+
+        try:
+            visao = transcrever(
+                job["caminho"], job["modelo"], job["idioma"], progresso_callback,
+                backend=job.get("backend", "whisper"), opcoes_backend=job.get("opcoes_backend"),
+                metricas_callback=metricas_callback, cancelar=cancelar,
+                execucao_paralela=job.get("execucao_paralela", False), divisao_cpu=job.get("divisao_cpu", 0.5),
+                usar_vad=job.get("usar_vad", True), formatos=job.get("formatos", ("txt",)),
+                segmentos_callback=segmentos_callback, identificar_falantes=job.get("identificar_falantes", True)
+            )
+            # Os segmentos já foram enviados em lotes; o resultado leva só os arquivos gravados
+            fila_eventos.put(("resultado", id_job, visao.arquivos))
+            atualizar_indice()
+        except Exception as e:
+            if cancelar.is_set():
+                fila_eventos.put(("cancelado", id_job, None))
+            else:
+                fila_eventos.put(("erro", id_job, str(e)))
+
+class TrabalhadorTranscricao:
+    """
+    Processo persistente que executa as transcrições fora do processo da interface.
+    Recebe um job por vez (enviar); quem controla a fila de espera é o chamador.
+    Os eventos são lidos com proximo_evento: ("pronto" | "inicio" | "progresso" | "metricas" |
+    "segmentos" | "resultado" | "erro" | "cancelado", id_job, dados).
+    """
+    def __init__(self):
+        self._contexto = multiprocessing.get_context("spawn")
+        self._processo = None
+        self._fila_jobs = None
+        self._fila_eventos = None
+        self._cancelar = None
+        # job_atual é lido e alterado pela thread que ouve os eventos e pela thread da interface
+        self._trava = threading.Lock()
+        self._job_atual = None
+        self._atexit_registrado = False
+
+    @property
+    def job_atual(self):
+        with self._trava:
+            return self._job_atual
+
+    def _concluir_job(self):
+        """Libera o trabalhador; devolve o id do job que estava em andamento."""
+        with self._trava:
+            id_job, self._job_atual = self._job_atual, None
+        return id_job
+
+    def iniciar(self):
+        self._fila_jobs = self._contexto.Queue()
+        self._fila_eventos = self._contexto.Queue()
+        self._cancelar = self._contexto.Event()
+        self._processo = self._contexto.Process(
+            target=_laco_trabalhador,
+            args=(self._fila_jobs, self._fila_eventos, self._cancelar)
+        )
+        # Não é daemon para poder abrir o processo de diarização paralela; o atexit garante o encerramento
+        self._processo.start()
+        # Um registro só: encerrar() vale para qualquer processo que esteja ativo na saída
+        if not self._atexit_registrado:
+            atexit.register(self.encerrar)
+            self._atexit_registrado = True
+
+    def ativo(self):
+        return self._processo is not None and self._processo.is_alive()
+
+    def ocupado(self):
+        return self.job_atual is not None
+
+    def enviar(self, job):
+        """
+        Envia um job {"id", "caminho", "modelo", "idioma", "backend", "opcoes_backend",
+        "execucao_paralela", "divisao_cpu", "usar_vad", "formatos", "identificar_falantes"}.
+        Com "url" verdadeiro, "caminho" é a URL de um vídeo do YouTube e só o áudio é baixado.
+        """
+        with self._trava:
+            if self._job_atual is not None:
+                raise RuntimeError("O trabalhador já está processando um job.")
+            self._job_atual = job["id"]
+        try:
+            if not self.ativo():
+                self.iniciar()
+            self._cancelar.clear()
+            self._fila_jobs.put(job)
+        except BaseException:
+            self._concluir_job()
+            raise
+
+    def cancelar_atual(self):
+        """Pede a interrupção do job em andamento; ela acontece na próxima troca de etapa."""
+        if self.ocupado():
+            self._cancelar.set()
+
+    def proximo_evento(self, timeout=0.2):
+        """
+        Próximo evento do processo, ou None se nada chegou dentro do timeout.
+        Se o processo morrer no meio de um job, devolve um evento de erro para esse job.
+        """
+        if self._fila_eventos is None:
+            time.sleep(timeout)
+            return None
+        try:
+            evento = self._fila_eventos.get(timeout=timeout)
+        except queue.Empty:
+            if self.ocupado() and not self.ativo():
+                id_job = self._concluir_job()
+                if id_job is not None:
+                    return ("erro", id_job, "O processo de transcrição foi encerrado inesperadamente.")
+            return None
+        if evento[0] in ("resultado", "erro", "cancelado"):
+            self._concluir_job()
+        return evento
+
+    def encerrar(self):
+        if self._processo is None:
+            return
+        if self.ocupado():
+            self._cancelar.set()
+        if self._processo.is_alive():
+            self._fila_jobs.put(None)
+            self._processo.join(TEMPO_ENCERRAMENTO_S)
+            if self._processo.is_alive():
+                self._processo.terminate()
+                self._processo.join()
+        self._processo = None
+        self._concluir_job()
@@ -1,155 +1,673 @@
 import os
-import whisper
-from pyannote.audio import Pipeline
-from datetime import timedelta
-import ffmpeg
+import time
+import signal
+import itertools
+import multiprocessing
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor, wait
+import numpy as np
 from dotenv import load_dotenv
+import cache_transcricao
+from audio_memoria import AudioDecodificado, decodificar_audio, abrir_audio_mapeado
+from vad import RegioesFala, detectar_fala
+from pos_processamento import remover_repeticoes
+from metricas import MedidorEtapas, memoria_atual_mb
+from executor_ffmpeg import formatar_progresso
+from escritores_transcricao import criar_escritores, escrever_transcricao, VisaoTranscricao
+from falantes import BancoFalantes
+from governador_recursos import obter_governador, total_nucleos
 
-def format_timestamp(seconds):
-    return str(timedelta(seconds=float(seconds))).split('.')[0]
+def busca_sobreposicao(segmentos):
+    """
+    Prepara a busca dos segmentos que se sobrepõem a um intervalo: devolve uma função
+    (inicio, fim) -> segmentos, em ordem de início, que custa O(log n + resultado) por consulta.
+    """
+    segmentos = sorted(segmentos, key=lambda s: s["start"])
+    inicios = [s["start"] for s in segmentos]
+    # Maior fim visto até cada posição: é crescente, então aceita busca binária
+    fins_maximos = list(itertools.accumulate((s["end"] for s in segmentos), max))
+
+    def sobrepostos(inicio, fim):
+        primeiro = bisect_left(fins_maximos, inicio)
+        ultimo = bisect_right(inicios, fim)
+        return [s for s in segmentos[primeiro:ultimo] if s["end"] >= inicio]
+    return sobrepostos
+
+def combinar_falantes(turnos, segmentos_whisper):
+    """Associa o texto dos segmentos do Whisper a cada turno de fala da diarização."""
+    sobrepostos = busca_sobreposicao(segmentos_whisper)
+    segments = []
+    for start_time, end_time, speaker in turnos:
+        encontrados = sobrepostos(start_time, end_time)
+        segment_text = " ".join(segment["text"] for segment in encontrados).strip()
+        if segment_text:
+            segment = {
+                "speaker": speaker,
+                "start": start_time,
+                "end": end_time,
+                "text": segment_text
+            }
+            # Só as palavras que começam dentro do turno: cada palavra fica em um único registro
+            palavras = [
+                p for encontrado in encontrados for p in encontrado.get("words", ())
+                if start_time <= p["start"] < end_time
+            ]
+            if palavras:
+                segment["words"] = palavras
+            segments.append(segment)
+    return remover_repeticoes(segments)
 
-def remove_repeticoes(segments):
-    if not segments:
-        return segments
-    cleaned_segments = []
-    previous_segment = None
+def associar_traducao(segments, segmentos_traducao):
+    """Guarda em cada segmento combinado ("traducao") o texto traduzido que se sobrepõe a ele."""
+    sobrepostos = busca_sobreposicao(segmentos_traducao or [])
     for segment in segments:
-        if previous_segment is None:
-            cleaned_segments.append(segment)
-            previous_segment = segment
-            continue
-        current_text = segment["text"].strip().lower()
-        previous_text = previous_segment["text"].strip().lower()
-        cleaned_current = ''.join(c for c in current_text if c.isalnum() or c.isspace())
-        cleaned_prev = ''.join(c for c in previous_text if c.isalnum() or c.isspace())
-        if (abs(len(cleaned_current) - len(cleaned_prev)) > 10 or  
-            (cleaned_current not in cleaned_prev and cleaned_prev not in cleaned_current)):
-            cleaned_segments.append(segment)
-            previous_segment = segment
-    return cleaned_segments
-
-def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, progresso_callback=None):
+        traducao = " ".join(t["text"] for t in sobrepostos(segment["start"], segment["end"])).strip()
+        if traducao:
+            segment["traducao"] = traducao
+    return segments
+
+class BackendInferencia:
     """
-    Adiciona parâmetro idioma (código do idioma ou None para detecção automática).
+    Interface dos backends de inferência. Cada backend carrega o modelo uma vez
+    e devolve segmentos no formato {"start", "end", "text"} usado pelo restante do pipeline.
+    """
+    nome = None
+
+    def __init__(self, modelo_escolhido, **opcoes):
+        self.modelo_escolhido = modelo_escolhido
+        self.opcoes = opcoes
+
+    def transcrever(self, amostras, idioma=None, tarefa="transcribe", palavras=False):
+        """palavras=True inclui em cada segmento "words": [{"word", "start", "end"}]."""
+        raise NotImplementedError
+
+    def transcrever_janelas(self, janelas, idioma=None, tarefa="transcribe"):
+        """
+        Transcreve várias janelas de até 30 s (de um ou mais arquivos) e devolve uma lista de
+        segmentos por janela, com tempos relativos ao início dela. Por padrão, uma janela de cada vez.
+        """
+        return [self.transcrever(janela, idioma, tarefa) for janela in janelas]
+
+class BackendWhisper(BackendInferencia):
+    """Implementação de referência do Whisper em PyTorch."""
+    nome = "whisper"
+
+    def __init__(self, modelo_escolhido, **opcoes):
+        super().__init__(modelo_escolhido, **opcoes)
+        import whisper
+        self.modelo = whisper.load_model(modelo_escolhido)
+
+    def transcrever(self, amostras, idioma=None, tarefa="transcribe", palavras=False):
+        kwargs = {"task": tarefa, "word_timestamps": palavras}
+        if idioma and idioma != "auto":
+            kwargs["language"] = idioma
+        resultado = self.modelo.transcribe(amostras, **kwargs)
+        segmentos = []
+        for s in resultado["segments"]:
+            segmento = {"start": s["start"], "end": s["end"], "text": s["text"]}
+            if palavras:
+                segmento["words"] = [{"word": p["word"], "start": p["start"], "end": p["end"]} for p in s.get("words", [])]
+            segmentos.append(segmento)
+        return segmentos
+
+    def transcrever_janelas(self, janelas, idioma=None, tarefa="transcribe"):
+        """
+        Decodifica as janelas em um único lote: os espectrogramas (completados até 30 s) são empilhados
+        e passam juntos pelo encoder e pelo decoder. Janelas que falham nos limiares do transcribe
+        (texto repetitivo ou pouco provável) são refeitas sozinhas, com o fallback de temperatura dele.
+        """
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+        if not janelas:
+            return []
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(np.ascontiguousarray(janela))),
+                                        self.modelo.dims.n_mels)
+            for janela in janelas
+        ]).to(self.modelo.device)
+        opcoes = whisper.DecodingOptions(
+            task=tarefa, language=None if idioma in (None, "auto") else idioma,
+            fp16=self.modelo.device.type != "cpu"
+        )
+        resultados = whisper.decode(self.modelo, mels, opcoes)
+        tokenizer = get_tokenizer(self.modelo.is_multilingual, num_languages=self.modelo.num_languages, task=tarefa)
+
+        saida = []
+        for janela, resultado in zip(janelas, resultados):
+            duracao = len(janela) / whisper.audio.SAMPLE_RATE
+            if resultado.no_speech_prob > LIMIAR_SEM_FALA and resultado.avg_logprob < LIMIAR_LOGPROB:
+                saida.append([])
+            elif resultado.compression_ratio > LIMIAR_COMPRESSAO or resultado.avg_logprob < LIMIAR_LOGPROB:
+                saida.append(self.transcrever(janela, idioma, tarefa))
+            else:
+                saida.append(_segmentos_dos_tokens(resultado.tokens, tokenizer, duracao))
+        return saida
+
+# Limiares do transcribe do Whisper: abaixo de LIMIAR_LOGPROB com LIMIAR_SEM_FALA a janela é silêncio;
+# acima de LIMIAR_COMPRESSAO o texto é repetitivo demais para ser aceito sem refazer
+LIMIAR_SEM_FALA = 0.6
+LIMIAR_LOGPROB = -1.0
+LIMIAR_COMPRESSAO = 2.4
+# Cada token de tempo do Whisper vale 20 ms
+PRECISAO_TEMPO_S = 0.02
+
+def _segmentos_dos_tokens(tokens, tokenizer, duracao):
+    """
+    Segmentos de uma janela a partir dos tokens decodificados com tempos:
+    <|0.00|> texto <|2.40|><|2.40|> texto <|5.00|>... Texto sem tempo final vai até o fim da janela.
+    """
+    segmentos = []
+    inicio = 0.0
+    texto = []
+
+    def fechar(fim):
+        conteudo = tokenizer.decode(texto).strip()
+        if conteudo:
+            segmentos.append({"start": inicio, "end": min(max(fim, inicio), duracao), "text": " " + conteudo})
+
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            tempo = (token - tokenizer.timestamp_begin) * PRECISAO_TEMPO_S
+            if texto:
+                fechar(tempo)
+                texto = []
+            inicio = tempo
+        elif token < tokenizer.eot:
+            texto.append(token)
+    if texto:
+        fechar(duracao)
+    return segmentos
+
+class BackendCTranslate2(BackendInferencia):
+    """
+    Backend baseado em CTranslate2 (faster-whisper), com quantização int8 para CPU.
+    Opções: compute_type ("int8", "int8_float32", "float32"...), cpu_threads (0 = automático) e num_workers.
+    """
+    nome = "ctranslate2"
+
+    def __init__(self, modelo_escolhido, compute_type="int8", cpu_threads=0, num_workers=1, **opcoes):
+        super().__init__(modelo_escolhido, **opcoes)
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("Backend ctranslate2 requer o pacote faster-whisper (pip install faster-whisper)")
+        self.modelo = WhisperModel(
+            modelo_escolhido,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=int(cpu_threads),
+            num_workers=int(num_workers)
+        )
+
+    def transcrever(self, amostras, idioma=None, tarefa="transcribe", palavras=False):
+        if idioma == "auto":
+            idioma = None
+        gerados, _ = self.modelo.transcribe(amostras, language=idioma, task=tarefa, word_timestamps=palavras)
+        segmentos = []
+        for s in gerados:
+            segmento = {"start": s.start, "end": s.end, "text": s.text}
+            if palavras:
+                segmento["words"] = [{"word": p.word, "start": p.start, "end": p.end} for p in (s.words or [])]
+            segmentos.append(segmento)
+        return segmentos
+
+BACKENDS = {
+    BackendWhisper.nome: BackendWhisper,
+    BackendCTranslate2.nome: BackendCTranslate2,
+}
+
+def identificador_backend(backend, opcoes_backend=None):
+    """Identifica o que altera o resultado da inferência (usado na chave do cache)."""
+    if backend == BackendCTranslate2.nome:
+        return f"{backend}:{(opcoes_backend or {}).get('compute_type', 'int8')}"
+    return backend
+
+def criar_backend(backend, modelo_escolhido, opcoes_backend=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferência desconhecido: {backend}")
+    return BACKENDS[backend](modelo_escolhido, **(opcoes_backend or {}))
+
+PIPELINE_DIARIZACAO = "pyannote/speaker-diarization-3.1"
+
+# Modelo e pipeline de diarização já carregados neste processo, reaproveitados entre transcrições
+_carregados = {"chave_modelo": None, "modelo": None, "pipeline": None, "executor_diarizacao": None,
+               "pid_diarizacao": None, "falantes": None}
+
+def obter_backend(backend, modelo_escolhido, opcoes_backend=None):
+    """
+    Devolve o backend carregado para (backend, modelo, opções), reaproveitando o da transcrição anterior.
+    Só um modelo fica na memória: trocar de modelo libera o anterior antes de carregar o novo.
+    """
+    chave = (backend, modelo_escolhido, tuple(sorted((opcoes_backend or {}).items())))
+    if _carregados["chave_modelo"] != chave:
+        _carregados["chave_modelo"] = None
+        _carregados["modelo"] = None
+        _carregados["modelo"] = criar_backend(backend, modelo_escolhido, opcoes_backend)
+        _carregados["chave_modelo"] = chave
+    return _carregados["modelo"]
+
+def obter_pipeline_diarizacao(token):
+    if _carregados["pipeline"] is None:
+        from pyannote.audio import Pipeline
+        _carregados["pipeline"] = Pipeline.from_pretrained(
+            PIPELINE_DIARIZACAO,
+            use_auth_token=token
+        )
+    return _carregados["pipeline"]
+
+def obter_banco_falantes():
+    """Banco de falantes conhecidos, aberto uma vez por processo (a matriz de busca fica em memória)."""
+    if _carregados["falantes"] is None:
+        _carregados["falantes"] = BancoFalantes()
+    return _carregados["falantes"]
+
+def carregar_bibliotecas():
+    """Importa antecipadamente torch, Whisper e pyannote (usado pelo processo de transcrição ao iniciar)."""
+    import whisper
+    import pyannote.audio
+
+class TranscricaoCancelada(RuntimeError):
+    pass
+
+def verificar_cancelamento(cancelar):
+    """Interrompe o processamento entre etapas quando cancelar (Event) foi acionado."""
+    if cancelar is not None and cancelar.is_set():
+        raise TranscricaoCancelada("Transcrição cancelada.")
+
+def divisao_threads(divisao_cpu=0.5, total=None):
+    """Divide 'total' threads (por padrão, todos os núcleos) entre diarização e Whisper quando as duas etapas rodam ao mesmo tempo."""
+    total = total or total_nucleos()
+    if total < 2:
+        return 1, 1
+    diarizacao = min(total - 1, max(1, round(total * divisao_cpu)))
+    return diarizacao, total - diarizacao
+
+@contextmanager
+def _threads_torch(threads):
+    """Limita as threads do torch neste processo durante o bloco."""
+    import torch
+    anterior = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(anterior)
+
+def threads_fixadas(opcoes_backend):
+    """Threads fixadas pelo chamador em cpu_threads (0 = automático, limitado pelo orçamento do job)."""
+    return int((opcoes_backend or {}).get("cpu_threads") or 0)
+
+def limitar_backend(backend, opcoes_backend, threads):
+    """
+    Contexto que limita a inferência a 'threads'.
+    O Whisper em PyTorch usa torch.set_num_threads durante o bloco. O CTranslate2 só aceita threads
+    na carga do modelo, que fica em cache entre os jobs: ele usa cpu_threads das opções (ou o automático,
+    que segue o ambiente aplicado ao iniciar o processo) e não é recarregado a cada orçamento.
+    """
+    if backend == BackendCTranslate2.nome:
+        return nullcontext()
+    return _threads_torch(threads)
+
+def _diarizar(audio, token):
+    """Turnos [(inicio, fim, rotulo)] e o embedding que o pipeline calculou para cada rótulo."""
+    diarization, vetores = obter_pipeline_diarizacao(token)(audio.para_pyannote(), return_embeddings=True)
+    turnos = [(turn.start, turn.end, speaker) for turn, _, speaker in diarization.itertracks(yield_label=True)]
+    # Rótulos com pouca fala limpa podem vir sem embedding (NaN); esses não são identificados
+    embeddings = {
+        rotulo: vetores[i] for i, rotulo in enumerate(diarization.labels())
+        if i < len(vetores) and np.isfinite(vetores[i]).all()
+    }
+    return turnos, embeddings
+
+def _diarizar_em_processo(token, caminho_amostras, taxa, threads):
+    """Roda no processo de diarização, que mantém o pipeline carregado entre os jobs."""
+    import torch
+    torch.set_num_threads(threads)
+    inicio_parede = time.perf_counter()
+    inicio_cpu = time.process_time()
+    rss_inicio = memoria_atual_mb()
+    audio = abrir_audio_mapeado(caminho_amostras, taxa)
+    try:
+        diarizacao = _diarizar(audio, token)
+    finally:
+        audio.fechar()
+    medidas = {
+        "tempo_parede_s": round(time.perf_counter() - inicio_parede, 3),
+        "tempo_cpu_s": round(time.process_time() - inicio_cpu, 3),
+        "rss_inicio_mb": rss_inicio,
+        "rss_fim_mb": memoria_atual_mb(),
+    }
+    return diarizacao, medidas
+
+def _registrar_pid(pid_compartilhado):
+    pid_compartilhado.value = os.getpid()
+
+def _executor_diarizacao():
+    if _carregados["executor_diarizacao"] is None:
+        contexto = multiprocessing.get_context("spawn")
+        # O processo de diarização informa o próprio PID, para poder ser interrompido no cancelamento
+        _carregados["pid_diarizacao"] = contexto.Value("i", 0)
+        _carregados["executor_diarizacao"] = ProcessPoolExecutor(
+            max_workers=1, mp_context=contexto,
+            initializer=_registrar_pid, initargs=(_carregados["pid_diarizacao"],)
+        )
+    return _carregados["executor_diarizacao"]
+
+def encerrar_executor_diarizacao(forcar=False):
+    """Encerra o processo de diarização paralela; forcar=True interrompe uma diarização em andamento."""
+    executor, pid = _carregados["executor_diarizacao"], _carregados["pid_diarizacao"]
+    _carregados["executor_diarizacao"] = _carregados["pid_diarizacao"] = None
+    if executor is None:
+        return
+    if forcar and pid is not None and pid.value:
+        try:
+            # No Windows, SIGTERM vira TerminateProcess
+            os.kill(pid.value, signal.SIGTERM)
+        except OSError:
+            pass
+    executor.shutdown(wait=not forcar, cancel_futures=True)
+
+def _aguardar_diarizacao(futuro, cancelar):
+    while True:
+        concluidos, _ = wait([futuro], timeout=0.2)
+        if concluidos:
+            break
+        if cancelar is not None and cancelar.is_set():
+            encerrar_executor_diarizacao(forcar=True)
+            verificar_cancelamento(cancelar)
+    try:
+        return futuro.result()
+    except Exception:
+        # Um processo de diarização quebrado não deve ser reaproveitado no próximo job
+        encerrar_executor_diarizacao(forcar=True)
+        raise
+
+def _transcrever_e_traduzir(audio, modelo_escolhido, idioma, traduzir, progresso_callback, backend,
+                            opcoes_backend, medidor, cancelar, palavras=False):
+    if progresso_callback:
+        progresso_callback(50, "Transcrevendo com Whisper")
+    with medidor.etapa("carregamento_modelo"):
+        modelo = obter_backend(backend, modelo_escolhido, opcoes_backend)
+    with medidor.etapa("transcricao"):
+        segmentos_whisper = modelo.transcrever(audio.amostras, idioma, palavras=palavras)
+    if progresso_callback:
+        progresso_callback(80, "Transcrição concluída")
+
+    segmentos_traducao = None
+    if traduzir:
+        verificar_cancelamento(cancelar)
+        if progresso_callback:
+            progresso_callback(92, "Traduzindo para o inglês")
+        with medidor.etapa("traducao"):
+            segmentos_traducao = modelo.transcrever(audio.amostras, idioma, tarefa="translate")
+    return segmentos_whisper, segmentos_traducao
+
+# Com mais fala que isso, condensar o áudio não compensa a cópia
+LIMITE_PROPORCAO_FALA = 0.95
+
+def _aplicar_vad(audio, metodo_vad, medidor, progresso_callback):
+    """
+    Detecta as regiões de fala. Devolve (regioes, audio_para_inferencia): o áudio condensado
+    quando há silêncio suficiente para compensar; senão o próprio áudio, com regioes=None
+    (ou com regioes vazias, se não há fala nenhuma).
+    """
+    if progresso_callback:
+        progresso_callback(15, "Detectando trechos de fala")
+    with medidor.etapa("vad"):
+        regioes = RegioesFala(detectar_fala(audio.amostras, audio.taxa, metodo_vad), audio.taxa, len(audio.amostras))
+        medidor.contexto["proporcao_fala"] = round(regioes.proporcao_fala, 3)
+        if not regioes.regioes:
+            return regioes, audio
+        if regioes.proporcao_fala >= LIMITE_PROPORCAO_FALA:
+            return None, audio
+        return regioes, AudioDecodificado(regioes.condensar(audio.amostras), audio.taxa)
+
+def _executar_inferencia(caminho_arquivo, modelo_escolhido, idioma, traduzir, pasta_temp, progresso_callback=None,
+                         backend="whisper", opcoes_backend=None, medidor=None, cancelar=None,
+                         execucao_paralela=False, divisao_cpu=0.5, usar_vad=True, metodo_vad="energia",
+                         palavras=False, turnos_cache=None, reserva=None):
+    """
+    Roda diarização, transcrição e (opcionalmente) tradução.
+    Com usar_vad, só os trechos com fala (ver vad.py) passam pela inferência e os tempos
+    são convertidos de volta para a linha do tempo original.
+    Com execucao_paralela, a diarização roda em outro processo enquanto o Whisper carrega e transcreve;
+    divisao_cpu é a fração dos núcleos dada à diarização.
+    palavras=True pede ao backend os tempos de cada palavra.
+    turnos_cache (turnos de uma diarização anterior do mesmo áudio) pula a diarização.
+    reserva (ver governador_recursos) limita as threads de cada etapa ao orçamento do job,
+    relido entre as etapas; sem ela, cada etapa usa todos os núcleos. cpu_threads em opcoes_backend
+    fixa a contagem e dispensa o orçamento.
+    Retorna turnos, embeddings dos falantes ({rotulo: vetor}; vazio com turnos_cache), segmentos do Whisper,
+    segmentos traduzidos (ou None) e a duração do áudio.
     """
-    load_dotenv()
-    PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
-    PASTA_TRANSCRICOES = os.path.join(PASTA_SCRIPT, "Transcricoes")
-    if not os.path.exists(PASTA_TRANSCRICOES):
-        os.makedirs(PASTA_TRANSCRICOES)
     HUGGINGFACE_TOKEN = os.getenv('HUGGINGFACE_TOKEN')
     if not HUGGINGFACE_TOKEN:
         raise ValueError("Configure a variável HUGGINGFACE_TOKEN no seu arquivo .env")
-
-    nome_base = os.path.splitext(os.path.basename(caminho_arquivo))[0]
-    caminho_audio_temp = None
+    medidor = medidor or MedidorEtapas(caminho_arquivo)
 
     if progresso_callback:
         progresso_callback(5, "Extraindo arquivo")
+    # Decodifica uma única vez; o mesmo buffer alimenta o pyannote, o Whisper e a tradução
+    progresso_extracao = None
+    if progresso_callback:
+        progresso_extracao = lambda p: progresso_callback(5, f"Extraindo áudio: {formatar_progresso(p)}")
+    with medidor.etapa("extracao"):
+        audio = decodificar_audio(
+            caminho_arquivo, pasta_temp=pasta_temp, progresso_callback=progresso_extracao, cancelar=cancelar
+        )
 
-    ext = os.path.splitext(caminho_arquivo)[1].lower()
-    if ext not in ['.wav', '.flac']:
-        caminho_audio_temp = os.path.join(PASTA_SCRIPT, f"temp_{nome_base}.wav")
-        try:
-            stream = ffmpeg.input(caminho_arquivo)
-            stream = ffmpeg.output(stream, caminho_audio_temp, acodec='pcm_s16le', ac=1, ar='16k')
-            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
-            caminho_arquivo_para_diarizacao = caminho_audio_temp
-        except ffmpeg.Error as e:
-            raise RuntimeError("Erro ao extrair áudio com FFmpeg: " + e.stderr.decode())
-    else:
-        caminho_arquivo_para_diarizacao = caminho_arquivo
+    duracao = audio.duracao
+    try:
+        verificar_cancelamento(cancelar)
+        regioes = None
+        if usar_vad:
+            regioes, condensado = _aplicar_vad(audio, metodo_vad, medidor, progresso_callback)
+            if regioes is not None and not regioes.regioes:
+                # Nenhuma fala: não há o que diarizar nem transcrever
+                return [], {}, [], ([] if traduzir else None), duracao
+            if condensado is not audio:
+                # O áudio completo não é mais necessário; libera a memória (ou o memmap) antes da inferência
+                audio.fechar()
+                audio = condensado
+
+        def orcamento():
+            # Threads fixadas pelo chamador prevalecem; no automático, o orçamento do job é relido a cada etapa
+            fixadas = threads_fixadas(opcoes_backend)
+            if fixadas:
+                return fixadas
+            return reserva.threads if reserva is not None else total_nucleos()
+
+        turnos, embeddings = turnos_cache, {}
+        if turnos_cache is not None or not execucao_paralela:
+            if turnos_cache is not None:
+                if progresso_callback:
+                    progresso_callback(40, "Diarização recuperada do cache")
+            else:
+                if progresso_callback:
+                    progresso_callback(20, "Diarizando falantes")
+                with medidor.etapa("diarizacao"), _threads_torch(orcamento()):
+                    turnos, embeddings = _diarizar(audio, HUGGINGFACE_TOKEN)
+                if progresso_callback:
+                    progresso_callback(40, "Diarização concluída")
+                verificar_cancelamento(cancelar)
+
+            with limitar_backend(backend, opcoes_backend, orcamento()):
+                segmentos_whisper, segmentos_traducao = _transcrever_e_traduzir(
+                    audio, modelo_escolhido, idioma, traduzir, progresso_callback, backend,
+                    opcoes_backend, medidor, cancelar, palavras
+                )
+        else:
+            (turnos, embeddings), segmentos_whisper, segmentos_traducao = _inferencia_paralela(
+                audio, HUGGINGFACE_TOKEN, modelo_escolhido, idioma, traduzir, pasta_temp, progresso_callback,
+                backend, opcoes_backend, medidor, cancelar, divisao_cpu, palavras, orcamento(), reserva
+            )
+
+        if regioes is not None:
+            # Turnos do cache já estão na linha do tempo original
+            if turnos_cache is None:
+                turnos = regioes.remapear_turnos(turnos)
+            segmentos_whisper = regioes.remapear_segmentos(segmentos_whisper)
+            if segmentos_traducao is not None:
+                segmentos_traducao = regioes.remapear_segmentos(segmentos_traducao)
+        return turnos, embeddings, segmentos_whisper, segmentos_traducao, duracao
+
+    finally:
+        audio.fechar()
 
+def _inferencia_paralela(audio, token, modelo_escolhido, idioma, traduzir, pasta_temp, progresso_callback,
+                         backend, opcoes_backend, medidor, cancelar, divisao_cpu, palavras=False,
+                         threads=None, reserva=None):
+    """
+    Diarização em outro processo enquanto este carrega o modelo, transcreve e traduz.
+    'threads' é o total dividido entre as duas; a CPU do processo de diarização entra na reserva.
+    """
+    threads_diarizacao, threads_whisper = divisao_threads(divisao_cpu, threads)
     if progresso_callback:
-        progresso_callback(20, "Diarizando falantes")
+        progresso_callback(20, "Diarizando falantes em paralelo com a transcrição")
+    # O processo de diarização lê as amostras de um arquivo mapeado, sem cópia por pickle
+    futuro = _executor_diarizacao().submit(
+        _diarizar_em_processo, token, audio.para_arquivo(pasta_temp), audio.taxa, threads_diarizacao
+    )
     try:
-        pipeline = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization-3.1",
-            use_auth_token=HUGGINGFACE_TOKEN
-        )
-        diarization = pipeline(caminho_arquivo_para_diarizacao)
-        if progresso_callback:
-            progresso_callback(40, "Diarização concluída")
+        with limitar_backend(backend, opcoes_backend, threads_whisper):
+            segmentos_whisper, segmentos_traducao = _transcrever_e_traduzir(
+                audio, modelo_escolhido, idioma, traduzir, progresso_callback, backend,
+                opcoes_backend, medidor, cancelar, palavras
+            )
+    except BaseException:
+        # Não deixa a diarização rodando sobre um arquivo de amostras que será removido
+        if not futuro.done():
+            encerrar_executor_diarizacao(forcar=True)
+        raise
 
-        if progresso_callback:
-            progresso_callback(50, "Transcrevendo com Whisper")
-        modelo = whisper.load_model(modelo_escolhido)
-        # Chama o Whisper com o idioma apropriado
-        kwargs = {}
-        if idioma and idioma != "auto":
-            kwargs["language"] = idioma
-        resultado = modelo.transcribe(caminho_arquivo_para_diarizacao, **kwargs)
-        if progresso_callback:
-            progresso_callback(80, "Transcrição concluída")
+    if progresso_callback:
+        progresso_callback(84, "Aguardando a diarização")
+    diarizacao, medidas = _aguardar_diarizacao(futuro, cancelar)
+    medidor.adicionar_etapa("diarizacao", **medidas)
+    if reserva is not None:
+        reserva.adicionar_cpu(medidas["tempo_cpu_s"])
+    return diarizacao, segmentos_whisper, segmentos_traducao
 
-        if progresso_callback:
-            progresso_callback(85, "Combinando falantes e transcrição")
-        segments = []
-        for turn, _, speaker in diarization.itertracks(yield_label=True):
-            start_time = turn.start
-            end_time = turn.end
-            segment_text = ""
-            for segment in resultado["segments"]:
-                seg_start = segment["start"]
-                seg_end = segment["end"]
-                if (seg_start <= end_time and seg_end >= start_time):
-                    segment_text += " " + segment["text"]
-            if segment_text.strip():
-                segments.append({
-                    "speaker": speaker,
-                    "start": start_time,
-                    "end": end_time,
-                    "text": segment_text.strip()
-                })
-        segments = remove_repeticoes(segments)
+# Segmentos por chamada de segmentos_callback
+LOTE_SEGMENTOS = 200
+
+def transcrever_com_diarizacao(caminho_arquivo, modelo_escolhido, idioma=None, progresso_callback=None, usar_cache=True,
+                               backend="whisper", opcoes_backend=None, metricas_callback=None, pasta_saida=None,
+                               cancelar=None, execucao_paralela=False, divisao_cpu=0.5, usar_vad=True,
+                               formatos=("txt",), segmentos_callback=None, identificar_falantes=True):
+    """
+    Adiciona parâmetro idioma (código do idioma ou None para detecção automática).
+    Resultados de inferência ficam em cache pelo conteúdo do áudio, modelo, idioma e backend;
+    use usar_cache=False para forçar uma nova transcrição.
+    backend escolhe a implementação de inferência (ver BACKENDS) e opcoes_backend
+    repassa opções como compute_type, cpu_threads e num_workers.
+    O tempo de cada etapa é gravado em metricas.jsonl e o resumo é enviado a metricas_callback.
+    pasta_saida permite gravar os arquivos fora de Transcricoes/ (usado pelo benchmark).
+    cancelar (Event) interrompe a transcrição entre etapas com TranscricaoCancelada.
+    execucao_paralela roda a diarização em outro processo ao mesmo tempo que o Whisper,
+    com divisao_cpu (fração dos núcleos) reservada para a diarização.
+    usar_vad pula os trechos de silêncio antes da diarização e do Whisper.
+    formatos escolhe os arquivos gravados (txt, srt, vtt, jsonl; ver escritores_transcricao);
+    jsonl inclui os tempos de cada palavra.
+    segmentos_callback recebe os segmentos finais em lotes, depois da combinação (não durante a inferência),
+    para a interface montar a lista sem um único evento enorme.
+    identificar_falantes troca SPEAKER_00... pelos falantes conhecidos de outras gravações (ver falantes.py);
+    a diarização de cada áudio também fica guardada lá, e trocar de modelo não diariza de novo.
+    Retorna uma VisaoTranscricao com os segmentos (str() dá o texto exibido na interface).
+    """
+    load_dotenv()
+    PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+    PASTA_TRANSCRICOES = pasta_saida or os.path.join(PASTA_SCRIPT, "Transcricoes")
+    if not os.path.exists(PASTA_TRANSCRICOES):
+        os.makedirs(PASTA_TRANSCRICOES)
+
+    nome_base = os.path.splitext(os.path.basename(caminho_arquivo))[0]
+    # Só traduz se idioma for diferente de inglês
+    traduzir = idioma != "en"
+    palavras = "jsonl" in formatos
+    # O VAD muda os segmentos gerados, então entra na identificação usada pelo cache
+    identificador = identificador_backend(backend, opcoes_backend) + ("+vad" if usar_vad else "")
+    medidor = MedidorEtapas(
+        caminho_arquivo, modelo=modelo_escolhido, idioma=idioma or "auto", backend=identificador
+    )
 
+    # A diarização não depende do modelo do Whisper, só do áudio e do VAD
+    configuracao_diarizacao = PIPELINE_DIARIZACAO + ("+vad" if usar_vad else "")
+    chave = None
+    entrada = None
+    hash_audio = None
+    if usar_cache or identificar_falantes:
         if progresso_callback:
-            progresso_callback(90, "Salvando transcrição")
-        caminho_transcr = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}.txt")
-        with open(caminho_transcr, "w", encoding="utf-8") as f:
-            if not segments or len(segments) == 0:
-                mensagem = "AVISO: Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados.\n"
-                f.write(mensagem)
-            else:
-                for segment in segments:
-                    f.write(f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {segment['text']}\n\n")
-
-        # Só traduz se idioma for diferente de inglês
-        if idioma != "en":
-            if progresso_callback:
-                progresso_callback(92, "Traduzindo para o inglês")
-            resultado_traduzido = modelo.transcribe(caminho_arquivo_para_diarizacao, task="translate", **kwargs)
-            if progresso_callback:
-                progresso_callback(95, "Salvando tradução em inglês")
-            caminho_trad = os.path.join(PASTA_TRANSCRICOES, f"transcricao_{nome_base}_ingles.txt")
-            with open(caminho_trad, "w", encoding="utf-8") as f:
-                if not segments or len(segments) == 0:
-                    mensagem = "WARNING: No speech segments were detected or all segments were filtered.\n"
-                    f.write(mensagem)
-                else:
-                    for segment in segments:
-                        translated_text = ""
-                        for trans_segment in resultado_traduzido["segments"]:
-                            if (trans_segment["start"] <= segment["end"] and 
-                                trans_segment["end"] >= segment["start"]):
-                                translated_text += " " + trans_segment["text"]
-                        if translated_text.strip():
-                            f.write(f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {translated_text.strip()}\n\n")
+            progresso_callback(2, "Verificando cache")
+        with medidor.etapa("cache"):
+            hash_audio = cache_transcricao.hash_do_arquivo(caminho_arquivo)
+            if usar_cache:
+                chave = cache_transcricao.gerar_chave(hash_audio, modelo_escolhido, idioma, identificador)
+                entrada = cache_transcricao.carregar_do_cache(chave)
+                if entrada and traduzir and entrada["traducao"] is None:
+                    entrada = None
+                if entrada and palavras and not entrada["palavras"]:
+                    entrada = None
 
+    if entrada:
+        turnos = entrada["turnos"]
+        segmentos_whisper = entrada["segmentos"]
+        segmentos_traducao = entrada["traducao"]
+        medidor.duracao_audio = entrada["duracao"]
+        medidor.contexto["cache"] = True
         if progresso_callback:
-            progresso_callback(100, "Processo concluído!")
+            progresso_callback(80, "Transcrição recuperada do cache")
+    else:
+        turnos_cache = None
+        if identificar_falantes and usar_cache:
+            turnos_cache = obter_banco_falantes().diarizacao_em_cache(hash_audio, configuracao_diarizacao)
+        # Reserva a fatia dos núcleos deste job entre os trabalhos ativos na máquina
+        with obter_governador().reservar("transcricao") as reserva:
+            turnos, embeddings, segmentos_whisper, segmentos_traducao, medidor.duracao_audio = _executar_inferencia(
+                caminho_arquivo, modelo_escolhido, idioma, traduzir, PASTA_SCRIPT, progresso_callback,
+                backend, opcoes_backend, medidor, cancelar, execucao_paralela, divisao_cpu, usar_vad,
+                palavras=palavras, turnos_cache=turnos_cache, reserva=reserva
+            )
+        medidor.contexto.update(reserva.relatorio)
+        if identificar_falantes and turnos_cache is None:
+            obter_banco_falantes().salvar_diarizacao(hash_audio, configuracao_diarizacao, turnos, embeddings)
+        medidor.contexto["cache"] = False
+        medidor.contexto["cache_diarizacao"] = turnos_cache is not None
+        if chave:
+            cache_transcricao.salvar_no_cache(
+                chave, turnos, segmentos_whisper, segmentos_traducao, duracao=medidor.duracao_audio,
+                palavras=palavras
+            )
 
-        if not segments or len(segments) == 0:
-            return "Nenhum segmento de fala foi detectado ou todos os segmentos foram filtrados."
-        else:
-            texto_interface = ""
-            for segment in segments:
-                texto_interface += f"[{format_timestamp(segment['start'])} -> {format_timestamp(segment['end'])}] {segment['speaker']}: {segment['text']}\n\n"
-            return texto_interface
+    if identificar_falantes:
+        with medidor.etapa("identificacao"):
+            turnos = obter_banco_falantes().rotular_turnos(hash_audio, configuracao_diarizacao, turnos)
 
-    finally:
-        if caminho_audio_temp and os.path.exists(caminho_audio_temp):
-            try:
-                os.remove(caminho_audio_temp)
-            except Exception:
-                pass
\ No newline at end of file
+    if progresso_callback:
+        progresso_callback(85, "Combinando falantes e transcrição")
+    with medidor.etapa("combinacao"):
+        segments = combinar_falantes(turnos, segmentos_whisper)
+        if traduzir:
+            associar_traducao(segments, segmentos_traducao)
+
+    if segmentos_callback:
+        for i in range(0, len(segments), LOTE_SEGMENTOS):
+            segmentos_callback(segments[i:i + LOTE_SEGMENTOS])
+
+    if progresso_callback:
+        progresso_callback(90, "Salvando transcrição")
+    with medidor.etapa("escrita"):
+        # Uma única passada pelos segmentos alimenta todos os formatos (e a tradução)
+        arquivos = escrever_transcricao(
+            segments, criar_escritores(PASTA_TRANSCRICOES, nome_base, formatos, traduzir)
+        )
+
+    resumo = medidor.registrar()
+    if metricas_callback:
+        metricas_callback(resumo)
+    if progresso_callback:
+        progresso_callback(100, "Processo concluído!")
+
+    return VisaoTranscricao(segments, arquivos)
@@ -0,0 +1,149 @@
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from audio_memoria import decodificar_audio, TAXA_AMOSTRAGEM
+from escritores_transcricao import criar_escritores, escrever_transcricao
+from governador_recursos import obter_governador
+from transcricao_core import obter_backend, limitar_backend, threads_fixadas, verificar_cancelamento
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+PASTA_TRANSCRICOES = os.path.join(PASTA_SCRIPT, "Transcricoes")
+
+# Janelas de 30 s: o tamanho fixo da entrada do Whisper
+DURACAO_JANELA_S = 30
+# Janelas decodificadas juntas em cada passada do modelo
+TAMANHO_LOTE = 8
+# Sobras do fim do arquivo menores que isso não viram janela
+DURACAO_MINIMA_S = 0.2
+# Sem diarização, cada arquivo (nota de voz, áudio de WhatsApp) fica com um falante só
+FALANTE_PADRAO = "SPEAKER_00"
+
+EXTENSOES_AUDIO = {".mp3", ".m4a", ".ogg", ".opus", ".wav", ".aac", ".flac", ".mp4", ".mkv", ".webm"}
+
+def listar_arquivos(caminhos):
+    """Arquivos informados e os de áudio/vídeo das pastas informadas (sem descer em subpastas)."""
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            arquivos += sorted(
+                os.path.join(caminho, nome) for nome in os.listdir(caminho)
+                if os.path.splitext(nome)[1].lower() in EXTENSOES_AUDIO
+            )
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+def janelas_audio(amostras, taxa=TAXA_AMOSTRAGEM):
+    """(início em segundos, amostras) de cada janela de 30 s do áudio; a última pode ser mais curta."""
+    tamanho = DURACAO_JANELA_S * taxa
+    minimo = int(DURACAO_MINIMA_S * taxa)
+    for inicio in range(0, len(amostras), tamanho):
+        janela = amostras[inicio:inicio + tamanho]
+        if len(janela) >= minimo:
+            yield inicio / taxa, janela
+
+def _audios_antecipados(caminhos, cancelar):
+    """Decodifica o próximo arquivo (no FFmpeg) enquanto o modelo trabalha no lote atual."""
+    with ThreadPoolExecutor(max_workers=1) as leitor:
+        proximo = leitor.submit(decodificar_audio, caminhos[0], cancelar=cancelar) if caminhos else None
+        for i, caminho in enumerate(caminhos):
+            atual = proximo
+            if i + 1 < len(caminhos):
+                proximo = leitor.submit(decodificar_audio, caminhos[i + 1], cancelar=cancelar)
+            try:
+                yield caminho, atual.result(), None
+            except Exception as e:
+                yield caminho, None, e
+
+def transcrever_lote(caminhos, modelo_escolhido="small", idioma=None, tarefa="transcribe", backend="whisper",
+                     opcoes_backend=None, tamanho_lote=TAMANHO_LOTE, arquivo_callback=None,
+                     progresso_callback=None, cancelar=None):
+    """
+    Transcreve muitos arquivos curtos agrupando janelas de 30 s de vários deles em cada lote do modelo
+    e devolvendo os segmentos a cada arquivo, já com o tempo da janela somado.
+    Retorna {caminho: {"segmentos", "duracao", "erro"}}; arquivo_callback(caminho, resultado)
+    é chamado assim que a última janela de um arquivo é transcrita. Sem diarização nem VAD.
+    """
+    resultados = {}
+    # Arquivos com janelas ainda não transcritas: caminho -> [janelas pendentes, áudio decodificado]
+    pendentes = {}
+    lote = []
+
+    def concluir(caminho):
+        _, audio = pendentes.pop(caminho)
+        if audio is not None:
+            audio.fechar()
+        if arquivo_callback:
+            arquivo_callback(caminho, resultados[caminho])
+        if progresso_callback:
+            concluidos = len(resultados) - len(pendentes)
+            progresso_callback(int(concluidos / len(caminhos) * 100), f"{concluidos}/{len(caminhos)} arquivos transcritos")
+
+    def processar(lote):
+        saidas = modelo.transcrever_janelas([janela for _, _, janela in lote], idioma, tarefa)
+        for (caminho, inicio, _), segmentos in zip(lote, saidas):
+            resultados[caminho]["segmentos"].extend(
+                {"start": inicio + s["start"], "end": inicio + s["end"], "text": s["text"], "speaker": FALANTE_PADRAO}
+                for s in segmentos
+            )
+            pendentes[caminho][0] -= 1
+            if not pendentes[caminho][0]:
+                concluir(caminho)
+
+    with obter_governador().reservar("transcricao") as reserva:
+        modelo = obter_backend(backend, modelo_escolhido, opcoes_backend)
+        try:
+            with limitar_backend(backend, opcoes_backend, threads_fixadas(opcoes_backend) or reserva.threads):
+                for caminho, audio, erro in _audios_antecipados(caminhos, cancelar):
+                    verificar_cancelamento(cancelar)
+                    resultados[caminho] = {"segmentos": [], "duracao": 0.0, "erro": str(erro) if erro else ""}
+                    janelas = list(janelas_audio(audio.amostras, audio.taxa)) if audio is not None else []
+                    # Contadas antes de entrar no lote, para o arquivo não ser concluído pela metade
+                    pendentes[caminho] = [len(janelas), audio]
+                    if audio is not None:
+                        resultados[caminho]["duracao"] = audio.duracao
+                    if not janelas:
+                        concluir(caminho)
+                    for inicio, janela in janelas:
+                        lote.append((caminho, inicio, janela))
+                        if len(lote) == tamanho_lote:
+                            processar(lote)
+                            lote = []
+                if lote:
+                    processar(lote)
+        finally:
+            # Cancelamento ou erro no meio de um lote: libera o áudio dos arquivos que ficaram pela metade
+            for _, audio in pendentes.values():
+                if audio is not None:
+                    audio.fechar()
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcreve muitos áudios curtos de uma vez, em lotes de janelas de 30 s.")
+    parser.add_argument("caminhos", nargs="+", help="Arquivos ou pastas com áudios")
+    parser.add_argument("--modelo", default="small")
+    parser.add_argument("--idioma", default=None)
+    parser.add_argument("--backend", default="whisper", help="whisper (em lote) ou ctranslate2 (uma janela por vez)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Janelas por passada do modelo")
+    parser.add_argument("--formatos", default="txt", help="Formatos de saída separados por vírgula")
+    parser.add_argument("--saida", default=PASTA_TRANSCRICOES)
+    args = parser.parse_args()
+
+    arquivos = listar_arquivos(args.caminhos)
+    formatos = [f.strip() for f in args.formatos.split(",") if f.strip()]
+    os.makedirs(args.saida, exist_ok=True)
+
+    def salvar(caminho, resultado):
+        if resultado["erro"]:
+            print(f"Erro em {caminho}: {resultado['erro']}")
+            return
+        nome_base = os.path.splitext(os.path.basename(caminho))[0]
+        escrever_transcricao(resultado["segmentos"], criar_escritores(args.saida, nome_base, formatos))
+        print(f"{os.path.basename(caminho)}: {len(resultado['segmentos'])} segmento(s)")
+
+    inicio = time.perf_counter()
+    resultados = transcrever_lote(arquivos, args.modelo, args.idioma, backend=args.backend,
+                                  tamanho_lote=args.lote, arquivo_callback=salvar)
+    tempo = time.perf_counter() - inicio
+    print(f"\n{len(resultados)} arquivo(s) em {tempo:.1f}s ({len(resultados) / tempo * 60:.1f} arquivos/min).")
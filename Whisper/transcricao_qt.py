@@ -4,17 +4,27 @@ import json
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QPushButton,
-    QFileDialog, QVBoxLayout, QHBoxLayout, QTextEdit, QComboBox, QMessageBox, QProgressBar,
-    QListWidget, QLineEdit
+    QFileDialog, QVBoxLayout, QHBoxLayout, QComboBox, QMessageBox, QProgressBar,
+    QListWidget, QLineEdit, QCheckBox
 )
 from PyQt5.QtGui import QIntValidator, QIcon
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
-from Transcricao_core import transcrever_com_diarizacao
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, Qt
+from metricas import formatar_resumo
+from trabalhador_transcricao import TrabalhadorTranscricao
+from historico_db import HistoricoTranscricoes
+from escritores_transcricao import MENSAGEM_SEM_FALA
+from visualizador_transcricao import VisualizadorTranscricao
 
 PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
-HISTORICO_PATH = os.path.join(PASTA_SCRIPT, "historico.json")
 CONFIG_PATH = os.path.join(PASTA_SCRIPT, "config.json")
 
+BACKENDS = [
+    ("whisper", "Whisper (PyTorch)"),
+    ("ctranslate2", "CTranslate2 (faster-whisper)"),
+]
+
+TIPOS_COMPUTACAO = ["int8", "int8_float32", "float32"]
+
 IDIOMAS = [
     ("auto", "Detectar automático"),
     ("pt", "Português"),
@@ -23,15 +33,20 @@ IDIOMAS = [
     ("fr", "Francês"),
     ("de", "Alemão"),
 ]
+NOMES_IDIOMAS = dict(IDIOMAS)
+
+def nome_job(job):
+    """Nome exibido na fila: o nome do arquivo, ou a URL inteira."""
+    return job["caminho"] if job.get("url") else os.path.basename(job["caminho"])
 
 class DropWidget(QWidget):
-    fileDropped = pyqtSignal(str)
+    filesDropped = pyqtSignal(list)
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAcceptDrops(True)
 
         # Centralização horizontal e vertical do texto dentro da área cinza
-        self.label = QLabel("Arraste e solte um arquivo de áudio ou vídeo aqui")
+        self.label = QLabel("Arraste e solte arquivos de áudio ou vídeo aqui")
         self.label.setAlignment(Qt.AlignCenter)
 
         layout = QVBoxLayout(self)
@@ -46,18 +61,21 @@ class DropWidget(QWidget):
         else:
             event.ignore()
     def dropEvent(self, event):
+        arquivos = []
         for url in event.mimeData().urls():
             file_path = url.toLocalFile()
             if file_path.lower().endswith(('.mp3', '.mp4', '.wav', '.m4a', '.ogg', '.flac')):
-                self.fileDropped.emit(file_path)
-                break
+                arquivos.append(file_path)
+        if arquivos:
+            self.filesDropped.emit(arquivos)
 
 class ConfigDialog(QWidget):
     def __init__(self, config_atual, salvar_callback):
         super().__init__()
         self.setWindowTitle("Configurações")
-        self.setFixedSize(320, 200)
+        self.setFixedSize(320, 460)
         self.salvar_callback = salvar_callback
+        self.config_atual = config_atual
 
         self.combo_modelo = QComboBox()
         self.combo_modelo.addItems(["tiny", "base", "small", "medium", "large"])
@@ -74,14 +92,60 @@ class ConfigDialog(QWidget):
                 break
         self.combo_idioma.setCurrentIndex(idx_padrao)
 
-        self.txt_max_hist = QLineEdit(str(config_atual.get("max_historico", 20)))
-        self.txt_max_hist.setValidator(QIntValidator(1, 100))
+        self.combo_backend = QComboBox()
+        for cod, nome in BACKENDS:
+            self.combo_backend.addItem(nome, cod)
+        idx_backend = 0
+        for i, (cod, nome) in enumerate(BACKENDS):
+            if cod == config_atual.get("backend", "whisper"):
+                idx_backend = i
+                break
+        self.combo_backend.setCurrentIndex(idx_backend)
+
+        self.combo_compute = QComboBox()
+        self.combo_compute.addItems(TIPOS_COMPUTACAO)
+        self.combo_compute.setCurrentText(config_atual.get("compute_type", "int8"))
+
+        self.txt_threads = QLineEdit(str(config_atual.get("cpu_threads", 0)))
+        self.txt_threads.setValidator(QIntValidator(0, 256))
+        self.txt_threads.setToolTip("0 = automático")
+
+        self.combo_backend.currentIndexChanged.connect(self.atualizar_opcoes_backend)
+        self.atualizar_opcoes_backend()
+
+        self.chk_paralelo = QCheckBox("Diarizar em paralelo com a transcrição")
+        self.chk_paralelo.setChecked(config_atual.get("execucao_paralela", False))
+        self.txt_divisao = QLineEdit(str(round(config_atual.get("divisao_cpu", 0.5) * 100)))
+        self.txt_divisao.setValidator(QIntValidator(10, 90))
+        self.txt_divisao.setToolTip("Porcentagem dos núcleos reservada para a diarização")
+        self.chk_paralelo.toggled.connect(self.txt_divisao.setEnabled)
+        self.txt_divisao.setEnabled(self.chk_paralelo.isChecked())
+
+        self.chk_vad = QCheckBox("Pular trechos de silêncio (VAD)")
+        self.chk_vad.setChecked(config_atual.get("usar_vad", True))
+
+        self.chk_falantes = QCheckBox("Reconhecer falantes de outras gravações")
+        self.chk_falantes.setChecked(config_atual.get("identificar_falantes", True))
+
+        self.txt_max_hist = QLineEdit(str(config_atual.get("max_historico", 1000)))
+        self.txt_max_hist.setValidator(QIntValidator(1, 100000))
 
         layout = QVBoxLayout()
         layout.addWidget(QLabel("Modelo padrão:"))
         layout.addWidget(self.combo_modelo)
         layout.addWidget(QLabel("Idioma padrão:"))
         layout.addWidget(self.combo_idioma)
+        layout.addWidget(QLabel("Backend de inferência:"))
+        layout.addWidget(self.combo_backend)
+        layout.addWidget(QLabel("Quantização (CTranslate2):"))
+        layout.addWidget(self.combo_compute)
+        layout.addWidget(QLabel("Threads de CPU (CTranslate2):"))
+        layout.addWidget(self.txt_threads)
+        layout.addWidget(self.chk_vad)
+        layout.addWidget(self.chk_falantes)
+        layout.addWidget(self.chk_paralelo)
+        layout.addWidget(QLabel("Núcleos para a diarização (%):"))
+        layout.addWidget(self.txt_divisao)
         layout.addWidget(QLabel("Máximo de itens no histórico:"))
         layout.addWidget(self.txt_max_hist)
 
@@ -97,33 +161,44 @@ class ConfigDialog(QWidget):
 
         self.setLayout(layout)
 
+    def atualizar_opcoes_backend(self):
+        ctranslate2 = self.combo_backend.currentData() == "ctranslate2"
+        self.combo_compute.setEnabled(ctranslate2)
+        self.txt_threads.setEnabled(ctranslate2)
+
     def salvar(self):
-        novo_config = {
+        novo_config = dict(self.config_atual)
+        novo_config.update({
             "modelo": self.combo_modelo.currentText(),
             "idioma": self.combo_idioma.currentData(),
-            "max_historico": int(self.txt_max_hist.text() or 20)
-        }
+            "backend": self.combo_backend.currentData(),
+            "compute_type": self.combo_compute.currentText(),
+            "cpu_threads": int(self.txt_threads.text() or 0),
+            "usar_vad": self.chk_vad.isChecked(),
+            "identificar_falantes": self.chk_falantes.isChecked(),
+            "execucao_paralela": self.chk_paralelo.isChecked(),
+            "divisao_cpu": min(90, max(10, int(self.txt_divisao.text() or 50))) / 100,
+            "max_historico": int(self.txt_max_hist.text() or 1000)
+        })
         self.salvar_callback(novo_config)
         QMessageBox.information(self, "Configurações", "Salvo com sucesso!")
         self.close()
 
-class TranscricaoThread(QThread):
-    progresso = pyqtSignal(int, str)
-    resultado = pyqtSignal(str)
-    erro = pyqtSignal(str)
-    def __init__(self, caminho, modelo, idioma):
+class OuvinteTrabalhador(QThread):
+    """Repassa para a interface, como sinal, os eventos do processo de transcrição."""
+    evento = pyqtSignal(object)
+    def __init__(self, trabalhador):
         super().__init__()
-        self.caminho = caminho
-        self.modelo = modelo
-        self.idioma = idioma
+        self.trabalhador = trabalhador
+        self._parar = False
     def run(self):
-        try:
-            def progresso_callback(valor, texto=""):
-                self.progresso.emit(valor, texto)
-            texto = transcrever_com_diarizacao(self.caminho, self.modelo, self.idioma, progresso_callback)
-            self.resultado.emit(texto)
-        except Exception as e:
-            self.erro.emit(str(e))
+        while not self._parar:
+            evento = self.trabalhador.proximo_evento()
+            if evento is not None:
+                self.evento.emit(evento)
+    def parar(self):
+        self._parar = True
+        self.wait()
 
 class TranscricaoApp(QMainWindow):
     def __init__(self):
@@ -226,6 +301,20 @@ class TranscricaoApp(QMainWindow):
         layout_esquerda.addLayout(hlayout)
         layout_esquerda.addSpacing(8)
 
+        # URL do YouTube: só o áudio é baixado, já no formato da transcrição
+        self.campo_url = QLineEdit()
+        self.campo_url.setPlaceholderText("Ou cole a URL de um vídeo do YouTube...")
+        self.campo_url.returnPressed.connect(self.transcrever_url)
+        self.btn_url = QPushButton("Transcrever URL")
+        self.btn_url.setFixedHeight(28)
+        self.btn_url.clicked.connect(self.transcrever_url)
+
+        hurl = QHBoxLayout()
+        hurl.addWidget(self.campo_url)
+        hurl.addWidget(self.btn_url)
+        layout_esquerda.addLayout(hurl)
+        layout_esquerda.addSpacing(8)
+
         # Status centralizado
         self.label_status = QLabel("Aguardando para começar.")
         self.label_status.setAlignment(Qt.AlignCenter)
@@ -248,17 +337,30 @@ class TranscricaoApp(QMainWindow):
         layout_esquerda.addWidget(self.progress)
         layout_esquerda.addSpacing(8)
 
+        # Fila de transcrições (um job por vez no processo de transcrição)
+        self.lista_fila = QListWidget()
+        self.lista_fila.setFixedHeight(80)
+        self.btn_cancelar_job = QPushButton("Cancelar selecionado")
+        self.btn_cancelar_job.clicked.connect(self.cancelar_job)
+        hfila = QHBoxLayout()
+        hfila.addWidget(QLabel("Fila de transcrição:"))
+        hfila.addStretch()
+        hfila.addWidget(self.btn_cancelar_job)
+        layout_esquerda.addLayout(hfila)
+        layout_esquerda.addWidget(self.lista_fila)
+        layout_esquerda.addSpacing(8)
+
         # Drop area centralizada e menor
         self.drop_area = DropWidget()
         self.drop_area.setFixedHeight(70)
         self.drop_area.setStyleSheet("background: #f3f3f3;")
-        self.drop_area.fileDropped.connect(self.arquivo_arrastado)
+        self.drop_area.filesDropped.connect(self.arquivos_arrastados)
         layout_esquerda.addWidget(self.drop_area)
         layout_esquerda.addSpacing(8)
 
-        self.texto_transcricao = QTextEdit()
-        self.texto_transcricao.setReadOnly(True)
-        layout_esquerda.addWidget(self.texto_transcricao)
+        # Lista virtualizada: transcrições de horas abrem sem montar o texto inteiro
+        self.visualizador = VisualizadorTranscricao()
+        layout_esquerda.addWidget(self.visualizador)
 
         # Direita
         self.busca_historico = QLineEdit()
@@ -287,10 +389,23 @@ class TranscricaoApp(QMainWindow):
         container.setLayout(layout_principal)
         self.setCentralWidget(container)
 
-        self.thread = None
-        self._historico_cache = []
+        self.historico = HistoricoTranscricoes()
+        self.historico.migrar_json()
+        self._historico_filtrado = []
         self.carregar_historico()
 
+        # Processo de transcrição persistente: o modelo continua carregado entre os jobs
+        self.jobs = {}
+        self.fila_pendente = []
+        self._proximo_id = 1
+        self._segmentos_exibidos = False
+        self.trabalhador = TrabalhadorTranscricao()
+        self.ouvinte = OuvinteTrabalhador(self.trabalhador)
+        self.ouvinte.evento.connect(self.tratar_evento)
+        self.ouvinte.start()
+        # Só depois que a janela aparece: o processo carrega torch/Whisper/pyannote em segundo plano
+        QTimer.singleShot(0, self.iniciar_trabalhador)
+
     def carregar_config(self):
         if os.path.exists(CONFIG_PATH):
             try:
@@ -341,8 +456,13 @@ class TranscricaoApp(QMainWindow):
         if fname:
             self.setar_arquivo(fname)
 
-    def arquivo_arrastado(self, file_path):
-        self.setar_arquivo(file_path)
+    def arquivos_arrastados(self, arquivos):
+        # Um arquivo só é selecionado; vários vão direto para a fila
+        if len(arquivos) == 1:
+            self.setar_arquivo(arquivos[0])
+            return
+        for caminho in arquivos:
+            self.enfileirar(caminho)
 
     def setar_arquivo(self, caminho):
         self.caminho_arquivo = caminho
@@ -352,133 +472,205 @@ class TranscricaoApp(QMainWindow):
         if not self.caminho_arquivo:
             QMessageBox.warning(self, "Aviso", "Selecione um arquivo primeiro.")
             return
+        self.enfileirar(self.caminho_arquivo)
 
-        modelo = self.combo_modelos.currentText()
-        idioma = self.combo_idioma.currentData()
-        self.texto_transcricao.setPlainText("Processando, aguarde...\n")
+    def transcrever_url(self):
+        url = self.campo_url.text().strip()
+        if not url.startswith(("http://", "https://", "www.")):
+            QMessageBox.warning(self, "Aviso", "Cole a URL de um vídeo (http://, https:// ou www.).")
+            return
+        self.enfileirar(url, url=True)
+        self.campo_url.clear()
+
+    def enfileirar(self, caminho, url=False):
+        """Cria um job com o modelo, idioma e backend atuais e coloca no fim da fila."""
+        backend = self.config.get("backend", "whisper")
+        opcoes_backend = {}
+        if backend == "ctranslate2":
+            opcoes_backend = {
+                "compute_type": self.config.get("compute_type", "int8"),
+                "cpu_threads": self.config.get("cpu_threads", 0),
+                "num_workers": self.config.get("num_workers", 1),
+            }
+        job = {
+            "id": self._proximo_id,
+            "caminho": caminho,
+            "url": url,
+            "modelo": self.combo_modelos.currentText(),
+            "idioma": self.combo_idioma.currentData(),
+            "backend": backend,
+            "opcoes_backend": opcoes_backend,
+            "execucao_paralela": self.config.get("execucao_paralela", False),
+            "divisao_cpu": self.config.get("divisao_cpu", 0.5),
+            "usar_vad": self.config.get("usar_vad", True),
+            "identificar_falantes": self.config.get("identificar_falantes", True),
+            # O TXT é sempre gravado: é o arquivo aberto pelo histórico
+            "formatos": ["txt"] + [f for f in self.config.get("formatos_saida", []) if f != "txt"],
+            "estado": "Aguardando",
+        }
+        self._proximo_id += 1
+        self.jobs[job["id"]] = job
+        self.fila_pendente.append(job["id"])
+        self.lista_fila.addItem("")
+        self.atualizar_fila()
+        self.despachar_proximo()
+
+    def despachar_proximo(self):
+        if self.trabalhador.ocupado() or not self.fila_pendente:
+            return
+        job = self.jobs[self.fila_pendente.pop(0)]
+        job["estado"] = "Iniciando"
+        self.visualizador.mostrar_mensagem(f"Processando {nome_job(job)}, aguarde...")
+        self._segmentos_exibidos = False
         self.progress.setVisible(True)
         self.progress.setValue(0)
         self.label_status.setText("Iniciando processamento...")
-        QApplication.processEvents()
-
-        self.thread = TranscricaoThread(self.caminho_arquivo, modelo, idioma)
-        self.thread.progresso.connect(self.atualizar_progresso_detalhado)
-        self.thread.resultado.connect(self.exibir_transcricao)
-        self.thread.erro.connect(self.exibir_erro)
-        self.thread.start()
+        self.atualizar_fila()
+        self.trabalhador.enviar({k: v for k, v in job.items() if k != "estado"})
+
+    def atualizar_fila(self):
+        for linha, job in enumerate(self.jobs.values()):
+            item = self.lista_fila.item(linha)
+            if item is not None:
+                item.setText(f"{nome_job(job)}  ({job['modelo']}) - {job['estado']}")
+
+    def cancelar_job(self):
+        linha = self.lista_fila.currentRow()
+        if linha < 0 or linha >= len(self.jobs):
+            return
+        id_job = list(self.jobs)[linha]
+        if id_job in self.fila_pendente:
+            self.fila_pendente.remove(id_job)
+            self.jobs[id_job]["estado"] = "Cancelado"
+        elif id_job == self.trabalhador.job_atual:
+            self.jobs[id_job]["estado"] = "Cancelando..."
+            self.trabalhador.cancelar_atual()
+        self.atualizar_fila()
+
+    def iniciar_trabalhador(self):
+        if not self.trabalhador.ativo():
+            self.statusBar().showMessage("Carregando bibliotecas de transcrição...")
+            self.trabalhador.iniciar()
+
+    def tratar_evento(self, evento):
+        tipo, id_job, dados = evento
+        if tipo == "pronto":
+            self.statusBar().showMessage(f"Erro ao carregar bibliotecas: {dados}" if dados else "Pronto para transcrever.")
+            return
+        job = self.jobs.get(id_job)
+        if job is None:
+            return
+        if tipo == "inicio":
+            job["estado"] = "Transcrevendo"
+        elif tipo == "progresso":
+            valor, texto = dados
+            if job["estado"] != "Cancelando...":
+                job["estado"] = f"{valor}%"
+            self.atualizar_progresso_detalhado(valor, texto)
+        elif tipo == "metricas":
+            self.exibir_metricas(dados)
+        elif tipo == "segmentos":
+            self.exibir_segmentos(dados)
+        elif tipo == "resultado":
+            job["estado"] = "Concluído"
+            self.exibir_transcricao(job, dados)
+        elif tipo == "erro":
+            job["estado"] = "Erro"
+            self.exibir_erro(dados)
+        elif tipo == "cancelado":
+            job["estado"] = "Cancelado"
+            self.progress.setVisible(False)
+            self.label_status.setText("Transcrição cancelada.")
+        self.atualizar_fila()
+        if tipo in ("resultado", "erro", "cancelado"):
+            self.despachar_proximo()
 
     def atualizar_progresso_detalhado(self, valor, texto):
         self.progress.setValue(valor)
         self.label_status.setText(texto)
 
-    def exibir_transcricao(self, texto):
-        self.texto_transcricao.setPlainText(texto)
+    def exibir_segmentos(self, segmentos):
+        # O primeiro lote substitui a mensagem de "Processando"; os seguintes são acrescentados
+        if self._segmentos_exibidos:
+            self.visualizador.acrescentar_segmentos(segmentos)
+        else:
+            self.visualizador.mostrar_segmentos(segmentos)
+            self._segmentos_exibidos = True
+
+    def exibir_transcricao(self, job, arquivos):
+        if not self._segmentos_exibidos:
+            self.visualizador.mostrar_mensagem(MENSAGEM_SEM_FALA)
         self.progress.setValue(100)
         self.progress.setVisible(False)
         self.label_status.setText("Pronto!")
-        self.adicionar_ao_historico()
+        self.adicionar_ao_historico(job, arquivos)
+
+    def exibir_metricas(self, resumo):
+        self.statusBar().showMessage(formatar_resumo(resumo))
 
     def exibir_erro(self, mensagem):
-        self.texto_transcricao.setPlainText("Erro durante a transcrição:\n" + mensagem)
+        self.visualizador.mostrar_mensagem("Erro durante a transcrição:\n" + mensagem)
         self.progress.setVisible(False)
         self.label_status.setText("Erro!")
 
-    def adicionar_ao_historico(self):
-        base = os.path.splitext(os.path.basename(self.caminho_arquivo))[0]
-        pasta = os.path.dirname(os.path.abspath(__file__))
-        caminho_transcr = os.path.join(pasta, "Transcricoes", f"transcricao_{base}.txt")
-        idioma_cod = self.combo_idioma.currentData()
-        data = {
-            "arquivo": caminho_transcr,
-            "nome": f"transcricao_{base}.txt",
-            "data": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "idioma": idioma_cod
-        }
-        historico = []
-        if os.path.exists(HISTORICO_PATH):
-            try:
-                with open(HISTORICO_PATH, "r", encoding="utf-8") as f:
-                    historico = json.load(f)
-            except Exception:
-                historico = []
-        historico = [h for h in historico if h["arquivo"] != data["arquivo"]]
-        historico.insert(0, data)
-        max_itens = self.config.get("max_historico", 20)
-        historico = historico[:max_itens]
-        with open(HISTORICO_PATH, "w", encoding="utf-8") as f:
-            json.dump(historico, f, indent=2, ensure_ascii=False)
+    def closeEvent(self, event):
+        self.ouvinte.parar()
+        self.trabalhador.encerrar()
+        self.historico.fechar()
+        super().closeEvent(event)
+
+    def adicionar_ao_historico(self, job, arquivos=(), texto=None):
+        # O TXT gravado pelo trabalhador; o nome vem do áudio baixado quando o job é uma URL
+        caminho_transcr = next((a for a in arquivos if a.endswith(".txt")), None)
+        if caminho_transcr is None:
+            base = os.path.splitext(os.path.basename(job["caminho"]))[0]
+            pasta = os.path.dirname(os.path.abspath(__file__))
+            caminho_transcr = os.path.join(pasta, "Transcricoes", f"transcricao_{base}.txt")
+        self.historico.adicionar(
+            caminho_transcr, os.path.basename(caminho_transcr), datetime.now().strftime("%Y-%m-%d %H:%M"),
+            job["idioma"], conteudo=texto, max_itens=self.config.get("max_historico", 1000)
+        )
         self.carregar_historico()
 
     def carregar_historico(self):
-        if os.path.exists(HISTORICO_PATH):
-            try:
-                with open(HISTORICO_PATH, "r", encoding="utf-8") as f:
-                    historico = json.load(f)
-                self._historico_cache = historico
-            except Exception:
-                self._historico_cache = []
-        else:
-            self._historico_cache = []
         self.filtrar_historico(self.busca_historico.text())
 
     def filtrar_historico(self, texto):
-        texto = texto.strip().lower()
+        termo = texto.strip().lower()
+        idiomas = [cod for cod, nome in IDIOMAS if termo and termo in nome.lower()]
+        self._historico_filtrado = self.historico.buscar(texto, idiomas)
         self.lista_historico.clear()
-        for h in getattr(self, '_historico_cache', []):
-            nome = h['nome'].lower()
-            data_str = h['data'].lower()
-            idioma_str = h.get('idioma', 'auto')
-            idioma_nome = next((n for c, n in IDIOMAS if c == idioma_str), idioma_str)
-            if texto in nome or texto in data_str or texto in idioma_nome.lower():
-                display = f"{h['nome']}  ({h['data']}, {idioma_nome})"
-                self.lista_historico.addItem(display)
+        for h in self._historico_filtrado:
+            idioma_nome = NOMES_IDIOMAS.get(h["idioma"], h["idioma"])
+            self.lista_historico.addItem(f"{h['nome']}  ({h['data']}, {idioma_nome})")
 
-    def abrir_do_historico(self, item):
+    def item_selecionado(self):
         idx = self.lista_historico.currentRow()
-        filtrados = []
-        texto = self.busca_historico.text().strip().lower()
-        for h in getattr(self, '_historico_cache', []):
-            nome = h['nome'].lower()
-            data_str = h['data'].lower()
-            idioma_str = h.get('idioma', 'auto')
-            idioma_nome = next((n for c, n in IDIOMAS if c == idioma_str), idioma_str)
-            if texto in nome or texto in data_str or texto in idioma_nome.lower():
-                filtrados.append(h)
-        if idx >= len(filtrados):
+        if idx < 0 or idx >= len(self._historico_filtrado):
+            return None
+        return self._historico_filtrado[idx]
+
+    def abrir_do_historico(self, item):
+        h = self.item_selecionado()
+        if h is None:
             return
-        caminho = filtrados[idx]["arquivo"]
+        caminho = h["arquivo"]
         if os.path.exists(caminho):
-            with open(caminho, "r", encoding="utf-8") as f:
-                conteudo = f.read()
-            self.texto_transcricao.setPlainText(conteudo)
+            self.visualizador.mostrar_arquivo(caminho)
         else:
             QMessageBox.warning(self, "Aviso", "Arquivo de transcrição não encontrado!")
 
     def remover_selecionado(self):
-        idx = self.lista_historico.currentRow()
-        texto = self.busca_historico.text().strip().lower()
-        filtrados = []
-        for h in getattr(self, '_historico_cache', []):
-            nome = h['nome'].lower()
-            data_str = h['data'].lower()
-            idioma_str = h.get('idioma', 'auto')
-            idioma_nome = next((n for c, n in IDIOMAS if c == idioma_str), idioma_str)
-            if texto in nome or texto in data_str or texto in idioma_nome.lower():
-                filtrados.append(h)
-        if idx < 0 or idx >= len(filtrados):
+        h = self.item_selecionado()
+        if h is None:
             return
-        to_remove = filtrados[idx]
-        self._historico_cache = [h for h in self._historico_cache if h != to_remove]
-        with open(HISTORICO_PATH, "w", encoding="utf-8") as f:
-            json.dump(self._historico_cache, f, indent=2, ensure_ascii=False)
+        self.historico.remover(h["id"])
         self.carregar_historico()
 
     def limpar_historico(self):
         resp = QMessageBox.question(self, "Limpar histórico", "Tem certeza que deseja apagar todo o histórico?")
         if resp == QMessageBox.Yes:
-            self._historico_cache = []
-            if os.path.exists(HISTORICO_PATH):
-                os.remove(HISTORICO_PATH)
+            self.historico.limpar()
             self.carregar_historico()
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+import bisect
+import numpy as np
+
+JANELA_MS = 30
+# Quadro é fala se a energia passar do piso de ruído (percentil 10) por esta margem
+DELTA_RUIDO_DB = 10.0
+# ...mas sem passar deste tanto abaixo dos trechos mais fortes (percentil 95), para gravações quase sem pausas
+FAIXA_FALA_DB = 30.0
+# Nunca considera fala abaixo deste nível, mesmo em gravações muito limpas
+LIMIAR_MINIMO_DB = -50.0
+# Silêncios mais curtos que isso ficam dentro da região de fala (pausas entre palavras)
+MIN_SILENCIO_MS = 600
+# Rajadas de energia mais curtas que isso são descartadas (cliques, ruídos)
+MIN_FALA_MS = 200
+# Margem mantida antes e depois de cada região, para não cortar o começo e o fim das palavras
+MARGEM_MS = 300
+# Silêncio inserido entre regiões no áudio condensado, para o Whisper não emendar frases
+SEPARACAO_MS = 100
+QUADROS_POR_BLOCO = 8192
+
+def _energia_db(amostras, tamanho_quadro):
+    """Energia RMS (dB) por quadro, calculada em blocos para não duplicar áudios longos na memória."""
+    total_quadros = len(amostras) // tamanho_quadro
+    energia = np.empty(total_quadros, dtype=np.float32)
+    for inicio in range(0, total_quadros, QUADROS_POR_BLOCO):
+        fim = min(total_quadros, inicio + QUADROS_POR_BLOCO)
+        quadros = np.asarray(amostras[inicio * tamanho_quadro:fim * tamanho_quadro], dtype=np.float32)
+        quadros = quadros.reshape(fim - inicio, tamanho_quadro)
+        energia[inicio:fim] = np.einsum("ij,ij->i", quadros, quadros) / tamanho_quadro
+    return 10 * np.log10(energia + 1e-10)
+
+def _quadros_energia(amostras, tamanho_quadro):
+    energia = _energia_db(amostras, tamanho_quadro)
+    if not len(energia):
+        return np.zeros(0, dtype=bool)
+    piso, forte = np.percentile(energia, [10, 95])
+    limiar = max(min(piso + DELTA_RUIDO_DB, forte - FAIXA_FALA_DB), LIMIAR_MINIMO_DB)
+    return energia > limiar
+
+def _quadros_webrtc(amostras, taxa, tamanho_quadro, agressividade):
+    try:
+        import webrtcvad
+    except ImportError:
+        raise RuntimeError("VAD 'webrtc' requer o pacote webrtcvad (pip install webrtcvad)")
+    detector = webrtcvad.Vad(agressividade)
+    total_quadros = len(amostras) // tamanho_quadro
+    ativos = np.zeros(total_quadros, dtype=bool)
+    for inicio in range(0, total_quadros, QUADROS_POR_BLOCO):
+        fim = min(total_quadros, inicio + QUADROS_POR_BLOCO)
+        bloco = np.asarray(amostras[inicio * tamanho_quadro:fim * tamanho_quadro], dtype=np.float32)
+        pcm = (np.clip(bloco, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        passo = tamanho_quadro * 2
+        for i in range(fim - inicio):
+            ativos[inicio + i] = detector.is_speech(pcm[i * passo:(i + 1) * passo], taxa)
+    return ativos
+
+def _trechos_ativos(ativos):
+    """Converte o vetor de quadros ativos em uma lista de (início, fim) em quadros."""
+    bordas = np.diff(np.concatenate(([0], ativos.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(bordas == 1).tolist(), np.flatnonzero(bordas == -1).tolist()))
+
+def detectar_fala(amostras, taxa, metodo="energia", agressividade=2):
+    """
+    Regiões de fala do áudio como lista de (amostra_inicial, amostra_final).
+    metodo "energia" usa um limiar adaptado ao ruído de fundo; "webrtc" usa o webrtcvad
+    (agressividade de 0 a 3), se instalado.
+    """
+    tamanho_quadro = int(taxa * JANELA_MS / 1000)
+    if metodo == "webrtc":
+        ativos = _quadros_webrtc(amostras, taxa, tamanho_quadro, agressividade)
+    elif metodo == "energia":
+        ativos = _quadros_energia(amostras, tamanho_quadro)
+    else:
+        raise ValueError(f"Método de VAD desconhecido: {metodo}")
+
+    min_silencio = MIN_SILENCIO_MS // JANELA_MS
+    min_fala = MIN_FALA_MS // JANELA_MS
+    margem = int(MARGEM_MS * taxa / 1000)
+
+    trechos = []
+    for inicio, fim in _trechos_ativos(ativos):
+        if trechos and inicio - trechos[-1][1] < min_silencio:
+            trechos[-1] = (trechos[-1][0], fim)
+        else:
+            trechos.append((inicio, fim))
+
+    regioes = []
+    for inicio, fim in trechos:
+        if fim - inicio < min_fala:
+            continue
+        inicio = max(0, inicio * tamanho_quadro - margem)
+        fim = min(len(amostras), fim * tamanho_quadro + margem)
+        if regioes and inicio <= regioes[-1][1]:
+            regioes[-1] = (regioes[-1][0], fim)
+        else:
+            regioes.append((inicio, fim))
+    return regioes
+
+class RegioesFala:
+    """
+    Regiões de fala de um áudio e o mapeamento entre o áudio condensado (só as regiões,
+    separadas por um silêncio curto) e a linha do tempo original.
+    """
+    def __init__(self, regioes, taxa, total_amostras, separacao_ms=SEPARACAO_MS):
+        self.regioes = regioes
+        self.taxa = taxa
+        self.total_amostras = total_amostras
+        self.separacao = int(separacao_ms * taxa / 1000)
+        # Posição (em amostras) em que cada região começa no áudio condensado
+        self.inicios_condensados = []
+        posicao = 0
+        for inicio, fim in regioes:
+            self.inicios_condensados.append(posicao)
+            posicao += fim - inicio + self.separacao
+
+    @property
+    def amostras_fala(self):
+        return sum(fim - inicio for inicio, fim in self.regioes)
+
+    @property
+    def proporcao_fala(self):
+        return self.amostras_fala / self.total_amostras if self.total_amostras else 0.0
+
+    def condensar(self, amostras):
+        """Novo array só com as regiões de fala, na ordem, separadas por silêncio."""
+        silencio = np.zeros(self.separacao, dtype=np.float32)
+        partes = []
+        for inicio, fim in self.regioes:
+            partes.append(np.asarray(amostras[inicio:fim], dtype=np.float32))
+            partes.append(silencio)
+        return np.concatenate(partes[:-1]) if partes else np.zeros(0, dtype=np.float32)
+
+    def para_original(self, segundos):
+        """Converte um tempo do áudio condensado para o tempo correspondente no áudio original."""
+        if not self.regioes:
+            return segundos
+        posicao = segundos * self.taxa
+        i = max(0, bisect.bisect_right(self.inicios_condensados, posicao) - 1)
+        inicio, fim = self.regioes[i]
+        # Tempos que caem no silêncio de separação ficam presos ao fim da região
+        return min(inicio + (posicao - self.inicios_condensados[i]), fim) / self.taxa
+
+    def remapear_segmentos(self, segmentos):
+        remapeados = []
+        for s in segmentos:
+            segmento = {**s, "start": self.para_original(s["start"]), "end": self.para_original(s["end"])}
+            if "words" in s:
+                segmento["words"] = self.remapear_segmentos(s["words"])
+            remapeados.append(segmento)
+        return remapeados
+
+    def remapear_turnos(self, turnos):
+        return [(self.para_original(inicio), self.para_original(fim), falante) for inicio, fim, falante in turnos]
@@ -0,0 +1,313 @@
+import re
+import bisect
+from array import array
+from PyQt5.QtWidgets import QWidget, QListView, QLineEdit, QLabel, QPushButton, QHBoxLayout, QVBoxLayout
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QTimer, Qt
+from escritores_transcricao import formatar_linha
+
+# Quantas linhas o QListView mede por vez; o resto é medido aos poucos, sem travar a interface
+TAMANHO_LOTE_LAYOUT = 200
+# Espera depois da última tecla antes de refazer a busca
+ATRASO_BUSCA_MS = 250
+COR_OCORRENCIA = QColor("#fff3a0")
+
+TAMANHO_BLOCO_LEITURA = 1024 * 1024
+
+# Cada segmento do TXT começa com "[h:mm:ss -> h:mm:ss]" no início de uma linha
+_INICIO_SEGMENTO = b"\n["
+_TEMPO_INICIAL = re.compile(r"^\[(\d+):(\d\d):(\d\d)")
+
+def ler_tempo(texto):
+    """Segundos de 'h:mm:ss', 'mm:ss' ou 'ss'; None se o texto não for um tempo."""
+    partes = texto.strip().split(":")
+    if not 1 <= len(partes) <= 3 or not all(p.isdigit() for p in partes):
+        return None
+    segundos = 0
+    for parte in partes:
+        segundos = segundos * 60 + int(parte)
+    return segundos
+
+class LinhasArquivo:
+    """
+    Segmentos de um TXT de transcrição lidos sob demanda: uma varredura em blocos guarda só a
+    posição de início de cada segmento, e o texto de uma linha é lido do disco quando ela é exibida.
+    O arquivo não fica mapeado, então pode ser regravado por uma nova transcrição.
+    """
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, "rb")
+        self._inicios = array("q")
+        posicao = 0
+        anterior = b"\n"
+        while True:
+            bloco = self._arquivo.read(TAMANHO_BLOCO_LEITURA)
+            if not bloco:
+                break
+            # Um byte do bloco anterior para achar inícios que caem na divisa entre blocos
+            dados = anterior + bloco
+            i = dados.find(_INICIO_SEGMENTO)
+            while i != -1:
+                self._inicios.append(posicao + i)
+                i = dados.find(_INICIO_SEGMENTO, i + 1)
+            anterior = bloco[-1:]
+            posicao += len(bloco)
+        self._tamanho = posicao
+        # Arquivos sem segmentos (só o aviso de "nenhuma fala") viram uma linha só
+        if posicao and not self._inicios:
+            self._inicios.append(0)
+
+    def __len__(self):
+        return len(self._inicios)
+
+    def texto(self, linha):
+        fim = self._inicios[linha + 1] if linha + 1 < len(self._inicios) else self._tamanho
+        self._arquivo.seek(self._inicios[linha])
+        return self._arquivo.read(fim - self._inicios[linha]).decode("utf-8", errors="replace").strip()
+
+    def textos(self):
+        """Texto de todas as linhas com uma única leitura sequencial do arquivo (usado pela busca)."""
+        self._arquivo.seek(0)
+        dados = self._arquivo.read(self._tamanho)
+        fins = list(self._inicios[1:]) + [self._tamanho]
+        return [dados[i:f].decode("utf-8", errors="replace").strip() for i, f in zip(self._inicios, fins)]
+
+    def inicio(self, linha):
+        m = _TEMPO_INICIAL.match(self.texto(linha))
+        return ((int(m.group(1)) * 60 + int(m.group(2))) * 60 + int(m.group(3))) if m else None
+
+    def fechar(self):
+        self._arquivo.close()
+
+class LinhasSegmentos:
+    """Segmentos recebidos do processo de transcrição, formatados só quando exibidos."""
+    def __init__(self, segmentos=()):
+        self.segmentos = list(segmentos)
+
+    def __len__(self):
+        return len(self.segmentos)
+
+    def texto(self, linha):
+        return formatar_linha(self.segmentos[linha]).strip()
+
+    def textos(self):
+        return [self.texto(i) for i in range(len(self.segmentos))]
+
+    def inicio(self, linha):
+        return self.segmentos[linha]["start"]
+
+    def fechar(self):
+        pass
+
+class LinhasMensagem:
+    """Uma mensagem de texto simples (andamento, erro), uma linha por linha do texto."""
+    def __init__(self, mensagem):
+        self.linhas = mensagem.strip().splitlines()
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def texto(self, linha):
+        return self.linhas[linha]
+
+    def textos(self):
+        return list(self.linhas)
+
+    def inicio(self, linha):
+        return None
+
+    def fechar(self):
+        pass
+
+class ModeloTranscricao(QAbstractListModel):
+    """
+    Modelo de lista com uma linha por segmento. A busca marca as linhas com ocorrências
+    (cor de fundo) e só avisa a view das linhas que mudaram de estado. O texto das linhas,
+    já em minúsculas, é lido uma vez na primeira busca e reaproveitado nas seguintes.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fonte = LinhasSegmentos()
+        self._textos_busca = None
+        self._termo = ""
+        self.ocorrencias = []
+        self._marcadas = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._fonte)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._fonte.texto(index.row())
+        if role == Qt.BackgroundRole and index.row() in self._marcadas:
+            return COR_OCORRENCIA
+        return None
+
+    def trocar_fonte(self, fonte):
+        self.beginResetModel()
+        self._fonte.fechar()
+        self._fonte = fonte
+        self._textos_busca = None
+        self.ocorrencias = [i for i in range(len(fonte)) if self._combina(i)]
+        self._marcadas = set(self.ocorrencias)
+        self.endResetModel()
+
+    def acrescentar(self, segmentos):
+        """Acrescenta segmentos ao fim (só com a fonte de segmentos recebidos)."""
+        if not segmentos or not isinstance(self._fonte, LinhasSegmentos):
+            return
+        primeira = len(self._fonte)
+        self.beginInsertRows(QModelIndex(), primeira, primeira + len(segmentos) - 1)
+        self._fonte.segmentos.extend(segmentos)
+        if self._textos_busca is not None:
+            self._textos_busca += [self._fonte.texto(i).casefold() for i in range(primeira, len(self._fonte))]
+        novas = [i for i in range(primeira, len(self._fonte)) if self._combina(i)]
+        self.ocorrencias.extend(novas)
+        self._marcadas.update(novas)
+        self.endInsertRows()
+
+    def _combina(self, linha):
+        if not self._termo:
+            return False
+        if self._textos_busca is None:
+            self._textos_busca = [texto.casefold() for texto in self._fonte.textos()]
+        return self._termo in self._textos_busca[linha]
+
+    def buscar(self, termo):
+        """Marca as linhas que contêm o termo (sem diferenciar maiúsculas). Retorna o total de ocorrências."""
+        self._termo = termo.strip().casefold()
+        anteriores = self._marcadas
+        self.ocorrencias = [i for i in range(len(self._fonte)) if self._combina(i)]
+        self._marcadas = set(self.ocorrencias)
+        for linha in anteriores.symmetric_difference(self._marcadas):
+            indice = self.index(linha)
+            self.dataChanged.emit(indice, indice, [Qt.BackgroundRole])
+        return len(self.ocorrencias)
+
+    def linha_do_tempo(self, segundos):
+        """Última linha que começa até 'segundos' (busca binária; os segmentos estão em ordem)."""
+        baixo, alto = 0, len(self._fonte)
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            inicio = self._fonte.inicio(meio)
+            if inicio is not None and inicio > segundos:
+                alto = meio
+            else:
+                baixo = meio + 1
+        return max(0, baixo - 1)
+
+class VisualizadorTranscricao(QWidget):
+    """
+    Visualizador de transcrições longas: QListView sobre ModeloTranscricao, que mede as linhas
+    em lotes e só desenha as visíveis. Tem busca com navegação entre ocorrências e salto para um tempo.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.modelo = ModeloTranscricao(self)
+        self.lista = QListView()
+        self.lista.setModel(self.modelo)
+        self.lista.setWordWrap(True)
+        self.lista.setLayoutMode(QListView.Batched)
+        self.lista.setBatchSize(TAMANHO_LOTE_LAYOUT)
+        self.lista.setSpacing(2)
+
+        self.campo_busca = QLineEdit()
+        self.campo_busca.setPlaceholderText("Buscar na transcrição...")
+        self.label_ocorrencias = QLabel("")
+        self.btn_anterior = QPushButton("<")
+        self.btn_proxima = QPushButton(">")
+        self.btn_anterior.setFixedWidth(28)
+        self.btn_proxima.setFixedWidth(28)
+        self.campo_tempo = QLineEdit()
+        self.campo_tempo.setPlaceholderText("Ir para h:mm:ss")
+        self.campo_tempo.setFixedWidth(110)
+
+        self._timer_busca = QTimer(self)
+        self._timer_busca.setSingleShot(True)
+        self._timer_busca.setInterval(ATRASO_BUSCA_MS)
+        self._timer_busca.timeout.connect(self.atualizar_busca)
+        self.campo_busca.textChanged.connect(self._timer_busca.start)
+        self.campo_busca.returnPressed.connect(self.proxima_ocorrencia)
+        self.btn_proxima.clicked.connect(self.proxima_ocorrencia)
+        self.btn_anterior.clicked.connect(self.ocorrencia_anterior)
+        self.campo_tempo.returnPressed.connect(self.ir_para_tempo_digitado)
+
+        barra = QHBoxLayout()
+        barra.setContentsMargins(0, 0, 0, 0)
+        barra.addWidget(self.campo_busca)
+        barra.addWidget(self.label_ocorrencias)
+        barra.addWidget(self.btn_anterior)
+        barra.addWidget(self.btn_proxima)
+        barra.addSpacing(10)
+        barra.addWidget(self.campo_tempo)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(barra)
+        layout.addWidget(self.lista)
+        self.setLayout(layout)
+
+    def _trocar(self, fonte):
+        self.modelo.trocar_fonte(fonte)
+        self._atualizar_label()
+
+    def mostrar_mensagem(self, mensagem):
+        self._trocar(LinhasMensagem(mensagem))
+
+    def mostrar_segmentos(self, segmentos=()):
+        self._trocar(LinhasSegmentos(segmentos))
+
+    def mostrar_arquivo(self, caminho):
+        self._trocar(LinhasArquivo(caminho))
+
+    def acrescentar_segmentos(self, segmentos):
+        # Só rola junto se o usuário já estava acompanhando o fim da lista
+        barra = self.lista.verticalScrollBar()
+        no_fim = barra.value() == barra.maximum()
+        self.modelo.acrescentar(segmentos)
+        self._atualizar_label()
+        if no_fim:
+            self.lista.scrollToBottom()
+
+    def total_linhas(self):
+        return self.modelo.rowCount()
+
+    def atualizar_busca(self):
+        self.modelo.buscar(self.campo_busca.text())
+        self._atualizar_label()
+
+    def _atualizar_label(self):
+        total = len(self.modelo.ocorrencias)
+        self.label_ocorrencias.setText(f"{total} ocorrência(s)" if self.campo_busca.text().strip() else "")
+
+    def _ir_para_linha(self, linha, posicao=QListView.PositionAtCenter):
+        indice = self.modelo.index(linha)
+        self.lista.setCurrentIndex(indice)
+        self.lista.scrollTo(indice, posicao)
+
+    def proxima_ocorrencia(self):
+        if self._timer_busca.isActive():
+            self._timer_busca.stop()
+            self.atualizar_busca()
+        ocorrencias = self.modelo.ocorrencias
+        if not ocorrencias:
+            return
+        i = bisect.bisect_right(ocorrencias, self.lista.currentIndex().row())
+        self._ir_para_linha(ocorrencias[i] if i < len(ocorrencias) else ocorrencias[0])
+
+    def ocorrencia_anterior(self):
+        ocorrencias = self.modelo.ocorrencias
+        if not ocorrencias:
+            return
+        i = bisect.bisect_left(ocorrencias, self.lista.currentIndex().row())
+        self._ir_para_linha(ocorrencias[i - 1] if i > 0 else ocorrencias[-1])
+
+    def ir_para_tempo(self, segundos):
+        if self.modelo.rowCount():
+            self._ir_para_linha(self.modelo.linha_do_tempo(segundos), QListView.PositionAtTop)
+
+    def ir_para_tempo_digitado(self):
+        segundos = ler_tempo(self.campo_tempo.text())
+        if segundos is not None:
+            self.ir_para_tempo(segundos)